@@ -3,5 +3,17 @@ API 服务模块
 """
 
 from .api_server import APIServer
+from .inference_executor import InferenceExecutor, QueueFullError
+from .batch_scheduler import BatchScheduler
+from .job_manager import JobManager, JobStore
+from .ws_session import SynthesisSession
 
-__all__ = ["APIServer"]
+__all__ = [
+    "APIServer",
+    "InferenceExecutor",
+    "QueueFullError",
+    "BatchScheduler",
+    "JobManager",
+    "JobStore",
+    "SynthesisSession",
+]
@@ -2,23 +2,46 @@
 FastAPI 服务器
 """
 
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request, BackgroundTasks, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, StreamingResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+import io
 import os
+import time
+import asyncio
 import logging
-import tempfile
+import functools
 from pathlib import Path
-from typing import Optional, List
+from typing import Any, Callable, Optional, List, Tuple
 import sys
 
+import numpy as np
+import soundfile as sf
+
 # 添加项目根目录到路径
 current_dir = Path(__file__).parent
 project_root = current_dir.parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from src.core.tts_wrapper import TTSWrapper
+from src.core.model_pool import ModelPool
+from src.core.model_loader import ModelLoader
+from src.core.result_cache import AudioResultCache
+from src.core.voice_store import VoiceStore, InvalidVoiceError
+from src.core.voice_registry import VoiceRegistry
+from src.core.duration_estimator import DurationEstimator
+from src.core.tts_wrapper import TTSWrapper, VoiceInput
+from src.core.audio_processor import AudioProcessor
+from src.core.audio_encoder import AudioEncoder
+from src.core.cancellation import CancelToken, RequestCancelledError
+from src.api.inference_executor import InferenceExecutor, QueueFullError
+from src.api.batch_scheduler import BatchScheduler
+from src.api.job_manager import JobManager
+from src.api.ws_session import SynthesisSession
 from src.config.settings import Settings
+from src.utils.file_utils import FileUtils
+from src.utils.text_utils import TextUtils
+from src.utils.emotion_matcher import EmotionMatcher
+from src.utils.metrics import metrics
 
 
 class APIServer:
@@ -37,8 +60,20 @@ class APIServer:
             description="IndexTTS 二次开发 API 服务",
             version="1.0.0"
         )
-        self.tts_wrapper = None
+        self.model_loader = ModelLoader.from_config(
+            load_fn=self._load_model_pool,
+            startup_config=self.settings.get("startup", {})
+        )
+        self.job_manager = None
+        self.result_cache = None
+        self.voice_store = None
+        self.voice_registry = None
+        self.duration_estimator = None
+        self.emotion_matcher = EmotionMatcher.from_config(self.settings.get("emotion", {}))
+        self.audio_encoder = AudioEncoder.from_config(self.settings.get("output", {}))
         self.setup_logging()
+        self.setup_cache()
+        self.setup_executor()
         self.setup_middleware()
         self.setup_routes()
         
@@ -51,6 +86,42 @@ class APIServer:
         )
         self.logger = logging.getLogger(__name__)
     
+    def setup_cache(self):
+        """设置合成结果缓存、参考语音存储与时长估计器"""
+        result_config = self.settings.get_cache_config().get("result", {})
+        if result_config.get("enabled", True):
+            self.result_cache = AudioResultCache.from_config(result_config)
+        
+        voices_config = self.settings.get("voices", {})
+        if voices_config.get("enabled", True):
+            self.voice_store = VoiceStore.from_config(voices_config, self.settings.get("audio.sample_rate", 22050))
+            self.voice_registry = VoiceRegistry(self.voice_store, voices_config.get("registry_db"))
+        
+        estimator_config = self.settings.get("estimator", {})
+        if estimator_config.get("enabled", True):
+            self.duration_estimator = DurationEstimator.from_config(estimator_config)
+    
+    def setup_executor(self):
+        """设置推理执行器，所有模型调用都在其中执行"""
+        api_config = dict(self.settings.get_api_config())
+        if not api_config.get("inference_workers"):
+            # 默认每个模型副本一个推理线程
+            api_config["inference_workers"] = self.settings.get("model_pool.replicas", 1)
+        self.executor = InferenceExecutor.from_config(api_config)
+        
+        # 可选的动态微批调度，批量推理同样在执行器中进行
+        self.scheduler = None
+        scheduler_config = self.settings.get("scheduler", {})
+        if scheduler_config.get("enabled", False):
+            self.scheduler = BatchScheduler.from_config(
+                scheduler_config,
+                dispatch_fn=lambda texts, voice_path, params: self.model_pool.batch_infer(
+                    texts, voice_path, **params
+                ),
+                executor=self.executor,
+                duration_fn=self.duration_estimator.predict_audio_seconds if self.duration_estimator else None
+            )
+    
     def setup_middleware(self):
         """设置中间件"""
         self.app.add_middleware(
@@ -60,14 +131,54 @@ class APIServer:
             allow_methods=["*"],
             allow_headers=["*"],
         )
+        
+        if self.settings.get("api.metrics_enabled", True):
+            self.app.middleware("http")(self._record_request_metrics)
+    
+    async def _record_request_metrics(self, request: Request, call_next):
+        """记录请求数、请求耗时与响应写出耗时"""
+        start = time.perf_counter()
+        response = await call_next(request)
+        handler_seconds = time.perf_counter() - start
+        
+        # 按路由模板统计，避免路径参数导致标签数量膨胀
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        metrics.inc("http_requests_total", method=request.method, path=path, status=response.status_code)
+        
+        body_iterator = response.body_iterator
+        
+        async def timed_body():
+            write_start = time.perf_counter()
+            try:
+                async for chunk in body_iterator:
+                    yield chunk
+            finally:
+                write_seconds = time.perf_counter() - write_start
+                metrics.observe("stage_seconds", write_seconds, stage="response_write")
+                metrics.observe("http_request_seconds", handler_seconds + write_seconds, path=path)
+        
+        response.body_iterator = timed_body()
+        return response
     
     def setup_routes(self):
         """设置路由"""
         
         @self.app.on_event("startup")
         async def startup_event():
-            """启动事件"""
-            self.initialize_tts()
+            """启动事件：模型在后台加载，进程立即开始接受请求"""
+            self.model_loader.start(background=self.settings.get("startup.background_load", True))
+            self.initialize_jobs()
+        
+        @self.app.on_event("shutdown")
+        async def shutdown_event():
+            """关闭事件"""
+            if self.scheduler:
+                self.scheduler.shutdown()
+            self.executor.shutdown(wait=False)
+            self.audio_encoder.shutdown()
+            if self.duration_estimator:
+                self.duration_estimator.save()
         
         @self.app.get("/")
         async def root():
@@ -78,45 +189,92 @@ class APIServer:
                 "status": "running"
             }
         
+        @self.app.get("/live")
+        async def liveness():
+            """存活检查：进程可以响应请求即视为存活"""
+            return {"status": "alive"}
+        
+        @self.app.get("/ready")
+        async def readiness():
+            """就绪检查：模型加载并预热完成后才接收流量"""
+            status = self.model_loader.get_status()
+            if not status["ready"]:
+                return JSONResponse(status_code=503, content=status)
+            return status
+        
         @self.app.get("/health")
         async def health_check():
             """健康检查"""
-            return {
-                "status": "healthy",
-                "tts_loaded": self.tts_wrapper is not None
-            }
+            status = self.model_loader.get_status()
+            if status["state"] == ModelLoader.FAILED:
+                health = "unhealthy"
+            elif status["ready"]:
+                health = "healthy"
+            else:
+                health = "loading"
+            
+            return JSONResponse(
+                status_code=503 if health == "unhealthy" else 200,
+                content={
+                    "status": health,
+                    "tts_loaded": status["ready"],
+                    "loader": status,
+                    "replicas": self.model_pool.get_stats() if self.model_pool else [],
+                    "inference": self.executor.get_stats()
+                }
+            )
+        
+        @self.app.get("/metrics")
+        async def get_metrics():
+            """Prometheus 格式的运行指标"""
+            if not self.settings.get("api.metrics_enabled", True):
+                raise HTTPException(status_code=404, detail="指标未启用")
+            self._update_metrics_gauges()
+            return Response(content=metrics.render(), media_type="text/plain; version=0.0.4")
         
         @self.app.get("/model/info")
         async def get_model_info():
             """获取模型信息"""
-            if not self.tts_wrapper:
+            if self.model_pool is None:
                 raise HTTPException(status_code=503, detail="TTS 模型未加载")
             
-            return self.tts_wrapper.get_model_info()
+            info = self.model_pool.get_model_info()
+            info["result_cache"] = self.result_cache.get_stats() if self.result_cache else None
+            info["duration_estimator"] = self.duration_estimator.get_stats() if self.duration_estimator else None
+            return info
         
         @self.app.post("/synthesize")
         async def synthesize(
+            request: Request,
             text: str = Form(..., description="要合成的文本"),
-            voice_file: UploadFile = File(..., description="参考语音文件"),
+            voice_file: Optional[UploadFile] = File(None, description="参考语音文件"),
+            voice_id: Optional[str] = Form(None, description="已注册的参考语音 ID，提供时无需上传文件"),
             emotion_vector: Optional[str] = Form(None, description="情感向量，JSON 格式"),
             use_emo_text: bool = Form(False, description="是否使用文本情感"),
             emo_text: Optional[str] = Form(None, description="情感文本"),
             emo_alpha: float = Form(0.6, description="情感强度"),
-            use_random: bool = Form(False, description="是否使用随机采样")
+            use_random: bool = Form(False, description="是否使用随机采样"),
+            bypass_cache: bool = Form(False, description="是否跳过结果缓存"),
+            auto_emotion: Optional[bool] = Form(None, description="未指定情感时按文本关键词自动标注情感，长文本逐段标注"),
+            format: Optional[str] = Form(None, description="输出格式：wav、pcm、flac、mp3 或 opus，未指定时按 Accept 头协商"),
+            sample_rate: Optional[int] = Form(None, description="输出采样率，未指定时使用模型采样率"),
+            timeout: Optional[float] = Form(None, description="请求超时（秒），也可通过 X-Request-Timeout 头设置，超时返回 504")
         ):
             """语音合成接口"""
-            if not self.tts_wrapper:
+            if self.model_pool is None:
                 raise HTTPException(status_code=503, detail="TTS 模型未加载")
             
+            output_format = self._negotiate_format(format, request)
+            self._check_sample_rate(sample_rate)
+            token = self._request_token(request, timeout)
+            priority, tenant = self._request_class(request.headers)
+            
             if not text.strip():
                 raise HTTPException(status_code=400, detail="文本不能为空")
             
             try:
-                # 保存上传的语音文件
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-                    content = await voice_file.read()
-                    temp_file.write(content)
-                    temp_voice_path = temp_file.name
+                voice, voice_hash = await self._read_voice(voice_file, voice_id)
+                self._check_duration([text], voice_hash)
                 
                 # 解析情感向量
                 emo_vec = None
@@ -127,51 +285,234 @@ class APIServer:
                     except json.JSONDecodeError:
                         raise HTTPException(status_code=400, detail="情感向量格式错误")
                 
-                # 创建输出文件
-                output_dir = Path(self.settings.get("audio.output_dir", "outputs"))
-                output_dir.mkdir(exist_ok=True)
-                
-                import time
-                timestamp = int(time.time())
-                output_path = output_dir / f"api_output_{timestamp}.wav"
+                emotion_fn = self._auto_emotion_fn(auto_emotion, emo_vec, use_emo_text)
+                long_text = self._is_long_text(text, voice_hash)
+                if emotion_fn and not long_text:
+                    emo_vec = emotion_fn(text)
+                    emotion_fn = None
                 
-                # 执行语音合成
-                success = self.tts_wrapper.synthesize(
-                    text=text,
-                    voice_path=temp_voice_path,
-                    output_path=str(output_path),
-                    emotion_vector=emo_vec,
-                    use_emo_text=use_emo_text,
-                    emo_text=emo_text,
-                    emo_alpha=emo_alpha,
-                    use_random=use_random
-                )
+                # 随机采样结果不确定，不参与缓存
+                cache_key = None
+                if self.result_cache and not use_random and not bypass_cache:
+                    cache_key = AudioResultCache.make_key(
+                        text=text,
+                        voice_hash=voice_hash,
+                        emotion_vector=emo_vec,
+                        use_emo_text=use_emo_text,
+                        emo_text=emo_text,
+                        emo_alpha=emo_alpha,
+                        auto_emotion=emotion_fn is not None
+                    )
+                    # 在处理函数内读出数据，响应发送期间缓存文件被淘汰也不受影响
+                    cached = await asyncio.to_thread(self.result_cache.read, cache_key)
+                    metrics.inc("result_cache_requests_total", result="hit" if cached else "miss")
+                    if cached and output_format == "wav" and not sample_rate:
+                        return self._audio_response(cached, "wav", f"output_{cache_key[:12]}",
+                                                    sf.info(io.BytesIO(cached)).samplerate)
+                    if cached:
+                        # 缓存中保存的是 WAV，其他格式由缓存结果转码，无需重新推理
+                        audio, cached_rate = await asyncio.to_thread(sf.read, io.BytesIO(cached), dtype='float32')
+                        body = await self._encode(audio, cached_rate, output_format, sample_rate)
+                        return self._audio_response(body, output_format, f"output_{cache_key[:12]}",
+                                                    sample_rate or cached_rate)
                 
-                # 清理临时文件
-                os.unlink(temp_voice_path)
+                synthesis_params = {
+                    "emotion_vector": emo_vec,
+                    "use_emo_text": use_emo_text,
+                    "emo_text": emo_text,
+                    "emo_alpha": emo_alpha,
+                    "use_random": use_random
+                }
                 
-                if success:
-                    return FileResponse(
-                        path=str(output_path),
-                        media_type="audio/wav",
-                        filename=f"output_{timestamp}.wav"
+                # 参考语音与合成结果都留在内存中，不经过临时文件和输出文件
+                if long_text:
+                    pending = self._synthesize_long(
+                        text, voice, synthesis_params, emotion_fn, voice_hash, token, priority, tenant
+                    )
+                elif self.scheduler:
+                    pending = self._synthesize_scheduled(
+                        text, voice, voice_hash, synthesis_params, token, priority, tenant
                     )
                 else:
-                    raise HTTPException(status_code=500, detail="语音合成失败")
+                    pending = self.executor.run(
+                        self.model_pool.synthesize_array, text, voice,
+                        cancel_token=token, priority=priority, tenant=tenant, **synthesis_params
+                    )
+                model_rate, audio = await self._await_request(request, token, pending)
+                
+                if output_format == "wav" and not sample_rate:
+                    body = AudioProcessor.to_wav_bytes(audio, model_rate)
+                else:
+                    body = await self._encode(audio, model_rate, output_format, sample_rate)
+                stem = f"output_{int(time.time())}"
+                filename = f"{stem}.{AudioEncoder.extension(output_format)}"
+                background = BackgroundTasks()
+                if cache_key:
+                    # 结果缓存统一保存模型采样率的 WAV，与输出格式无关
+                    wav_data = body if output_format == "wav" and not sample_rate else None
+                    background.add_task(self._cache_result, cache_key, audio, model_rate, wav_data)
+                if self.settings.get("api.save_outputs", False):
+                    background.add_task(self._save_output, filename, body)
+                
+                return self._audio_response(body, output_format, stem, sample_rate or model_rate, background)
                     
+            except HTTPException:
+                raise
+            except QueueFullError:
+                raise HTTPException(status_code=429, detail="推理队列已满，请稍后重试")
+            except RequestCancelledError as e:
+                raise self._cancelled_error(e)
+            except InvalidVoiceError as e:
+                raise HTTPException(status_code=400, detail=str(e))
             except Exception as e:
                 self.logger.error(f"语音合成异常: {e}")
                 raise HTTPException(status_code=500, detail=f"语音合成异常: {str(e)}")
         
+        @self.app.post("/synthesize/stream")
+        async def synthesize_stream(
+            request: Request,
+            text: str = Form(..., description="要合成的文本"),
+            voice_file: Optional[UploadFile] = File(None, description="参考语音文件"),
+            voice_id: Optional[str] = Form(None, description="已注册的参考语音 ID，提供时无需上传文件"),
+            emotion_vector: Optional[str] = Form(None, description="情感向量，JSON 格式"),
+            use_emo_text: bool = Form(False, description="是否使用文本情感"),
+            emo_text: Optional[str] = Form(None, description="情感文本"),
+            emo_alpha: float = Form(0.6, description="情感强度"),
+            use_random: bool = Form(False, description="是否使用随机采样"),
+            segment_length: Optional[int] = Form(None, description="每段最大长度"),
+            format: Optional[str] = Form(None, description="输出格式：wav、pcm、flac、mp3 或 opus，未指定时按 Accept 头协商"),
+            sample_rate: Optional[int] = Form(None, description="输出采样率，pcm 默认为 audio.sample_rate，其他格式默认为模型采样率"),
+            auto_emotion: Optional[bool] = Form(None, description="未指定情感时按各段文本关键词自动标注情感"),
+            timeout: Optional[float] = Form(None, description="请求超时（秒），也可通过 X-Request-Timeout 头设置；首段超时返回 504，之后超时则提前结束流")
+        ):
+            """流式语音合成接口，按段合成并逐段返回音频"""
+            if self.model_pool is None:
+                raise HTTPException(status_code=503, detail="TTS 模型未加载")
+            
+            if not text.strip():
+                raise HTTPException(status_code=400, detail="文本不能为空")
+            
+            output_format = self._negotiate_format(format, request)
+            self._check_sample_rate(sample_rate)
+            token = self._request_token(request, timeout)
+            priority, tenant = self._request_class(request.headers)
+            
+            emo_vec = None
+            if emotion_vector:
+                import json
+                try:
+                    emo_vec = json.loads(emotion_vector)
+                except json.JSONDecodeError:
+                    raise HTTPException(status_code=400, detail="情感向量格式错误")
+            
+            voice, voice_hash = await self._read_voice(voice_file, voice_id)
+            self._check_duration([text], voice_hash)
+            
+            if output_format == "pcm" and not sample_rate:
+                # 原始 PCM 没有文件头，默认输出固定的配置采样率
+                sample_rate = self.settings.get("audio.sample_rate", 22050)
+            max_length = self._split_length(
+                text, voice_hash, segment_length or self.settings.get("text.stream_split_length", 120)
+            )
+            
+            segments = self.model_pool.synthesize_stream(
+                text=text,
+                voice_path=voice,
+                max_length=max_length,
+                emotion_vector=emo_vec,
+                use_emo_text=use_emo_text,
+                emo_text=emo_text,
+                emo_alpha=emo_alpha,
+                use_random=use_random,
+                emotion_fn=self._auto_emotion_fn(auto_emotion, emo_vec, use_emo_text),
+                cancel_token=token
+            )
+            
+            # 首段在返回响应前合成，队列已满时可直接返回 429
+            try:
+                first = await self._await_request(
+                    request, token,
+                    self.executor.run(next, segments, None, cancel_token=token, priority=priority, tenant=tenant)
+                )
+            except QueueFullError:
+                segments.close()
+                raise HTTPException(status_code=429, detail="推理队列已满，请稍后重试")
+            except RequestCancelledError as e:
+                raise self._cancelled_error(e)
+            except InvalidVoiceError as e:
+                segments.close()
+                raise HTTPException(status_code=400, detail=str(e))
+            except Exception as e:
+                self.logger.error(f"流式合成异常: {e}")
+                raise HTTPException(status_code=500, detail=f"流式合成异常: {str(e)}")
+            
+            # 各段在编码线程池中边合成边编码，编码器按需重采样
+            encoder = self.audio_encoder.stream(output_format, first[0], sample_rate) if first else None
+            
+            async def audio_chunks():
+                segment = first
+                try:
+                    while segment is not None:
+                        chunk = await asyncio.wrap_future(self.audio_encoder.submit(encoder.encode, segment[1]))
+                        if chunk:
+                            yield chunk
+                        # 后续分段属于已接纳的请求，不再受队列长度限制
+                        segment = await self.executor.run_continuation(
+                            next, segments, None, cancel_token=token, priority=priority, tenant=tenant
+                        )
+                    if encoder is not None:
+                        tail = await asyncio.wrap_future(self.audio_encoder.submit(encoder.close))
+                        if tail:
+                            yield tail
+                except RequestCancelledError as e:
+                    metrics.inc("requests_cancelled_total", reason=e.reason)
+                    self.logger.info(f"流式合成提前结束: {e}")
+                except Exception as e:
+                    # 响应头已发出，只能记录错误并结束流
+                    self.logger.error(f"流式合成异常: {e}")
+                finally:
+                    # 客户端断开时生成器被关闭：排队中的后续分段随令牌取消出队
+                    if segment is not None:
+                        token.cancel(CancelToken.DISCONNECTED)
+            
+            headers = {}
+            if output_format == "pcm":
+                headers = {
+                    "X-Sample-Rate": str(encoder.output_sample_rate if encoder else sample_rate),
+                    "X-Channels": "1",
+                    "X-Sample-Format": "s16le"
+                }
+            return StreamingResponse(
+                audio_chunks(),
+                media_type=AudioEncoder.media_type(output_format),
+                headers=headers
+            )
+        
+        @self.app.websocket("/ws/synthesize")
+        async def synthesize_ws(websocket: WebSocket):
+            """WebSocket 双工合成接口：边接收文本片段边按句合成，协议见 SynthesisSession"""
+            await websocket.accept()
+            try:
+                session = await self._open_ws_session(websocket)
+                if session is not None:
+                    await session.run()
+                await websocket.close()
+            except WebSocketDisconnect:
+                pass
+        
         @self.app.post("/batch_synthesize")
         async def batch_synthesize(
+            request: Request,
             texts: str = Form(..., description="文本列表，每行一个文本"),
-            voice_file: UploadFile = File(..., description="参考语音文件"),
-            **kwargs
+            voice_file: Optional[UploadFile] = File(None, description="参考语音文件"),
+            voice_id: Optional[str] = Form(None, description="已注册的参考语音 ID，提供时无需上传文件"),
+            timeout: Optional[float] = Form(None, description="请求超时（秒），也可通过 X-Request-Timeout 头设置，超时返回 504")
         ):
-            """批量语音合成接口"""
-            if not self.tts_wrapper:
+            """批量语音合成接口，按 bulk 优先级执行"""
+            if self.model_pool is None:
                 raise HTTPException(status_code=503, detail="TTS 模型未加载")
+            token = self._request_token(request, timeout)
+            priority, tenant = self._request_class(request.headers, InferenceExecutor.BULK)
             
             try:
                 # 解析文本列表
@@ -179,26 +520,19 @@ class APIServer:
                 if not text_list:
                     raise HTTPException(status_code=400, detail="文本列表不能为空")
                 
-                # 保存上传的语音文件
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-                    content = await voice_file.read()
-                    temp_file.write(content)
-                    temp_voice_path = temp_file.name
+                voice, voice_hash = await self._read_voice(voice_file, voice_id)
+                self._check_duration(text_list, voice_hash)
                 
                 # 创建输出目录
                 output_dir = Path(self.settings.get("audio.output_dir", "outputs"))
                 batch_dir = output_dir / f"batch_{int(time.time())}"
-                batch_dir.mkdir(exist_ok=True)
-                
-                # 执行批量合成
-                output_paths = self.tts_wrapper.batch_synthesize(
-                    texts=text_list,
-                    voice_path=temp_voice_path,
-                    output_dir=str(batch_dir)
-                )
+                batch_dir.mkdir(parents=True, exist_ok=True)
                 
-                # 清理临时文件
-                os.unlink(temp_voice_path)
+                # 执行批量合成，整个请求只在入口处检查一次队列容量
+                self.executor.check_capacity(priority)
+                output_paths = await self._await_request(request, token, self._synthesize_batch(
+                    text_list, voice, voice_hash, batch_dir, token, priority, tenant
+                ))
                 
                 return {
                     "message": f"批量合成完成，成功 {len(output_paths)} 个",
@@ -206,18 +540,774 @@ class APIServer:
                     "output_files": output_paths
                 }
                 
+            except HTTPException:
+                raise
+            except QueueFullError:
+                raise HTTPException(status_code=429, detail="推理队列已满，请稍后重试")
+            except RequestCancelledError as e:
+                raise self._cancelled_error(e)
+            except InvalidVoiceError as e:
+                raise HTTPException(status_code=400, detail=str(e))
             except Exception as e:
                 self.logger.error(f"批量合成异常: {e}")
                 raise HTTPException(status_code=500, detail=f"批量合成异常: {str(e)}")
+        
+        @self.app.post("/estimate")
+        async def estimate(
+            text: str = Form(..., description="要合成的文本"),
+            voice_file: Optional[UploadFile] = File(None, description="参考语音文件，不提供时按全局语速估计"),
+            voice_id: Optional[str] = Form(None, description="已注册的参考语音 ID")
+        ):
+            """预计合成的音频时长与推理耗时，不执行推理"""
+            if self.duration_estimator is None:
+                raise HTTPException(status_code=503, detail="时长估计未启用")
+            
+            voice_hash = None
+            if voice_file is not None or voice_id:
+                _, voice_hash = await self._read_voice(voice_file, voice_id)
+            prediction = self.duration_estimator.predict(TextUtils.clean_text(text), voice_hash)
+            max_duration = self.settings.get("audio.max_duration")
+            prediction["max_duration"] = max_duration
+            prediction["accepted"] = not max_duration or prediction["audio_seconds"] <= max_duration
+            return prediction
+        
+        @self.app.post("/voices")
+        async def register_voice(
+            voice_file: UploadFile = File(..., description="参考语音文件"),
+            name: Optional[str] = Form(None, description="参考语音名称")
+        ):
+            """注册参考语音，返回 voice_id，之后的合成请求可直接引用"""
+            registry = self._get_voice_registry()
+            with metrics.timer("upload"):
+                content = await voice_file.read()
+            if not content:
+                raise HTTPException(status_code=400, detail="参考语音文件为空")
+            
+            try:
+                record = await asyncio.to_thread(registry.register, content, name)
+            except Exception as e:
+                self.logger.error(f"注册参考语音失败: {e}")
+                raise HTTPException(status_code=400, detail=str(e))
+            
+            background = BackgroundTasks()
+            if self.settings.get("voices.precompute", True):
+                background.add_task(self._precompute_voice, record["id"])
+            return JSONResponse(
+                content={"voice_id": record["id"], **self._voice_info(record)},
+                background=background
+            )
+        
+        @self.app.get("/voices")
+        async def list_voices(limit: int = 100):
+            """列出已注册的参考语音"""
+            registry = self._get_voice_registry()
+            return {"voices": [self._voice_info(record) for record in registry.list_voices(limit)]}
+        
+        @self.app.get("/voices/{voice_id}")
+        async def get_voice(voice_id: str):
+            """查询已注册的参考语音"""
+            record = self._get_voice_registry().get(voice_id)
+            if record is None:
+                raise HTTPException(status_code=404, detail="参考语音不存在")
+            return self._voice_info(record)
+        
+        @self.app.delete("/voices/{voice_id}")
+        async def delete_voice(voice_id: str):
+            """删除已注册的参考语音"""
+            if not self._get_voice_registry().delete(voice_id):
+                raise HTTPException(status_code=404, detail="参考语音不存在")
+            return {"voice_id": voice_id, "status": "deleted"}
+        
+        @self.app.post("/jobs")
+        async def submit_job(
+            request: Request,
+            texts: str = Form(..., description="文本列表，每行一个文本"),
+            voice_file: Optional[UploadFile] = File(None, description="参考语音文件"),
+            voice_id: Optional[str] = Form(None, description="已注册的参考语音 ID，提供时无需上传文件"),
+            emotion_vector: Optional[str] = Form(None, description="情感向量，JSON 格式"),
+            use_emo_text: bool = Form(False, description="是否使用文本情感"),
+            emo_text: Optional[str] = Form(None, description="情感文本"),
+            emo_alpha: float = Form(0.6, description="情感强度"),
+            use_random: bool = Form(False, description="是否使用随机采样")
+        ):
+            """提交批量合成任务，立即返回任务 ID；任务条目按 bulk 优先级执行"""
+            if not self.job_manager:
+                raise HTTPException(status_code=503, detail="任务服务未启动")
+            _, tenant = self._request_class(request.headers, InferenceExecutor.BULK)
+            
+            text_list = [text.strip() for text in texts.split('\n') if text.strip()]
+            if not text_list:
+                raise HTTPException(status_code=400, detail="文本列表不能为空")
+            
+            emo_vec = None
+            if emotion_vector:
+                import json
+                try:
+                    emo_vec = json.loads(emotion_vector)
+                except json.JSONDecodeError:
+                    raise HTTPException(status_code=400, detail="情感向量格式错误")
+            
+            voice, voice_hash = await self._read_voice(voice_file, voice_id)
+            self._check_duration(text_list, voice_hash)
+            job_id = await asyncio.to_thread(
+                self.job_manager.submit,
+                text_list,
+                voice,
+                {
+                    "emotion_vector": emo_vec,
+                    "use_emo_text": use_emo_text,
+                    "emo_text": emo_text,
+                    "emo_alpha": emo_alpha,
+                    "use_random": use_random
+                },
+                tenant
+            )
+            return {
+                "job_id": job_id,
+                "status": "queued",
+                "total": len(text_list),
+                "eta_seconds": self.job_manager.estimate_remaining(job_id)
+            }
+        
+        @self.app.get("/jobs")
+        async def list_jobs(limit: int = 50):
+            """列出最近的批量合成任务"""
+            if not self.job_manager:
+                raise HTTPException(status_code=503, detail="任务服务未启动")
+            return {"jobs": self.job_manager.store.list_jobs(limit)}
+        
+        @self.app.get("/jobs/{job_id}")
+        async def get_job(job_id: str):
+            """查询任务进度及各条目状态"""
+            job = self._get_job_or_404(job_id)
+            job["eta_seconds"] = self.job_manager.estimate_remaining(job_id)
+            job.pop("voice_path", None)
+            job["items"] = [
+                {
+                    "index": item["idx"],
+                    "status": item["status"],
+                    "error": item["error"],
+                    "url": f"/jobs/{job_id}/items/{item['idx']}" if item["status"] == "completed" else None
+                }
+                for item in self.job_manager.store.get_items(job_id)
+            ]
+            return job
+        
+        @self.app.get("/jobs/{job_id}/items/{index}")
+        async def download_job_item(job_id: str, index: int):
+            """下载任务中的单条合成结果"""
+            self._get_job_or_404(job_id)
+            item = self.job_manager.store.get_item(job_id, index)
+            if not item or item["status"] != "completed":
+                raise HTTPException(status_code=404, detail="合成结果不存在或尚未完成")
+            return FileResponse(
+                path=item["output_path"],
+                media_type="audio/wav",
+                filename=os.path.basename(item["output_path"])
+            )
+        
+        @self.app.get("/jobs/{job_id}/download")
+        async def download_job(job_id: str):
+            """打包下载任务中已完成的全部结果"""
+            self._get_job_or_404(job_id)
+            archive_path = await asyncio.to_thread(self.job_manager.build_archive, job_id)
+            if archive_path is None:
+                raise HTTPException(status_code=404, detail="暂无已完成的合成结果")
+            return FileResponse(
+                path=str(archive_path),
+                media_type="application/zip",
+                filename=f"job_{job_id}.zip"
+            )
+        
+        @self.app.delete("/jobs/{job_id}")
+        async def cancel_job(job_id: str):
+            """取消任务"""
+            self._get_job_or_404(job_id)
+            if not self.job_manager.cancel(job_id):
+                raise HTTPException(status_code=409, detail="任务已结束，无法取消")
+            return {"job_id": job_id, "status": "cancelled"}
     
-    def initialize_tts(self):
-        """初始化 TTS 模型"""
+    def _update_metrics_gauges(self):
+        """采集时刷新队列深度、缓存命中率等仪表盘指标"""
+        for priority, stats in self.executor.get_stats()["classes"].items():
+            metrics.set_gauge("inference_queue_depth", stats["queued"], priority=priority)
+            metrics.set_gauge("inference_running", stats["running"], priority=priority)
+            metrics.set_gauge("inference_rejected", stats["rejected"], priority=priority)
+            metrics.set_gauge("inference_wait_p99_seconds", stats["wait_p99"], priority=priority)
+        if self.scheduler:
+            metrics.set_gauge("scheduler_pending", self.scheduler.get_stats()["pending"])
+        if self.job_manager:
+            metrics.set_gauge("jobs_queued", self.job_manager.get_stats()["queued_jobs"])
+        
+        metrics.set_gauge("model_ready", 1 if self.model_loader.is_ready else 0)
+        metrics.set_gauge("realtime_factor_overall", metrics.get_realtime_factor())
+        if self.result_cache:
+            metrics.set_gauge("cache_hit_ratio", self.result_cache.get_stats()["hit_ratio"], cache="result")
+        if self.model_pool is not None:
+            for replica in self.model_pool.replicas:
+                speaker_cache = replica.wrapper.speaker_cache
+                if speaker_cache is not None:
+                    metrics.set_gauge("cache_hit_ratio", speaker_cache.get_stats()["hit_ratio"],
+                                      cache="speaker", replica=replica.index)
+    
+    def _get_job_or_404(self, job_id: str) -> dict:
+        """获取任务信息，不存在时返回 404"""
+        if not self.job_manager:
+            raise HTTPException(status_code=503, detail="任务服务未启动")
+        job = self.job_manager.store.get_job(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="任务不存在")
+        return job
+    
+    def _get_voice_registry(self) -> VoiceRegistry:
+        """获取参考语音注册表，未启用时返回 503"""
+        if self.voice_registry is None:
+            raise HTTPException(status_code=503, detail="参考语音注册未启用")
+        return self.voice_registry
+    
+    @staticmethod
+    def _voice_info(record: dict) -> dict:
+        """参考语音记录的对外字段"""
+        return {
+            "voice_id": record["id"],
+            "name": record["name"],
+            "sample_rate": record["sample_rate"],
+            "duration": record["duration"],
+            "created_at": record["created_at"]
+        }
+    
+    async def _read_voice(self,
+                          voice_file: Optional[UploadFile],
+                          voice_id: Optional[str]) -> Tuple[VoiceInput, str]:
+        """
+        读取请求中的参考语音
+        
+        Args:
+            voice_file: 上传的参考语音文件
+            voice_id: 已注册的参考语音 ID，优先使用
+            
+        Returns:
+            Tuple[VoiceInput, str]: (参考语音, 内容哈希)，已注册的参考语音返回其规范化文件路径；
+            启用参考语音存储时哈希为存储键，与模型副本记录时长统计时使用的键一致
+        """
+        if voice_id:
+            registry = self._get_voice_registry()
+            record = registry.get(voice_id)
+            path = registry.resolve(voice_id) if record else None
+            if path is None:
+                raise HTTPException(status_code=404, detail="参考语音不存在")
+            return str(path), record["store_key"]
+        
+        if voice_file is None:
+            raise HTTPException(status_code=400, detail="需要提供参考语音文件或 voice_id")
+        with metrics.timer("upload"):
+            content = await voice_file.read()
+        if not content:
+            raise HTTPException(status_code=400, detail="参考语音文件为空")
+        return content, self._voice_key(content)
+    
+    def _voice_key(self, content: bytes) -> str:
+        """参考语音内容的哈希，启用参考语音存储时为存储键"""
+        if self.voice_store is not None:
+            return self.voice_store.get_key(content)
+        return FileUtils.get_bytes_hash(content)
+    
+    def _precompute_voice(self, voice_id: str):
+        """注册后在各模型副本上预先计算说话人条件，首个引用该参考语音的请求无需再编码"""
+        pool = self.model_pool
+        path = self.voice_registry.resolve(voice_id)
+        if pool is None or path is None:
+            return
+        text = self.settings.get("startup.warmup_text", "你好，欢迎使用语音合成服务。")
+        # 每个副本一个 bulk 任务，经 acquire 计入副本负载，不影响在线请求
+        for index in range(len(pool)):
+            try:
+                self.executor.submit(
+                    pool.precompute_conditioning, index, str(path), text,
+                    priority=InferenceExecutor.BULK
+                )
+            except QueueFullError:
+                self.logger.info(f"推理队列已满，跳过参考语音 {voice_id} 的条件预计算")
+                return
+    
+    async def _synthesize_scheduled(self,
+                                    text: str,
+                                    voice: bytes,
+                                    voice_hash: str,
+                                    params: dict,
+                                    cancel_token: Optional[CancelToken] = None,
+                                    priority: str = InferenceExecutor.INTERACTIVE,
+                                    tenant: Optional[str] = None) -> Tuple[int, np.ndarray]:
+        """
+        通过微批调度器合成
+        
+        Args:
+            text: 要合成的文本
+            voice: 参考语音文件内容
+            voice_hash: 参考音频内容哈希
+            params: 合成参数
+            cancel_token: 取消令牌
+            priority: 推理优先级
+            tenant: 租户（API Key）
+            
+        Returns:
+            Tuple[int, np.ndarray]: 采样率和音频数据
+        """
+        future = self.scheduler.submit(
+            text, voice, voice_hash, cancel_token=cancel_token, priority=priority, tenant=tenant, **params
+        )
+        return await asyncio.wrap_future(future)
+    
+    def _auto_emotion_fn(self,
+                         auto_emotion: Optional[bool],
+                         emotion_vector: Optional[List[float]],
+                         use_emo_text: bool) -> Optional[Callable[[str], Optional[List[float]]]]:
+        """
+        自动情感标注函数：请求开启（未指定时取 emotion.auto_tag）且未指定其他情感控制时返回
+        
+        Args:
+            auto_emotion: 请求中的 auto_emotion 参数
+            emotion_vector: 请求中的情感向量
+            use_emo_text: 是否使用文本情感
+            
+        Returns:
+            Optional[Callable]: 情感向量计算函数，不需要自动标注时返回 None
+        """
+        if auto_emotion is None:
+            auto_emotion = self.settings.get("emotion.auto_tag", False)
+        if not auto_emotion or emotion_vector is not None or use_emo_text:
+            return None
+        return self.emotion_matcher.vector
+    
+    def _check_duration(self, texts: List[str], voice_hash: Optional[str]):
+        """
+        推理前按时长估计器的预测检查 audio.max_duration，超出时返回 413
+        
+        Args:
+            texts: 要合成的文本，每条单独检查
+            voice_hash: 参考语音哈希，用于查找该参考语音的语速
+        """
+        max_duration = self.settings.get("audio.max_duration")
+        if not max_duration or self.duration_estimator is None:
+            return
+        for i, text in enumerate(texts):
+            seconds = self.duration_estimator.predict_audio_seconds(text, voice_hash)
+            if seconds > max_duration:
+                prefix = f"第 {i+1} 条文本" if len(texts) > 1 else "文本"
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"{prefix}预计音频时长 {seconds:.0f} 秒，超过上限 {max_duration} 秒"
+                )
+    
+    def _split_length(self, text: str, voice_hash: Optional[str], max_length: int) -> int:
+        """
+        分段长度：不超过 max_length，配置了 audio.max_segment_seconds 时每段预计时长也不超过该值
+        
+        Args:
+            text: 要合成的文本
+            voice_hash: 参考语音哈希
+            max_length: 按字符数的分段长度
+            
+        Returns:
+            int: 每段最大字符数
+        """
+        max_seconds = self.settings.get("audio.max_segment_seconds")
+        if not max_seconds or self.duration_estimator is None or not text:
+            return max_length
+        seconds_per_char = self.duration_estimator.predict_audio_seconds(text, voice_hash) / len(text)
+        return max(1, min(max_length, int(max_seconds / seconds_per_char)))
+    
+    def _is_long_text(self, text: str, voice_hash: Optional[str] = None) -> bool:
+        """是否需要按长文本分段合成"""
+        if not self.settings.get("text.auto_split", True):
+            return False
+        return len(text) > self._split_length(text, voice_hash, self.settings.get("text.split_length", 500))
+
+    async def _synthesize_long(self,
+                               text: str,
+                               voice: VoiceInput,
+                               params: dict,
+                               emotion_fn: Optional[Callable[[str], Optional[List[float]]]] = None,
+                               voice_hash: Optional[str] = None,
+                               cancel_token: Optional[CancelToken] = None,
+                               priority: str = InferenceExecutor.INTERACTIVE,
+                               tenant: Optional[str] = None,
+                               check_capacity: bool = True) -> Tuple[int, np.ndarray]:
+        """
+        长文本分段合成：各段作为后续任务并发提交到执行器，完成后拼接；取消后排队中的分段立即出队，
+        bulk 优先级的分段之间可被交互请求插队
+        """
+        # 整个请求只在入口处检查一次队列容量，各分段不再受限制
+        if check_capacity:
+            self.executor.check_capacity(priority)
+        # 在独立线程中等待各分段，不能占用推理执行器的工作线程，否则会与分段任务互相等待
+        return await asyncio.to_thread(
+            self.model_pool.synthesize_long,
+            text,
+            voice,
+            submit_fn=functools.partial(
+                self.executor.submit_continuation, cancel_token=cancel_token, priority=priority, tenant=tenant
+            ),
+            emotion_fn=emotion_fn,
+            cancel_token=cancel_token,
+            **self._long_text_options(text, voice_hash),
+            **params
+        )
+    
+    async def _synthesize_batch(self,
+                                texts: List[str],
+                                voice: VoiceInput,
+                                voice_hash: str,
+                                output_dir: Path,
+                                cancel_token: CancelToken,
+                                priority: str = InferenceExecutor.BULK,
+                                tenant: Optional[str] = None) -> List[str]:
+        """
+        批量合成：每条文本（长文本为每个分段）作为后续任务单独提交到执行器，
+        交互请求可在条目与分段之间插队；同时执行中的条目不超过推理并发数的两倍
+        
+        Args:
+            texts: 文本列表
+            voice: 参考语音
+            voice_hash: 参考语音哈希
+            output_dir: 输出目录
+            cancel_token: 取消令牌
+            priority: 推理优先级
+            tenant: 租户（API Key）
+            
+        Returns:
+            List[str]: 合成成功的输出文件路径，单条失败只记录日志；参考语音无效时抛出 InvalidVoiceError
+        """
+        window = asyncio.Semaphore(self.executor.max_workers * 2)
+        
+        async def synthesize_item(index: int, text: str) -> Optional[str]:
+            async with window:
+                try:
+                    if self._is_long_text(text, voice_hash):
+                        sample_rate, audio = await self._synthesize_long(
+                            text, voice, {}, voice_hash=voice_hash, cancel_token=cancel_token,
+                            priority=priority, tenant=tenant, check_capacity=False
+                        )
+                    else:
+                        sample_rate, audio = await self.executor.run_continuation(
+                            self.model_pool.synthesize_array, text, voice,
+                            cancel_token=cancel_token, priority=priority, tenant=tenant
+                        )
+                except (RequestCancelledError, InvalidVoiceError):
+                    # 取消与参考语音无效对所有文本都一样，直接结束整个请求
+                    raise
+                except Exception as e:
+                    self.logger.warning(f"第 {index+1} 个文本合成失败: {e}")
+                    return None
+            output_path = str(output_dir / f"output_{index:03d}.wav")
+            await asyncio.to_thread(AudioProcessor(sample_rate=sample_rate).save_audio, audio, output_path)
+            return output_path
+        
+        results = await asyncio.gather(*(synthesize_item(i, text) for i, text in enumerate(texts)))
+        return [path for path in results if path]
+    
+    def _long_text_options(self, text: str, voice_hash: Optional[str] = None) -> dict:
+        """长文本分段合成的分段长度与拼接参数"""
+        audio_config = self.settings.get_audio_config()
+        return {
+            "max_length": self._split_length(text, voice_hash, self.settings.get("text.split_length", 500)),
+            "silence_ms": audio_config.get("segment_silence_ms", 200),
+            "crossfade_ms": audio_config.get("crossfade_ms", 20)
+        }
+    
+    @staticmethod
+    def _request_class(headers, default: str = InferenceExecutor.INTERACTIVE) -> Tuple[str, Optional[str]]:
+        """
+        请求的推理优先级与租户
+        
+        Args:
+            headers: 请求头，X-Priority 指定优先级（只能降低，不能高于接口默认值），X-API-Key 为租户
+            default: 接口的默认优先级
+            
+        Returns:
+            Tuple[str, Optional[str]]: (优先级, 租户)
+        """
+        priority = (headers.get("x-priority") or default).strip().lower()
+        if priority not in InferenceExecutor.PRIORITIES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"X-Priority 需为 {' 或 '.join(InferenceExecutor.PRIORITIES)}"
+            )
+        if InferenceExecutor.PRIORITIES.index(priority) < InferenceExecutor.PRIORITIES.index(default):
+            priority = default
+        return priority, headers.get("x-api-key") or None
+    
+    def _request_token(self, request: Request, timeout: Optional[float] = None) -> CancelToken:
+        """
+        创建请求的取消令牌
+        
+        Args:
+            request: HTTP 请求，timeout 未指定时读取 X-Request-Timeout 头
+            timeout: 请求参数中的超时（秒），都未指定时使用 api.request_timeout
+            
+        Returns:
+            CancelToken: 取消令牌
+        """
+        if timeout is None:
+            header = request.headers.get("x-request-timeout")
+            try:
+                timeout = float(header) if header else self.settings.get("api.request_timeout")
+            except ValueError:
+                raise HTTPException(status_code=400, detail="X-Request-Timeout 需为秒数")
+        if timeout is not None and timeout <= 0:
+            raise HTTPException(status_code=400, detail="请求超时需大于 0")
+        return CancelToken(timeout)
+    
+    async def _await_request(self, request: Request, token: CancelToken, pending) -> Any:
+        """
+        等待推理结果：超过截止时间或客户端断开时取消令牌并立即返回，
+        排队中的任务随之出队，正在执行的分段结束后不再继续
+        
+        Args:
+            request: HTTP 请求，用于检测客户端断开
+            token: 请求的取消令牌
+            pending: 要等待的协程或 Future
+            
+        Returns:
+            Any: 推理结果
+        """
+        task = asyncio.ensure_future(pending)
+        watcher = asyncio.ensure_future(self._watch_disconnect(request, token))
         try:
-            tts_config = self.settings.get_tts_config()
-            self.tts_wrapper = TTSWrapper(**tts_config)
+            await asyncio.wait({task, watcher}, timeout=token.remaining(), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            watcher.cancel()
+        if not task.done():
+            token.cancel(token.reason or CancelToken.DEADLINE)
+            task.cancel()
+            raise RequestCancelledError(token.reason)
+        return task.result()
+    
+    @staticmethod
+    async def _watch_disconnect(request: Request, token: CancelToken, interval: float = 0.1):
+        """轮询客户端连接，断开时取消令牌"""
+        while not token.cancelled:
+            if await request.is_disconnected():
+                token.cancel(CancelToken.DISCONNECTED)
+                return
+            await asyncio.sleep(interval)
+    
+    @staticmethod
+    def _cancelled_error(error: RequestCancelledError) -> HTTPException:
+        """请求取消对应的 HTTP 错误：超时返回 504，客户端断开返回 499"""
+        metrics.inc("requests_cancelled_total", reason=error.reason)
+        if error.reason == CancelToken.DEADLINE:
+            return HTTPException(status_code=504, detail="请求已超过截止时间")
+        return HTTPException(status_code=499, detail="请求已取消")
+    
+    async def _open_ws_session(self, websocket: WebSocket) -> Optional[SynthesisSession]:
+        """
+        处理 WebSocket 会话的 start 消息
+        
+        start 消息为 JSON：{"type": "start", "voice_id", "format", "sample_rate", "segment_length",
+        "emotion_vector", "use_emo_text", "emo_text", "emo_alpha", "use_random", "auto_emotion"}，
+        除 type 外均可省略；未提供 voice_id 时，随后的一个二进制帧为参考语音文件内容。
+        格式默认为 pcm，成功后回复 {"type": "ready", "format", "sample_rate"}
+        
+        Args:
+            websocket: 已接受的 WebSocket 连接
+            
+        Returns:
+            Optional[SynthesisSession]: 会话，参数错误时已回复 error 消息并返回 None
+        """
+        import json
+        
+        async def reject(status: int, detail: str):
+            await websocket.send_json({"type": "error", "status": status, "detail": detail})
+        
+        if self.model_pool is None:
+            await reject(503, "TTS 模型未加载")
+            return None
+        try:
+            start = json.loads(await websocket.receive_text())
+        except (ValueError, KeyError):
+            start = None
+        if not isinstance(start, dict) or start.get("type") != "start":
+            await reject(400, "首条消息需为 start")
+            return None
+        
+        try:
+            priority, tenant = self._request_class(websocket.headers)
+            output_format = self.audio_encoder.resolve_format(start.get("format") or "pcm")
+            sample_rate = int(start["sample_rate"]) if start.get("sample_rate") else None
+            self._check_sample_rate(sample_rate)
+            max_length = int(start.get("segment_length") or self.settings.get("text.stream_split_length", 120))
+            params = {
+                "emotion_vector": start.get("emotion_vector"),
+                "use_emo_text": bool(start.get("use_emo_text", False)),
+                "emo_text": start.get("emo_text"),
+                "emo_alpha": float(start.get("emo_alpha", 0.6)),
+                "use_random": bool(start.get("use_random", False))
+            }
+            if start.get("voice_id"):
+                voice, voice_hash = await self._read_voice(None, start["voice_id"])
+            else:
+                voice = await websocket.receive_bytes()
+                if not voice:
+                    raise HTTPException(status_code=400, detail="参考语音文件为空")
+                voice_hash = self._voice_key(voice)
+        except (ValueError, TypeError) as e:
+            await reject(400, f"start 参数错误: {e}")
+            return None
+        except HTTPException as e:
+            await reject(e.status_code, e.detail)
+            return None
+        except KeyError:
+            await reject(400, "需要提供 voice_id 或在 start 之后发送参考语音二进制帧")
+            return None
+        
+        if output_format == "pcm" and not sample_rate:
+            sample_rate = self.settings.get("audio.sample_rate", 22050)
+        emotion_fn = self._auto_emotion_fn(
+            start.get("auto_emotion"), params["emotion_vector"], params["use_emo_text"]
+        )
+        
+        async def synthesize(text: str, token: CancelToken) -> Optional[Tuple[int, np.ndarray]]:
+            if not text.strip():
+                return None
+            return await self.executor.run(
+                self.model_pool.synthesize_array, text, voice, cancel_token=token,
+                priority=priority, tenant=tenant, **TTSWrapper.segment_params(text, params, emotion_fn)
+            )
+        
+        async def encode(audio: np.ndarray, model_rate: int) -> Tuple[bytes, int]:
+            data = await self._encode(audio, model_rate, output_format, sample_rate)
+            return data, AudioEncoder.supported_sample_rate(output_format, sample_rate or model_rate)
+        
+        await websocket.send_json({
+            "type": "ready",
+            "format": output_format,
+            "sample_rate": AudioEncoder.supported_sample_rate(output_format, sample_rate) if sample_rate else None
+        })
+        return SynthesisSession(websocket, synthesize, encode, max_length=max_length)
+    
+    def _negotiate_format(self, fmt: Optional[str], request: Request) -> str:
+        """按 format 参数或 Accept 头协商输出格式，format 不支持时返回 400"""
+        try:
+            return self.audio_encoder.negotiate(fmt, request.headers.get("accept"))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    @staticmethod
+    def _check_sample_rate(sample_rate: Optional[int]):
+        """检查请求的输出采样率"""
+        if sample_rate is not None and not 8000 <= sample_rate <= 192000:
+            raise HTTPException(status_code=400, detail="输出采样率需在 8000~192000 之间")
+    
+    async def _encode(self,
+                      audio: np.ndarray,
+                      sample_rate: int,
+                      output_format: str,
+                      output_sample_rate: Optional[int] = None) -> bytes:
+        """在编码线程池中编码完整音频，不占用事件循环与推理线程"""
+        with metrics.timer("encode"):
+            return await asyncio.wrap_future(
+                self.audio_encoder.submit_encode(audio, sample_rate, output_format, output_sample_rate)
+            )
+    
+    @staticmethod
+    def _audio_response(body: bytes,
+                        output_format: str,
+                        stem: str,
+                        sample_rate: int,
+                        background: Optional[BackgroundTasks] = None) -> Response:
+        """构造音频响应，原始 PCM 通过响应头说明采样格式"""
+        filename = f"{stem}.{AudioEncoder.extension(output_format)}"
+        headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+        if output_format == "pcm":
+            headers.update({
+                "X-Sample-Rate": str(AudioEncoder.supported_sample_rate(output_format, sample_rate)),
+                "X-Channels": "1",
+                "X-Sample-Format": "s16le"
+            })
+        return Response(
+            content=body,
+            media_type=AudioEncoder.media_type(output_format),
+            headers=headers,
+            background=background
+        )
+    
+    def _cache_result(self, cache_key: str, audio: np.ndarray, sample_rate: int, wav_data: Optional[bytes] = None):
+        """将合成结果以 WAV 写入结果缓存"""
+        self.result_cache.put(cache_key, wav_data or AudioProcessor.to_wav_bytes(audio, sample_rate))
+    
+    def _save_output(self, filename: str, data: bytes):
+        """将合成结果另存到输出目录（api.save_outputs 开启时）"""
+        output_dir = Path(self.settings.get("audio.output_dir", "outputs"))
+        output_dir.mkdir(parents=True, exist_ok=True)
+        with open(output_dir / filename, 'wb') as f:
+            f.write(data)
+
+    def initialize_jobs(self):
+        """初始化批量合成任务服务"""
+        jobs_config = self.settings.get("jobs", {})
+        jobs_dir = jobs_config.get("dir") or Path(self.settings.get("audio.output_dir", "outputs")) / "jobs"
+        
+        def synthesize_item(tenant: Optional[str] = None, **kwargs) -> bool:
+            # 重启后恢复的任务需等待模型就绪
+            if not self.model_loader.wait():
+                raise RuntimeError("TTS 模型未加载")
+            # 任务条目同样经由推理执行器执行，与在线请求共享并发限制，但按 bulk 优先级排队；
+            # 长文本逐段提交，交互请求可在分段之间插队
+            submit_fn = functools.partial(
+                self.executor.submit_continuation, priority=InferenceExecutor.BULK, tenant=tenant
+            )
+            text = kwargs["text"]
+            if self._is_long_text(text):
+                params = {key: value for key, value in kwargs.items() if key not in ("text", "voice_path")}
+                self.model_pool.synthesize_long(
+                    text, kwargs["voice_path"], submit_fn=submit_fn, **self._long_text_options(text), **params
+                )
+                return True
+            return submit_fn(self.model_pool.synthesize, **kwargs).result()
+        
+        self.job_manager = JobManager(
+            jobs_dir=jobs_dir,
+            synthesize_fn=synthesize_item,
+            num_workers=jobs_config.get("workers", 1),
+            estimate_fn=self._estimate_inference_seconds if self.duration_estimator else None,
+            voice_store=self.voice_store
+        )
+    
+    def _estimate_inference_seconds(self, texts: List[str], voice_path: str) -> float:
+        """预计一组文本的推理耗时，用于批量合成任务的剩余时间"""
+        # 与模型副本记录时长统计时的参考语音键一致
+        if self.voice_store is not None:
+            voice_key = self.voice_store.get_key(voice_path)
+        else:
+            voice_key = TTSWrapper.get_voice_hash(voice_path)
+        return sum(self.duration_estimator.predict_inference_seconds(text, voice_key) for text in texts)
+    
+    @property
+    def model_pool(self) -> Optional[ModelPool]:
+        """已就绪的模型副本池，加载及预热完成前为 None"""
+        return self.model_loader.model if self.model_loader.is_ready else None
+    
+    @model_pool.setter
+    def model_pool(self, pool: Optional[ModelPool]):
+        self.model_loader.set_model(pool)
+    
+    def _load_model_pool(self, progress_callback) -> ModelPool:
+        """加载模型副本池"""
+        return ModelPool.from_config(
+            tts_config=self.settings.get_tts_config(),
+            pool_config=self.settings.get("model_pool", {}),
+            speaker_cache_config=self.settings.get_cache_config().get("speaker", {}),
+            voice_store=self.voice_store,
+            duration_estimator=self.duration_estimator,
+            progress_callback=progress_callback
+        )
+    
+    def initialize_tts(self):
+        """同步初始化 TTS 模型"""
+        self.model_loader.start(background=False)
+        if self.model_loader.is_ready:
             self.logger.info("TTS 模型初始化成功")
-        except Exception as e:
-            self.logger.error(f"TTS 模型初始化失败: {e}")
     
     def run(self):
         """运行 API 服务器"""
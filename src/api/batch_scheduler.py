@@ -0,0 +1,324 @@
+"""
+动态微批调度器 - 将短时间窗口内到达的请求按参考语音分组后批量推理
+"""
+
+import json
+import time
+import threading
+import logging
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+from .inference_executor import InferenceExecutor, QueueFullError
+from ..core.cancellation import CancelToken, RequestCancelledError
+
+
+class SynthesisRequest:
+    """待调度的合成请求"""
+
+    def __init__(self,
+                 text: str,
+                 voice_path: str,
+                 group_key: str,
+                 params: Dict[str, Any],
+                 seconds: Optional[float] = None,
+                 cancel_token: Optional[CancelToken] = None,
+                 priority: str = InferenceExecutor.INTERACTIVE,
+                 tenant: Optional[str] = None):
+        """
+        初始化合成请求
+
+        Args:
+            text: 要合成的文本
+            voice_path: 参考语音文件路径
+            group_key: 分组键，键相同的请求可以合并为一次批量推理
+            params: 合成参数（情感向量、情感强度等）
+            seconds: 预计音频时长（秒），未知时为 None
+            cancel_token: 取消令牌
+            priority: 推理优先级
+            tenant: 租户（API Key）
+        """
+        self.text = text
+        self.voice_path = voice_path
+        self.group_key = group_key
+        self.params = params
+        self.seconds = seconds
+        self.cancel_token = cancel_token
+        self.priority = priority
+        self.tenant = tenant
+        self.future = Future()
+        self.enqueued_at = time.monotonic()
+
+    @property
+    def tokens(self) -> int:
+        """请求的文本开销，以字符数近似"""
+        return max(1, len(self.text))
+
+    @property
+    def cancelled(self) -> bool:
+        """调用方已不再等待结果（已取消或已超过截止时间）"""
+        return self.future.cancelled() or (self.cancel_token is not None and self.cancel_token.cancelled)
+
+
+class BatchScheduler:
+    """动态微批调度器类"""
+
+    def __init__(self,
+                 dispatch_fn: Callable[[List[str], str, Dict[str, Any]], List[Any]],
+                 executor: Optional[InferenceExecutor] = None,
+                 window_ms: float = 10.0,
+                 max_batch_size: int = 8,
+                 max_batch_tokens: int = 1000,
+                 max_pending: int = 64,
+                 duration_fn: Optional[Callable[[str, str], float]] = None,
+                 max_batch_seconds: Optional[float] = None):
+        """
+        初始化调度器
+
+        Args:
+            dispatch_fn: 批量推理函数，参数为 (文本列表, 参考语音路径, 合成参数)，返回与文本一一对应的结果
+            executor: 推理执行器，为 None 时在调度线程中直接执行
+            window_ms: 收集请求的时间窗口（毫秒）
+            max_batch_size: 每批最大请求数
+            max_batch_tokens: 每批最大文本开销
+            max_pending: 等待调度的请求数上限，超出时拒绝
+            duration_fn: 预计音频时长函数，参数为 (文本, 参考音频内容哈希)，
+                如 DurationEstimator.predict_audio_seconds
+            max_batch_seconds: 每批最大预计音频时长（秒），需提供 duration_fn；
+                启用后组内按预计时长排序再切分，时长相近的请求同批推理，减少填充
+        """
+        self.dispatch_fn = dispatch_fn
+        self.executor = executor
+        self.window = max(0.0, float(window_ms)) / 1000.0
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_batch_tokens = max(1, int(max_batch_tokens))
+        self.max_pending = max(1, int(max_pending))
+        self.duration_fn = duration_fn
+        self.max_batch_seconds = float(max_batch_seconds) if max_batch_seconds else None
+
+        self._pending = []
+        self._pending_tokens = 0
+        self._condition = threading.Condition()
+        self._shutdown = False
+        self._stats = {"requests": 0, "batches": 0, "batched_requests": 0, "rejected": 0, "cancelled": 0}
+
+        self._thread = threading.Thread(target=self._loop, name="batch-scheduler", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_config(cls,
+                    config: Optional[Dict[str, Any]],
+                    dispatch_fn: Callable,
+                    executor: Optional[InferenceExecutor] = None,
+                    duration_fn: Optional[Callable[[str, str], float]] = None) -> "BatchScheduler":
+        """
+        根据配置创建调度器
+
+        Args:
+            config: scheduler 配置段
+            dispatch_fn: 批量推理函数
+            executor: 推理执行器
+            duration_fn: 预计音频时长函数
+
+        Returns:
+            BatchScheduler: 调度器实例
+        """
+        config = config or {}
+        return cls(
+            dispatch_fn=dispatch_fn,
+            executor=executor,
+            window_ms=config.get("window_ms", 10),
+            max_batch_size=config.get("max_batch_size", 8),
+            max_batch_tokens=config.get("max_batch_tokens", 1000),
+            max_pending=config.get("max_pending", 64),
+            duration_fn=duration_fn,
+            max_batch_seconds=config.get("max_batch_seconds")
+        )
+
+    @staticmethod
+    def make_group_key(voice_hash: str, params: Dict[str, Any]) -> str:
+        """
+        计算分组键：参考语音与合成参数均相同的请求才能合并
+
+        Args:
+            voice_hash: 参考音频内容哈希
+            params: 合成参数
+
+        Returns:
+            str: 分组键
+        """
+        return voice_hash + ":" + json.dumps(params, sort_keys=True, ensure_ascii=False)
+
+    def submit(self,
+               text: str,
+               voice_path: str,
+               voice_hash: str,
+               cancel_token: Optional[CancelToken] = None,
+               priority: str = InferenceExecutor.INTERACTIVE,
+               tenant: Optional[str] = None,
+               **params) -> Future:
+        """
+        提交合成请求
+
+        Args:
+            text: 要合成的文本
+            voice_path: 参考语音文件路径，需保持可用直到结果返回
+            voice_hash: 参考音频内容哈希
+            cancel_token: 取消令牌，组批与执行前检查，已取消的请求不参与推理
+            priority: 推理优先级，批次按其中最高的优先级提交到执行器
+            tenant: 租户（API Key），批次按其中第一个请求的租户计入公平排队
+            **params: 合成参数
+
+        Returns:
+            Future: 合成结果，值为 dispatch_fn 返回的对应元素；请求被取消时抛出 RequestCancelledError
+        """
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        seconds = self.duration_fn(text, voice_hash) if self.duration_fn else None
+        request = SynthesisRequest(
+            text, voice_path, self.make_group_key(voice_hash, params), params, seconds,
+            cancel_token, priority, tenant
+        )
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("调度器已关闭")
+            if len(self._pending) >= self.max_pending:
+                self._stats["rejected"] += 1
+                raise QueueFullError("调度队列已满")
+
+            self._pending.append(request)
+            self._pending_tokens += request.tokens
+            self._stats["requests"] += 1
+            self._condition.notify()
+        return request.future
+
+    def get_stats(self) -> dict:
+        """获取调度统计信息"""
+        with self._condition:
+            stats = dict(self._stats)
+            stats["pending"] = len(self._pending)
+            stats["avg_batch_size"] = (
+                stats["batched_requests"] / stats["batches"] if stats["batches"] else 0.0
+            )
+            return stats
+
+    def shutdown(self):
+        """关闭调度器，取消尚未调度的请求"""
+        with self._condition:
+            self._shutdown = True
+            for request in self._pending:
+                request.future.cancel()
+            self._pending = []
+            self._pending_tokens = 0
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _loop(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._shutdown:
+                    self._condition.wait()
+                if self._shutdown:
+                    return
+
+                # 等待时间窗口结束，或已凑满一批
+                deadline = self._pending[0].enqueued_at + self.window
+                while not self._shutdown:
+                    if (len(self._pending) >= self.max_batch_size
+                            or self._pending_tokens >= self.max_batch_tokens):
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                requests = self._pending
+                self._pending = []
+                self._pending_tokens = 0
+
+            for batch in self._form_batches(requests):
+                self._dispatch(batch)
+
+    def _form_batches(self, requests: List[SynthesisRequest]) -> List[List[SynthesisRequest]]:
+        """按分组键归并请求，并按批大小、文本开销与预计音频时长切分"""
+        groups = OrderedDict()
+        for request in self._drop_cancelled(requests):
+            groups.setdefault(request.group_key, []).append(request)
+
+        limit_seconds = self.max_batch_seconds if self.duration_fn else None
+        batches = []
+        for group in groups.values():
+            if limit_seconds:
+                # 批内音频按最长的一条填充，时长相近的请求放在同一批
+                group.sort(key=lambda request: request.seconds)
+            batch, tokens, seconds = [], 0, 0.0
+            for request in group:
+                if batch and (len(batch) >= self.max_batch_size
+                              or tokens + request.tokens > self.max_batch_tokens
+                              or (limit_seconds and seconds + request.seconds > limit_seconds)):
+                    batches.append(batch)
+                    batch, tokens, seconds = [], 0, 0.0
+                batch.append(request)
+                tokens += request.tokens
+                seconds += request.seconds or 0.0
+            if batch:
+                batches.append(batch)
+        return batches
+
+    def _dispatch(self, batch: List[SynthesisRequest]):
+        with self._condition:
+            self._stats["batches"] += 1
+            self._stats["batched_requests"] += len(batch)
+
+        if self.executor is None:
+            self._run_batch(batch)
+            return
+
+        try:
+            # 请求在进入调度器时已接纳，这里不再受执行器队列长度限制
+            priority = min((request.priority for request in batch), key=InferenceExecutor.PRIORITIES.index)
+            self.executor.submit_continuation(
+                self._run_batch, batch, priority=priority, tenant=batch[0].tenant
+            )
+        except Exception as e:
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+
+    def _drop_cancelled(self, requests: List[SynthesisRequest]) -> List[SynthesisRequest]:
+        """丢弃调用方已不再等待的请求，返回其余请求"""
+        kept = []
+        for request in requests:
+            if not request.cancelled:
+                kept.append(request)
+                continue
+            if not request.future.cancelled():
+                request.future.set_exception(RequestCancelledError(request.cancel_token.reason))
+            with self._condition:
+                self._stats["cancelled"] += 1
+        return kept
+
+    def _run_batch(self, batch: List[SynthesisRequest]):
+        """执行一批请求并将结果分发给各自的 Future"""
+        # 批次可能在执行器中排队，执行前再检查一次取消
+        batch = [
+            request for request in self._drop_cancelled(batch)
+            if request.future.set_running_or_notify_cancel()
+        ]
+        if not batch:
+            return
+
+        first = batch[0]
+        try:
+            results = self.dispatch_fn([request.text for request in batch], first.voice_path, first.params)
+            if len(results) != len(batch):
+                raise RuntimeError(f"批量推理结果数量不匹配: {len(results)} != {len(batch)}")
+        except BaseException as e:
+            logging.error(f"批量推理失败: {e}")
+            for request in batch:
+                request.future.set_exception(e)
+            return
+
+        for request, result in zip(batch, results):
+            request.future.set_result(result)
@@ -0,0 +1,408 @@
+"""
+推理执行器 - 在独立线程中执行阻塞的模型调用，避免阻塞事件循环
+"""
+
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+import logging
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+from ..core.cancellation import CancelToken, RequestCancelledError
+from ..utils.metrics import metrics
+
+
+class QueueFullError(Exception):
+    """推理队列已满"""
+
+
+class _Task:
+    """排队中的推理任务"""
+
+    __slots__ = ("future", "fn", "args", "kwargs", "token", "priority", "tenant", "enqueued_at")
+
+    def __init__(self, fn: Callable, args: tuple, kwargs: dict,
+                 token: Optional[CancelToken], priority: str, tenant: str):
+        self.future = Future()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.token = token
+        self.priority = priority
+        self.tenant = tenant
+        self.enqueued_at = time.monotonic()
+
+    @property
+    def cancelled(self) -> bool:
+        """调用方已不再等待结果"""
+        return self.future.cancelled() or (self.token is not None and self.token.cancelled)
+
+
+class _FairQueue:
+    """单个优先级内按租户加权公平排队：虚拟完成时间最小的任务先出队"""
+
+    # 记录的租户数超过该值时清理已落后于虚拟时钟的租户
+    MAX_TENANTS = 1024
+
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+        self._finish: Dict[str, float] = {}
+        self._vtime = 0.0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __iter__(self):
+        return (item[-1] for item in self._heap)
+
+    def push(self, task: _Task, weight: float):
+        """入队：每个任务开销为 1，权重越大的租户虚拟完成时间增长越慢"""
+        start = max(self._vtime, self._finish.get(task.tenant, 0.0))
+        finish = start + 1.0 / weight
+        self._finish[task.tenant] = finish
+        heapq.heappush(self._heap, (finish, next(self._seq), start, task))
+
+    def pop(self) -> _Task:
+        """出队虚拟完成时间最小的任务，并推进虚拟时钟"""
+        _, _, start, task = heapq.heappop(self._heap)
+        self._vtime = max(self._vtime, start)
+        if len(self._finish) > self.MAX_TENANTS:
+            self._finish = {tenant: finish for tenant, finish in self._finish.items() if finish > self._vtime}
+        return task
+
+    def remove(self, predicate: Callable[[_Task], bool]) -> List[_Task]:
+        """移出满足条件的任务，返回被移出的任务"""
+        removed = [item[-1] for item in self._heap if predicate(item[-1])]
+        if removed:
+            self._heap = [item for item in self._heap if not predicate(item[-1])]
+            heapq.heapify(self._heap)
+        return removed
+
+
+class InferenceExecutor:
+    """
+    有界推理执行器类
+
+    任务分为 interactive（在线请求）与 bulk（批量合成）两个优先级，空闲的工作线程总是先取 interactive 任务；
+    同一优先级内按租户（API Key）加权公平排队，提交大量任务的租户不会独占执行器。
+    批量任务按条目与分段提交，交互请求到达后在下一个分段边界即可插队。
+    """
+
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
+    # 按优先级从高到低排列
+    PRIORITIES = (INTERACTIVE, BULK)
+    DEFAULT_TENANT = "default"
+
+    def __init__(self,
+                 max_workers: int = 1,
+                 max_queue_size: int = 16,
+                 name: str = "inference",
+                 tenant_weights: Optional[Dict[str, float]] = None,
+                 default_weight: float = 1.0,
+                 wait_window: int = 1024):
+        """
+        初始化推理执行器
+
+        Args:
+            max_workers: 并发执行的推理任务数
+            max_queue_size: 每个优先级等待队列的最大长度，超出时拒绝该优先级的新任务
+            name: 工作线程名前缀
+            tenant_weights: 各租户（API Key）的权重，权重越大分得的推理份额越多
+            default_weight: 未配置租户的权重
+            wait_window: 统计排队等待时间分位数的最近任务数
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue_size = max(0, int(max_queue_size))
+        self.name = name
+        self.tenant_weights = {str(key): float(value) for key, value in (tenant_weights or {}).items()}
+        self.default_weight = float(default_weight)
+
+        self._queues = {priority: _FairQueue() for priority in self.PRIORITIES}
+        self._condition = threading.Condition()
+        self._running = 0
+        self._shutdown = False
+        self._stats = {
+            priority: {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "cancelled": 0, "running": 0}
+            for priority in self.PRIORITIES
+        }
+        self._waits = {priority: deque(maxlen=max(1, int(wait_window))) for priority in self.PRIORITIES}
+
+        self._workers = []
+        for i in range(self.max_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"{name}-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "InferenceExecutor":
+        """
+        根据配置创建执行器
+
+        Args:
+            config: api 配置段
+
+        Returns:
+            InferenceExecutor: 执行器实例
+        """
+        config = config or {}
+        return cls(
+            max_workers=config.get("inference_workers", 1),
+            max_queue_size=config.get("max_queue_size", 16),
+            tenant_weights=config.get("tenant_weights"),
+            default_weight=config.get("default_tenant_weight", 1.0)
+        )
+
+    def check_capacity(self, priority: str = INTERACTIVE):
+        """检查该优先级是否还能接纳新请求，队列已满时抛出 QueueFullError"""
+        priority = self._check_priority(priority)
+        with self._condition:
+            dropped = self._drop_cancelled()
+            full = self._is_full(priority)
+            if full:
+                self._stats[priority]["rejected"] += 1
+        self._fail_cancelled(dropped)
+        if full:
+            raise QueueFullError("推理队列已满")
+
+    def submit(self,
+               fn: Callable,
+               *args,
+               cancel_token: Optional[CancelToken] = None,
+               priority: str = INTERACTIVE,
+               tenant: Optional[str] = None,
+               **kwargs) -> Future:
+        """
+        提交任务，该优先级的队列已满时抛出 QueueFullError
+
+        Args:
+            fn: 要执行的函数
+            *args: 位置参数
+            cancel_token: 取消令牌，已取消或超过截止时间的任务不再执行，取消时立即移出队列
+            priority: 优先级，INTERACTIVE 或 BULK
+            tenant: 租户（API Key），为 None 时归入默认租户
+            **kwargs: 关键字参数
+
+        Returns:
+            Future: 任务结果，任务被取消时抛出 RequestCancelledError
+        """
+        return self._enqueue(fn, args, kwargs, True, cancel_token, priority, tenant)
+
+    def submit_continuation(self,
+                            fn: Callable,
+                            *args,
+                            cancel_token: Optional[CancelToken] = None,
+                            priority: str = INTERACTIVE,
+                            tenant: Optional[str] = None,
+                            **kwargs) -> Future:
+        """
+        提交已被接纳请求的后续任务（如流式合成的后续分段），不受队列长度限制
+
+        Args:
+            fn: 要执行的函数
+            *args: 位置参数
+            cancel_token: 取消令牌
+            priority: 优先级
+            tenant: 租户
+            **kwargs: 关键字参数
+
+        Returns:
+            Future: 任务结果
+        """
+        return self._enqueue(fn, args, kwargs, False, cancel_token, priority, tenant)
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """在执行器中运行任务并等待结果，参数同 submit"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    async def run_continuation(self, fn: Callable, *args, **kwargs) -> Any:
+        """在执行器中运行后续任务并等待结果，参数同 submit_continuation"""
+        return await asyncio.wrap_future(self.submit_continuation(fn, *args, **kwargs))
+
+    def get_stats(self) -> dict:
+        """获取执行器统计信息，classes 为各优先级的队列深度、执行数与排队等待时间"""
+        with self._condition:
+            classes = {}
+            for priority in self.PRIORITIES:
+                stats = dict(self._stats[priority])
+                stats["queued"] = len(self._queues[priority])
+                stats.update(self._wait_stats(priority))
+                classes[priority] = stats
+
+        totals = {
+            key: sum(stats[key] for stats in classes.values())
+            for key in ("submitted", "completed", "failed", "rejected", "cancelled", "queued", "running")
+        }
+        totals["max_workers"] = self.max_workers
+        totals["max_queue_size"] = self.max_queue_size
+        totals["classes"] = classes
+        return totals
+
+    def shutdown(self, wait: bool = True):
+        """
+        关闭执行器，取消尚未开始的任务
+
+        Args:
+            wait: 是否等待正在执行的任务完成
+        """
+        with self._condition:
+            self._shutdown = True
+            for queue in self._queues.values():
+                for task in queue.remove(lambda task: True):
+                    task.future.cancel()
+            self._condition.notify_all()
+
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def _check_priority(self, priority: str) -> str:
+        if priority not in self._queues:
+            raise ValueError(f"未知的优先级: {priority}，可选: {', '.join(self.PRIORITIES)}")
+        return priority
+
+    def _is_full(self, priority: str) -> bool:
+        """该优先级的队列是否已满（调用方需持有锁）"""
+        return len(self._queues[priority]) >= self.max_queue_size and self._running >= self.max_workers
+
+    def _enqueue(self,
+                 fn: Callable,
+                 args: tuple,
+                 kwargs: dict,
+                 check_limit: bool,
+                 token: Optional[CancelToken],
+                 priority: str,
+                 tenant: Optional[str]) -> Future:
+        priority = self._check_priority(priority)
+        if token is not None:
+            token.raise_if_cancelled()
+        task = _Task(fn, args, kwargs, token, priority, tenant or self.DEFAULT_TENANT)
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("推理执行器已关闭")
+            # 先清理已取消与已过期的任务，无人等待的请求不占用队列容量
+            dropped = self._drop_cancelled() if check_limit else []
+            full = check_limit and self._is_full(priority)
+            if full:
+                self._stats[priority]["rejected"] += 1
+            else:
+                self._queues[priority].push(task, self.tenant_weights.get(task.tenant, self.default_weight))
+                self._stats[priority]["submitted"] += 1
+                self._condition.notify()
+        self._fail_cancelled(dropped)
+        if full:
+            raise QueueFullError("推理队列已满")
+
+        if token is not None:
+            token.add_callback(lambda _: self._cancel_queued(task))
+        return task.future
+
+    def _cancel_queued(self, target: _Task):
+        """令牌取消时将对应任务移出队列，已开始执行的任务不受影响"""
+        with self._condition:
+            removed = self._queues[target.priority].remove(lambda task: task is target)
+            self._stats[target.priority]["cancelled"] += len(removed)
+        self._fail_cancelled(removed)
+
+    def _drop_cancelled(self) -> List[_Task]:
+        """移出队列中已取消或已超过截止时间的任务（调用方需持有锁），返回被移出的任务"""
+        dropped = []
+        for priority, queue in self._queues.items():
+            removed = queue.remove(lambda task: task.cancelled)
+            self._stats[priority]["cancelled"] += len(removed)
+            dropped.extend(removed)
+        return dropped
+
+    @staticmethod
+    def _fail_cancelled(tasks: List[_Task]):
+        """以 RequestCancelledError 结束被移出队列的任务（不能持有锁，Future 回调会同步执行）"""
+        for task in tasks:
+            reason = task.token.reason if task.token is not None else None
+            if not task.future.cancelled():
+                task.future.set_exception(RequestCancelledError(reason or CancelToken.CANCELLED))
+
+    def _next_task(self) -> Optional[_Task]:
+        """按优先级取下一个任务（调用方需持有锁）"""
+        for priority in self.PRIORITIES:
+            if self._queues[priority]:
+                return self._queues[priority].pop()
+        return None
+
+    def _wait_stats(self, priority: str) -> dict:
+        """最近任务的排队等待时间统计（调用方需持有锁）"""
+        waits = sorted(self._waits[priority])
+        if not waits:
+            return {"wait_avg": 0.0, "wait_p50": 0.0, "wait_p95": 0.0, "wait_p99": 0.0, "wait_max": 0.0}
+
+        def percentile(q: float) -> float:
+            return waits[min(len(waits) - 1, int(q * len(waits)))]
+
+        return {
+            "wait_avg": sum(waits) / len(waits),
+            "wait_p50": percentile(0.50),
+            "wait_p95": percentile(0.95),
+            "wait_p99": percentile(0.99),
+            "wait_max": waits[-1]
+        }
+
+    def _worker_loop(self):
+        while True:
+            with self._condition:
+                while not any(self._queues.values()) and not self._shutdown:
+                    self._condition.wait()
+                task = self._next_task()
+                if task is None:
+                    return
+                stats = self._stats[task.priority]
+                # 出队前再检查一次：排队期间已过截止时间的任务直接丢弃
+                expired = task.cancelled
+                if expired:
+                    stats["cancelled"] += 1
+                else:
+                    wait = time.monotonic() - task.enqueued_at
+                    self._waits[task.priority].append(wait)
+                    self._running += 1
+                    stats["running"] += 1
+
+            if expired:
+                self._fail_cancelled([task])
+                continue
+
+            metrics.observe("inference_wait_seconds", wait, priority=task.priority)
+            try:
+                # 等待期间已被取消的任务直接跳过
+                if task.future.set_running_or_notify_cancel():
+                    result, error = None, None
+                    try:
+                        result = task.fn(*task.args, **task.kwargs)
+                        outcome = "completed"
+                    except RequestCancelledError as e:
+                        # 执行中途的协作式取消（截止时间、客户端断开）与出队前取消一样计入 cancelled
+                        logging.debug(f"推理任务已取消: {e.reason}")
+                        error, outcome = e, "cancelled"
+                    except Exception as e:
+                        logging.error(f"推理任务执行失败: {e}")
+                        error, outcome = e, "failed"
+                    except BaseException as e:
+                        # SystemExit、KeyboardInterrupt 等：调用方的 Future 仍需结束，之后继续向上抛出
+                        with self._condition:
+                            stats["failed"] += 1
+                        task.future.set_exception(e)
+                        raise
+
+                    # 先更新统计再设置结果，调用方拿到结果时统计已包含该任务
+                    with self._condition:
+                        stats[outcome] += 1
+                    if error is None:
+                        task.future.set_result(result)
+                    else:
+                        task.future.set_exception(error)
+            finally:
+                with self._condition:
+                    self._running -= 1
+                    stats["running"] -= 1
@@ -0,0 +1,395 @@
+"""
+批量合成任务管理 - 异步提交、进度查询与结果下载
+"""
+
+import os
+import json
+import time
+import uuid
+import queue
+import shutil
+import sqlite3
+import zipfile
+import threading
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from ..core.voice_store import VoiceStore
+
+
+class JobStore:
+    """基于 SQLite 的任务持久化存储类"""
+
+    def __init__(self, db_path: Union[str, Path]):
+        """
+        初始化任务存储
+
+        Args:
+            db_path: SQLite 数据库文件路径
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._create_tables()
+
+    def _create_tables(self):
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    voice_path TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    total INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    error TEXT
+                );
+                CREATE TABLE IF NOT EXISTS job_items (
+                    job_id TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    text TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    output_path TEXT,
+                    error TEXT,
+                    started_at REAL,
+                    finished_at REAL,
+                    PRIMARY KEY (job_id, idx)
+                );
+            """)
+
+    def create_job(self, job_id: str, texts: List[str], voice_path: str, params: Dict[str, Any]):
+        """创建任务及其条目"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, voice_path, params, total, created_at, updated_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, voice_path, json.dumps(params, ensure_ascii=False), len(texts), now, now)
+            )
+            self._conn.executemany(
+                "INSERT INTO job_items (job_id, idx, text, status) VALUES (?, ?, ?, 'pending')",
+                [(job_id, i, text) for i, text in enumerate(texts)]
+            )
+
+    def update_job(self, job_id: str, status: str, error: Optional[str] = None):
+        """更新任务状态"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, error, time.time(), job_id)
+            )
+
+    def update_item(self, job_id: str, idx: int, status: str,
+                    output_path: Optional[str] = None, error: Optional[str] = None):
+        """更新任务条目状态"""
+        now = time.time()
+        with self._lock, self._conn:
+            if status == "running":
+                self._conn.execute(
+                    "UPDATE job_items SET status = ?, started_at = ? WHERE job_id = ? AND idx = ?",
+                    (status, now, job_id, idx)
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE job_items SET status = ?, output_path = ?, error = ?, finished_at = ? "
+                    "WHERE job_id = ? AND idx = ?",
+                    (status, output_path, error, now, job_id, idx)
+                )
+            self._conn.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (now, job_id))
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """获取任务信息，不含条目"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = dict(row)
+            job["params"] = json.loads(job["params"])
+            counts = self._conn.execute(
+                "SELECT status, COUNT(*) FROM job_items WHERE job_id = ? GROUP BY status", (job_id,)
+            ).fetchall()
+        job["progress"] = {status: count for status, count in counts}
+        return job
+
+    def get_items(self, job_id: str) -> List[Dict[str, Any]]:
+        """获取任务的全部条目"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM job_items WHERE job_id = ? ORDER BY idx", (job_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_item(self, job_id: str, idx: int) -> Optional[Dict[str, Any]]:
+        """获取单个任务条目"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM job_items WHERE job_id = ? AND idx = ?", (job_id, idx)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def list_jobs(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """按创建时间倒序列出任务"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, status, total, created_at, updated_at FROM jobs "
+                "ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def unfinished_jobs(self) -> List[str]:
+        """获取未完成的任务 ID（用于重启后恢复）"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+class JobManager:
+    """批量合成任务管理类"""
+
+    def __init__(self,
+                 jobs_dir: Union[str, Path],
+                 synthesize_fn: Callable[..., bool],
+                 num_workers: int = 1,
+                 estimate_fn: Optional[Callable[[List[str], str], float]] = None,
+                 voice_store: Optional[VoiceStore] = None):
+        """
+        初始化任务管理器
+
+        Args:
+            jobs_dir: 任务目录，存放数据库、参考语音和合成结果
+            synthesize_fn: 合成函数，签名同 TTSWrapper.synthesize；提交时指定了租户的任务额外传入 tenant 参数
+            num_workers: 并行处理的任务数
+            estimate_fn: 预计推理耗时函数，参数为 (文本列表, 参考语音路径)，返回总秒数，用于估算剩余时间
+            voice_store: 参考语音存储，其中的规范化文件直接引用而不复制
+        """
+        self.jobs_dir = Path(jobs_dir)
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        self.synthesize_fn = synthesize_fn
+        self.estimate_fn = estimate_fn
+        self.voice_store = voice_store
+        self.num_workers = max(1, int(num_workers))
+        self.store = JobStore(self.jobs_dir / "jobs.db")
+
+        self._queue = queue.Queue()
+        self._cancelled = set()
+        # 任务 ID -> 租户（API Key），只保存在内存中，不写入数据库，重启后恢复的任务归入默认租户
+        self._tenants: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._workers = []
+        for i in range(self.num_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+        # 恢复上次未完成的任务
+        for job_id in self.store.unfinished_jobs():
+            self._queue.put(job_id)
+
+    def submit(self,
+               texts: List[str],
+               voice_data: Union[bytes, str],
+               params: Optional[Dict[str, Any]] = None,
+               tenant: Optional[str] = None) -> str:
+        """
+        提交批量合成任务
+
+        Args:
+            texts: 文本列表
+            voice_data: 参考语音文件内容，或参考语音文件路径（如已注册的参考语音）
+            params: 合成参数
+            tenant: 租户（API Key），用于推理执行器的公平排队
+
+        Returns:
+            str: 任务 ID
+        """
+        job_id = uuid.uuid4().hex
+        job_dir = self.job_dir(job_id)
+        job_dir.mkdir(parents=True, exist_ok=True)
+
+        # 复制一份参考语音，任务执行期间源文件被删除也不受影响；
+        # 存储中的规范化文件直接引用，沿用其存储键与已缓存的说话人条件，复制后会被当作新语音重新处理
+        voice_path = job_dir / "voice.wav"
+        if self.voice_store is not None and self.voice_store.contains(voice_data):
+            voice_path = Path(voice_data)
+        elif isinstance(voice_data, (str, Path)):
+            shutil.copyfile(voice_data, voice_path)
+        else:
+            with open(voice_path, 'wb') as f:
+                f.write(voice_data)
+
+        self.store.create_job(job_id, texts, str(voice_path), params or {})
+        if tenant:
+            with self._lock:
+                self._tenants[job_id] = tenant
+        self._queue.put(job_id)
+        logging.info(f"已提交批量合成任务 {job_id}，共 {len(texts)} 条")
+        return job_id
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        取消任务，正在合成的条目完成后停止
+
+        Args:
+            job_id: 任务 ID
+
+        Returns:
+            bool: 任务是否存在且尚未结束
+        """
+        job = self.store.get_job(job_id)
+        if job is None or job["status"] not in ("queued", "running"):
+            return False
+
+        with self._lock:
+            self._cancelled.add(job_id)
+        self.store.update_job(job_id, "cancelled")
+        return True
+
+    def job_dir(self, job_id: str) -> Path:
+        """获取任务目录"""
+        return self.jobs_dir / job_id
+
+    def build_archive(self, job_id: str) -> Optional[Path]:
+        """
+        将已完成的条目打包为 zip
+
+        Args:
+            job_id: 任务 ID
+
+        Returns:
+            Optional[Path]: zip 文件路径，没有可打包的结果时返回 None
+        """
+        items = [item for item in self.store.get_items(job_id) if item["status"] == "completed"]
+        if not items:
+            return None
+
+        archive_path = self.job_dir(job_id) / "results.zip"
+        tmp_path = archive_path.with_suffix(".tmp")
+        # WAV 压缩率很低，直接存储即可
+        with zipfile.ZipFile(tmp_path, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for item in items:
+                archive.write(item["output_path"], arcname=os.path.basename(item["output_path"]))
+        os.replace(tmp_path, archive_path)
+        return archive_path
+
+    def estimate_remaining(self, job_id: str) -> Optional[float]:
+        """
+        估算任务的剩余时间
+
+        排队中的任务还需等待排在前面的未完成任务，按并行任务数分摊。
+
+        Args:
+            job_id: 任务 ID
+
+        Returns:
+            Optional[float]: 预计剩余秒数，任务已结束或未提供 estimate_fn 时返回 None
+        """
+        job = self.store.get_job(job_id)
+        if self.estimate_fn is None or job is None or job["status"] not in ("queued", "running"):
+            return None
+
+        remaining = self._remaining_seconds(job)
+        if job["status"] == "queued":
+            ahead = 0.0
+            for other_id in self.store.unfinished_jobs():
+                if other_id == job_id:
+                    break
+                other = self.store.get_job(other_id)
+                if other is not None:
+                    ahead += self._remaining_seconds(other)
+            remaining += ahead / self.num_workers
+        return remaining
+
+    def _remaining_seconds(self, job: Dict[str, Any]) -> float:
+        """未完成条目的预计推理耗时，进行中的条目扣除已用时间"""
+        pending, running = [], []
+        for item in self.store.get_items(job["id"]):
+            if item["status"] == "pending":
+                pending.append(item["text"])
+            elif item["status"] == "running":
+                running.append(item)
+
+        seconds = self.estimate_fn(pending, job["voice_path"]) if pending else 0.0
+        now = time.time()
+        for item in running:
+            expected = self.estimate_fn([item["text"]], job["voice_path"])
+            seconds += max(0.0, expected - (now - item["started_at"]))
+        return seconds
+
+    def get_stats(self) -> dict:
+        """获取任务队列统计信息"""
+        return {"queued_jobs": self._queue.qsize()}
+
+    def _is_cancelled(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._cancelled
+
+    def _worker_loop(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._run_job(job_id)
+            except Exception as e:
+                logging.error(f"批量合成任务 {job_id} 执行异常: {e}")
+                self.store.update_job(job_id, "failed", error=str(e))
+            finally:
+                with self._lock:
+                    self._tenants.pop(job_id, None)
+                self._queue.task_done()
+
+    def _run_job(self, job_id: str):
+        job = self.store.get_job(job_id)
+        if job is None or job["status"] not in ("queued", "running") or self._is_cancelled(job_id):
+            return
+
+        self.store.update_job(job_id, "running")
+        job_dir = self.job_dir(job_id)
+        with self._lock:
+            tenant = self._tenants.get(job_id)
+        extra = {"tenant": tenant} if tenant else {}
+
+        for item in self.store.get_items(job_id):
+            if item["status"] == "completed":
+                continue
+            if self._is_cancelled(job_id):
+                logging.info(f"批量合成任务 {job_id} 已取消")
+                return
+
+            idx = item["idx"]
+            output_path = str(job_dir / f"output_{idx:04d}.wav")
+            self.store.update_item(job_id, idx, "running")
+            try:
+                success = self.synthesize_fn(
+                    text=item["text"],
+                    voice_path=job["voice_path"],
+                    output_path=output_path,
+                    **extra,
+                    **job["params"]
+                )
+                error = None if success else "语音合成失败"
+            except Exception as e:
+                success, error = False, str(e)
+
+            if success:
+                self.store.update_item(job_id, idx, "completed", output_path=output_path)
+            else:
+                logging.warning(f"任务 {job_id} 第 {idx+1} 条合成失败: {error}")
+                self.store.update_item(job_id, idx, "failed", error=error)
+
+        if self._is_cancelled(job_id):
+            return
+
+        progress = self.store.get_job(job_id)["progress"]
+        status = "completed" if progress.get("completed", 0) > 0 else "failed"
+        self.store.update_job(job_id, status)
+        logging.info(f"批量合成任务 {job_id} 结束: {progress}")
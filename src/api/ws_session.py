@@ -0,0 +1,169 @@
+"""
+WebSocket 双工合成会话 - 客户端逐片推送文本，服务端凑成完整句子后合成并推送音频
+"""
+
+import json
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional, Tuple
+
+import numpy as np
+from fastapi import WebSocket, WebSocketDisconnect
+
+from .inference_executor import QueueFullError
+from ..core.cancellation import CancelToken, RequestCancelledError
+from ..core.voice_store import InvalidVoiceError
+from ..utils.text_utils import IncrementalSegmenter
+
+
+class SynthesisSession:
+    """
+    WebSocket 合成会话类
+
+    客户端消息（JSON 文本帧）：
+        {"type": "text", "text": "..."}  追加文本片段
+        {"type": "flush"}                 缓冲中的剩余文本立即作为一段合成（如一轮回复结束）
+        {"type": "cancel"}                打断：丢弃缓冲文本、排队分段与正在合成分段的结果
+        {"type": "end"}                   合成剩余文本，全部推送后结束会话
+
+    服务端消息：
+        {"type": "segment_start", ...}    分段元信息，随后是一个二进制帧，为该段完整的编码音频
+        {"type": "segment_end", "index"}  分段结束
+        {"type": "cancelled"}             打断完成
+        {"type": "error", ...}            出错，status 同 HTTP 状态码，分段出错时带 index
+        {"type": "done"}                  会话结束
+    """
+
+    def __init__(self,
+                 websocket: WebSocket,
+                 synthesize_fn: Callable[[str, CancelToken], Awaitable[Optional[Tuple[int, np.ndarray]]]],
+                 encode_fn: Callable[[np.ndarray, int], Awaitable[Tuple[bytes, int]]],
+                 max_length: int = 120):
+        """
+        初始化会话
+
+        Args:
+            websocket: 已接受的 WebSocket 连接
+            synthesize_fn: 合成单段文本，参数为 (文本, 取消令牌)，返回 (采样率, 音频数据)，文本清洗后为空时返回 None
+            encode_fn: 编码单段音频，返回 (编码数据, 输出采样率)
+            max_length: 每段最大长度
+        """
+        self.websocket = websocket
+        self.synthesize_fn = synthesize_fn
+        self.encode_fn = encode_fn
+        self.segmenter = IncrementalSegmenter(max_length)
+        self.logger = logging.getLogger(__name__)
+
+        # 队列元素为 (代次, 序号, 文本)，None 表示输入结束；打断时代次加一，旧代次的分段全部丢弃
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._generation = 0
+        # 当前代次的取消令牌：打断或断开时取消，排队中的推理任务随之出队
+        self._token = CancelToken()
+        self._next_index = 0
+        # 分段的元信息、音频与结束标记需连续发送，不能被其他消息插入
+        self._send_lock = asyncio.Lock()
+
+    async def run(self):
+        """接收客户端消息直到会话结束，连接断开时抛出 WebSocketDisconnect"""
+        worker = asyncio.create_task(self._synthesize_loop())
+        try:
+            await self._receive_loop(worker)
+        finally:
+            self._token.cancel(CancelToken.DISCONNECTED)
+            if not worker.done():
+                worker.cancel()
+                try:
+                    await worker
+                except (asyncio.CancelledError, WebSocketDisconnect):
+                    pass
+
+    async def _receive_loop(self, worker: asyncio.Task):
+        while True:
+            received = await self.websocket.receive()
+            if received["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(received.get("code", 1000))
+            try:
+                message = json.loads(received.get("text") or "")
+                msg_type = message.get("type")
+            except (ValueError, AttributeError):
+                await self._send_json({"type": "error", "status": 400, "detail": "消息需为 JSON 对象文本帧"})
+                continue
+
+            if msg_type == "text":
+                self._enqueue(self.segmenter.push(str(message.get("text", ""))))
+            elif msg_type == "flush":
+                self._enqueue(self.segmenter.flush())
+            elif msg_type == "cancel":
+                self._cancel()
+                await self._send_json({"type": "cancelled"})
+            elif msg_type == "end":
+                self._enqueue(self.segmenter.flush())
+                self._queue.put_nowait(None)
+                await worker
+                await self._send_json({"type": "done"})
+                return
+            else:
+                await self._send_json({"type": "error", "status": 400, "detail": f"未知消息类型: {msg_type}"})
+
+    def _enqueue(self, segments):
+        for segment in segments:
+            self._queue.put_nowait((self._generation, self._next_index, segment))
+            self._next_index += 1
+
+    def _cancel(self):
+        """打断：丢弃缓冲与排队的文本，正在合成的分段完成后也不再推送"""
+        self._generation += 1
+        self._token.cancel()
+        self._token = CancelToken()
+        self.segmenter.clear()
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+    async def _synthesize_loop(self):
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            generation, index, text = item
+            if generation != self._generation:
+                continue
+
+            try:
+                result = await self.synthesize_fn(text, self._token)
+                if result is None or generation != self._generation:
+                    continue
+                sample_rate, audio = result
+                data, output_sample_rate = await self.encode_fn(audio, sample_rate)
+            except RequestCancelledError:
+                continue
+            except QueueFullError:
+                await self._send_json({"type": "error", "index": index, "status": 429,
+                                       "detail": "推理队列已满，该段已跳过"})
+                continue
+            except InvalidVoiceError as e:
+                await self._send_json({"type": "error", "index": index, "status": 400,
+                                       "detail": str(e)})
+                continue
+            except Exception as e:
+                self.logger.error(f"WebSocket 分段合成异常: {e}")
+                await self._send_json({"type": "error", "index": index, "status": 500,
+                                       "detail": f"语音合成异常: {str(e)}"})
+                continue
+
+            if generation != self._generation:
+                continue
+            async with self._send_lock:
+                await self.websocket.send_json({
+                    "type": "segment_start",
+                    "index": index,
+                    "text": text,
+                    "sample_rate": output_sample_rate,
+                    "duration": len(audio) / sample_rate,
+                    "bytes": len(data)
+                })
+                await self.websocket.send_bytes(data)
+                await self.websocket.send_json({"type": "segment_end", "index": index})
+
+    async def _send_json(self, message: dict):
+        async with self._send_lock:
+            await self.websocket.send_json(message)
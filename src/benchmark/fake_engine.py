@@ -0,0 +1,104 @@
+"""
+基准用假引擎 - 接口与 IndexTTS2.infer 一致，按字符数模拟推理延迟，无需模型文件即可在 CPU 上压测服务
+"""
+
+import time
+import random
+import importlib
+import threading
+from contextlib import nullcontext
+from typing import Any, Callable, Optional
+
+from ..core.stub_engine import StubTTSEngine
+from ..core.tts_wrapper import TTSWrapper
+from ..core.model_pool import ModelPool
+from ..core.voice_store import VoiceStore
+from ..core.duration_estimator import DurationEstimator
+
+DEFAULT_ENGINE = "src.benchmark.fake_engine:FakeTTSEngine"
+
+
+class FakeTTSEngine(StubTTSEngine):
+    """假引擎类：在桩引擎的基础上加入延迟抖动，并像单卡上的真实模型一样一次只执行一个推理"""
+
+    def __init__(self,
+                 sample_rate: int = 22050,
+                 audio_seconds_per_char: float = 0.2,
+                 base_latency: float = 0.05,
+                 latency_per_char: float = 0.005,
+                 conditioning_latency: float = 0.0,
+                 jitter: float = 0.0,
+                 seed: Optional[int] = None,
+                 serialize: bool = True):
+        """
+        初始化假引擎
+
+        Args:
+            sample_rate: 输出采样率
+            audio_seconds_per_char: 每个字符生成的音频时长（秒）
+            base_latency: 每次推理调用的固定延迟（秒）
+            latency_per_char: 每个字符的推理延迟（秒）
+            conditioning_latency: 计算说话人条件的延迟（秒）
+            jitter: 延迟的相对抖动幅度，如 0.2 表示在 ±20% 内均匀分布
+            seed: 抖动的随机种子
+            serialize: 是否串行执行推理，为 False 时并发调用的延迟互不影响
+        """
+        super().__init__(
+            sample_rate=sample_rate,
+            audio_seconds_per_char=audio_seconds_per_char,
+            base_latency=base_latency,
+            latency_per_char=latency_per_char,
+            conditioning_latency=conditioning_latency
+        )
+        self.jitter = max(0.0, float(jitter))
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._infer_lock = threading.Lock() if serialize else None
+
+    def _simulate_latency(self, chars: int):
+        latency = self.base_latency + self.latency_per_char * chars
+        if self.jitter:
+            with self._random_lock:
+                latency *= 1.0 + self._random.uniform(-self.jitter, self.jitter)
+        with self._infer_lock or nullcontext():
+            time.sleep(max(0.0, latency))
+
+
+def create_engine(spec: str = DEFAULT_ENGINE, **params) -> Any:
+    """
+    按 "模块:类名" 创建推理引擎，便于替换为自定义的假引擎
+
+    Args:
+        spec: 引擎类路径，如 "src.benchmark.fake_engine:FakeTTSEngine"
+        **params: 引擎构造参数
+
+    Returns:
+        Any: 引擎实例，需提供与 IndexTTS2.infer 相同签名的 infer 方法
+    """
+    module_name, sep, class_name = spec.partition(":")
+    if not sep or not module_name or not class_name:
+        raise ValueError(f"引擎路径需为 模块:类名 格式: {spec}")
+    engine_class = getattr(importlib.import_module(module_name), class_name)
+    return engine_class(**params)
+
+
+def build_model_pool(engine_factory: Callable[[], Any],
+                     replicas: int = 1,
+                     voice_store: Optional[VoiceStore] = None,
+                     duration_estimator: Optional[DurationEstimator] = None) -> ModelPool:
+    """
+    用假引擎构建模型副本池，每个副本使用独立的引擎实例
+
+    Args:
+        engine_factory: 创建引擎的函数
+        replicas: 副本数
+        voice_store: 参考语音存储，所有副本共用
+        duration_estimator: 时长估计器，所有副本共用
+
+    Returns:
+        ModelPool: 模型副本池
+    """
+    return ModelPool([
+        TTSWrapper(engine=engine_factory(), voice_store=voice_store, duration_estimator=duration_estimator)
+        for _ in range(max(1, int(replicas)))
+    ])
@@ -0,0 +1,560 @@
+"""
+负载测试 - 以指定并发驱动 /synthesize、/synthesize/stream、/batch_synthesize 或 Python API，
+输出吞吐、延迟分位数、首字节时间（TTFB）与实时率（RTF，音频秒数 / 耗时秒数）的 JSON 报告，并可与基线报告对比
+
+未指定 --url 时在本进程内用假引擎启动服务，无需模型文件即可在 CPU 上运行
+
+用法:
+    python -m src.benchmark.load_test [--target http|python] [--scenario synthesize] [--requests 50]
+        [--concurrency 4] [--url http://127.0.0.1:8000] [--output report.json] [--baseline old.json]
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import logging
+import tempfile
+import threading
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import soundfile as sf
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.benchmark.fake_engine import DEFAULT_ENGINE, create_engine, build_model_pool
+from src.core.model_pool import ModelPool
+
+SCENARIOS = ("synthesize", "stream", "batch")
+
+# 不同长度的典型请求文本，按请求序号轮流使用
+SAMPLE_TEXTS = [
+    "你好，欢迎使用语音合成服务。",
+    "今天天气很好，我们一起去公园散步吧！路上还可以买一杯咖啡。",
+    "语音合成系统需要在延迟与吞吐之间取得平衡。交互式请求要求尽快返回首段音频，"
+    "批量任务则更关注整体吞吐。通过压测可以在上线前发现性能退化。",
+]
+
+# 与基线对比的指标：(指标路径, 越大越好)
+COMPARED_METRICS = [
+    (("throughput_rps",), True),
+    (("latency", "p50"), False),
+    (("latency", "p95"), False),
+    (("latency", "p99"), False),
+    (("ttfb", "p95"), False),
+    (("rtf", "p50"), True),
+]
+
+
+def summarize(values: List[float]) -> Dict[str, Optional[float]]:
+    """
+    统计均值、分位数与最大值
+
+    Args:
+        values: 样本列表
+
+    Returns:
+        Dict[str, Optional[float]]: count、mean、p50、p95、p99、max，没有样本时数值为 None
+    """
+    values = sorted(values)
+    if not values:
+        return {"count": 0, "mean": None, "p50": None, "p95": None, "p99": None, "max": None}
+
+    def percentile(q: float) -> float:
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 4),
+        "p50": round(percentile(0.50), 4),
+        "p95": round(percentile(0.95), 4),
+        "p99": round(percentile(0.99), 4),
+        "max": round(values[-1], 4)
+    }
+
+
+async def run_load(request_fn: Callable[[int], Awaitable[Dict[str, Any]]],
+                   requests: int,
+                   concurrency: int) -> Dict[str, Any]:
+    """
+    以固定并发发出请求并汇总结果
+
+    Args:
+        request_fn: 发出第 i 个请求，返回 first_byte_at（首字节到达时的 time.perf_counter()）
+            与 audio_seconds（合成的音频时长，未知时为 None）
+        requests: 请求总数
+        concurrency: 并发数
+
+    Returns:
+        Dict[str, Any]: 吞吐、延迟、TTFB 与 RTF 统计
+    """
+    latencies, ttfbs, rtfs, errors = [], [], [], []
+    audio_total = 0.0
+    next_index = iter(range(requests))
+
+    async def worker():
+        nonlocal audio_total
+        for i in next_index:
+            start = time.perf_counter()
+            try:
+                result = await request_fn(i)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+                continue
+            latency = time.perf_counter() - start
+            latencies.append(latency)
+            ttfbs.append(result.get("first_byte_at", start + latency) - start)
+            audio_seconds = result.get("audio_seconds")
+            if audio_seconds:
+                audio_total += audio_seconds
+                # 与 /metrics 的 realtime_factor 定义一致：音频秒数 / 耗时秒数，越大越好
+                rtfs.append(audio_seconds / latency)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    wall_seconds = time.perf_counter() - wall_start
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "succeeded": len(latencies),
+        "failed": len(errors),
+        "error_rate": round(len(errors) / requests, 4) if requests else 0.0,
+        "wall_seconds": round(wall_seconds, 4),
+        "throughput_rps": round(len(latencies) / wall_seconds, 4) if wall_seconds > 0 else None,
+        "audio_seconds": round(audio_total, 4),
+        "audio_seconds_per_second": round(audio_total / wall_seconds, 4) if wall_seconds > 0 else None,
+        "latency": summarize(latencies),
+        "ttfb": summarize(ttfbs),
+        "rtf": summarize(rtfs),
+        # 只保留前几条错误，避免报告过大
+        "errors": errors[:5]
+    }
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = 0.1) -> List[str]:
+    """
+    与基线报告对比，找出退化超过容差的指标
+
+    Args:
+        baseline: 基线报告
+        current: 本次报告
+        tolerance: 相对容差，如 0.1 表示变差超过 10% 视为退化
+
+    Returns:
+        List[str]: 退化说明，没有退化时为空列表
+    """
+    regressions = []
+    for scenario, result in current.get("results", {}).items():
+        base = baseline.get("results", {}).get(scenario)
+        if not base:
+            continue
+        if result.get("error_rate", 0) > base.get("error_rate", 0):
+            regressions.append(f"{scenario}.error_rate: {base.get('error_rate', 0)} -> {result['error_rate']}")
+        for path, higher_is_better in COMPARED_METRICS:
+            old, new = _lookup(base, path), _lookup(result, path)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{scenario}.{'.'.join(path)}: {old} -> {new} ({change:+.1%})")
+    return regressions
+
+
+def _lookup(data: Dict[str, Any], path) -> Optional[float]:
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def write_reference_voice(path: str, seconds: float = 3.0, sample_rate: int = 22050) -> str:
+    """生成一段合成的参考语音，压测时使用"""
+    t = np.arange(int(seconds * sample_rate), dtype=np.float32) / sample_rate
+    sf.write(path, 0.3 * np.sin(2 * np.pi * 180.0 * t), sample_rate, subtype='PCM_16')
+    return path
+
+
+def _texts_for(index: int, texts: List[str], count: int) -> List[str]:
+    return [texts[(index * count + k) % len(texts)] for k in range(count)]
+
+
+class PythonTarget:
+    """直接调用模型副本池（Python API），不经过 HTTP 与推理执行器"""
+
+    def __init__(self,
+                 model_pool: ModelPool,
+                 voice_path: str,
+                 output_dir: str,
+                 texts: List[str],
+                 concurrency: int,
+                 batch_size: int = 4,
+                 segment_length: int = 50):
+        self.model_pool = model_pool
+        self.voice_path = voice_path
+        self.output_dir = output_dir
+        self.texts = texts
+        self.batch_size = batch_size
+        self.segment_length = segment_length
+        self._pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="load-test")
+
+    def request_fn(self, scenario: str) -> Callable[[int], Awaitable[Dict[str, Any]]]:
+        blocking_fn = getattr(self, f"_{scenario}")
+
+        async def request(i: int) -> Dict[str, Any]:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, blocking_fn, i)
+        return request
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+    def _synthesize(self, i: int) -> Dict[str, Any]:
+        sample_rate, audio = self.model_pool.synthesize_array(self.texts[i % len(self.texts)], self.voice_path)
+        return {"first_byte_at": time.perf_counter(), "audio_seconds": len(audio) / sample_rate}
+
+    def _stream(self, i: int) -> Dict[str, Any]:
+        first_byte_at, audio_seconds = None, 0.0
+        for sample_rate, audio in self.model_pool.synthesize_stream(
+            self.texts[i % len(self.texts)], self.voice_path, max_length=self.segment_length
+        ):
+            first_byte_at = first_byte_at or time.perf_counter()
+            audio_seconds += len(audio) / sample_rate
+        return {"first_byte_at": first_byte_at or time.perf_counter(), "audio_seconds": audio_seconds}
+
+    def _batch(self, i: int) -> Dict[str, Any]:
+        output_paths = self.model_pool.batch_synthesize(
+            _texts_for(i, self.texts, self.batch_size), self.voice_path, os.path.join(self.output_dir, f"batch_{i}")
+        )
+        return {
+            "first_byte_at": time.perf_counter(),
+            "audio_seconds": sum(sf.info(path).duration for path in output_paths)
+        }
+
+
+class HTTPTarget:
+    """通过 HTTP 接口发出请求，音频以 PCM 返回以便按字节数计算时长"""
+
+    def __init__(self,
+                 client,
+                 voice_id: str,
+                 texts: List[str],
+                 batch_size: int = 4,
+                 segment_length: int = 50,
+                 headers: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            client: httpx.AsyncClient，base_url 为服务地址
+            voice_id: 已注册的参考语音 ID
+            texts: 请求文本
+            batch_size: /batch_synthesize 每个请求的文本数
+            segment_length: /synthesize/stream 的每段最大长度
+            headers: 附加请求头，如 X-API-Key
+        """
+        self.client = client
+        self.voice_id = voice_id
+        self.texts = texts
+        self.batch_size = batch_size
+        self.segment_length = segment_length
+        self.headers = headers or {}
+
+    def request_fn(self, scenario: str) -> Callable[[int], Awaitable[Dict[str, Any]]]:
+        return getattr(self, f"_{scenario}")
+
+    async def _synthesize(self, i: int) -> Dict[str, Any]:
+        # 跳过结果缓存，否则重复文本只测到缓存命中
+        return await self._stream_audio("/synthesize", {
+            "text": self.texts[i % len(self.texts)], "voice_id": self.voice_id, "format": "pcm", "bypass_cache": "true"
+        })
+
+    async def _stream(self, i: int) -> Dict[str, Any]:
+        return await self._stream_audio("/synthesize/stream", {
+            "text": self.texts[i % len(self.texts)], "voice_id": self.voice_id, "format": "pcm",
+            "segment_length": str(self.segment_length)
+        })
+
+    async def _batch(self, i: int) -> Dict[str, Any]:
+        response = await self.client.post("/batch_synthesize", headers=self.headers, data={
+            "texts": "\n".join(_texts_for(i, self.texts, self.batch_size)), "voice_id": self.voice_id
+        })
+        first_byte_at = time.perf_counter()
+        self._check(response.status_code, response.text)
+        # 输出文件在服务端，仅当服务在本机时可读出音频时长
+        paths = [path for path in response.json().get("output_files", []) if os.path.exists(path)]
+        return {
+            "first_byte_at": first_byte_at,
+            "audio_seconds": sum(sf.info(path).duration for path in paths) if paths else None
+        }
+
+    async def _stream_audio(self, path: str, data: Dict[str, str]) -> Dict[str, Any]:
+        first_byte_at, size = None, 0
+        async with self.client.stream("POST", path, data=data, headers=self.headers) as response:
+            if response.status_code != 200:
+                self._check(response.status_code, (await response.aread()).decode("utf-8", "replace"))
+            async for chunk in response.aiter_bytes():
+                if chunk and first_byte_at is None:
+                    first_byte_at = time.perf_counter()
+                size += len(chunk)
+            sample_rate = int(response.headers.get("X-Sample-Rate", 0))
+        return {
+            "first_byte_at": first_byte_at or time.perf_counter(),
+            # PCM 为单声道 s16le，每个采样 2 字节
+            "audio_seconds": size / 2 / sample_rate if sample_rate else None
+        }
+
+    @staticmethod
+    def _check(status_code: int, body: str):
+        if status_code != 200:
+            raise RuntimeError(f"HTTP {status_code}: {body[:200]}")
+
+
+@contextmanager
+def local_server(engine_factory: Callable[[], Any], replicas: int, work_dir: str) -> Iterator[str]:
+    """
+    在本进程内用假引擎启动 API 服务，所有输出写入 work_dir
+
+    Args:
+        engine_factory: 创建引擎的函数
+        replicas: 模型副本数，推理线程数与之相同
+        work_dir: 输出、缓存与参考语音目录
+
+    Yields:
+        str: 服务地址
+    """
+    import uvicorn
+    from src.api.api_server import APIServer
+    from src.config.settings import Settings
+
+    settings = Settings()
+    overrides = {
+        "audio.output_dir": work_dir,
+        "cache.result.dir": os.path.join(work_dir, "cache"),
+        "voices.dir": os.path.join(work_dir, "voices"),
+        "voices.registry_db": None,
+        "estimator.stats_path": None,
+        "jobs.dir": None,
+        "model_pool.replicas": replicas,
+        "api.inference_workers": None,
+        "api.metrics_enabled": True,
+    }
+    for key, value in overrides.items():
+        settings.set(key, value)
+
+    server = APIServer(settings)
+    server.model_pool = build_model_pool(engine_factory, replicas, server.voice_store, server.duration_estimator)
+    uvicorn_server = uvicorn.Server(uvicorn.Config(server.app, host="127.0.0.1", port=0, log_level="warning"))
+    thread = threading.Thread(target=uvicorn_server.run, name="load-test-server", daemon=True)
+    thread.start()
+    while not uvicorn_server.started:
+        if not thread.is_alive():
+            raise RuntimeError("本地服务启动失败")
+        time.sleep(0.05)
+    try:
+        port = uvicorn_server.servers[0].sockets[0].getsockname()[1]
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        uvicorn_server.should_exit = True
+        thread.join(timeout=10)
+
+
+async def _register_voice(client, voice_path: str, headers: Dict[str, str]) -> str:
+    with open(voice_path, 'rb') as f:
+        response = await client.post("/voices", files={"voice_file": ("voice.wav", f, "audio/wav")}, headers=headers)
+    HTTPTarget._check(response.status_code, response.text)
+    return response.json()["voice_id"]
+
+
+async def _run_scenarios(request_fn_for: Callable[[str], Callable[[int], Awaitable[Dict[str, Any]]]],
+                         scenarios: List[str],
+                         requests: int,
+                         concurrency: int,
+                         warmup: int) -> Dict[str, Any]:
+    results = {}
+    for scenario in scenarios:
+        request_fn = request_fn_for(scenario)
+        # 预热请求不计入结果（首次调用含说话人条件计算等一次性开销）
+        for i in range(warmup):
+            await request_fn(i)
+        results[scenario] = await run_load(request_fn, requests, concurrency)
+    return results
+
+
+def run_python(model_pool: ModelPool,
+               scenarios: List[str],
+               texts: List[str],
+               requests: int,
+               concurrency: int,
+               work_dir: str,
+               batch_size: int = 4,
+               segment_length: int = 50,
+               warmup: int = 1) -> Dict[str, Any]:
+    """
+    对 Python API 运行各场景
+
+    Args:
+        model_pool: 模型副本池
+        scenarios: 场景列表，取值见 SCENARIOS
+        texts: 请求文本
+        requests: 每个场景的请求数
+        concurrency: 并发数
+        work_dir: 参考语音与批量输出目录
+        batch_size: batch 场景每个请求的文本数
+        segment_length: stream 场景的每段最大长度
+        warmup: 每个场景的预热请求数
+
+    Returns:
+        Dict[str, Any]: 各场景的统计结果
+    """
+    voice_path = write_reference_voice(os.path.join(work_dir, "voice.wav"))
+    target = PythonTarget(model_pool, voice_path, work_dir, texts, concurrency, batch_size, segment_length)
+    try:
+        return asyncio.run(_run_scenarios(target.request_fn, scenarios, requests, concurrency, warmup))
+    finally:
+        target.close()
+
+
+def run_http(url: str,
+             scenarios: List[str],
+             texts: List[str],
+             requests: int,
+             concurrency: int,
+             work_dir: str,
+             voice_id: Optional[str] = None,
+             batch_size: int = 4,
+             segment_length: int = 50,
+             warmup: int = 1,
+             headers: Optional[Dict[str, str]] = None,
+             timeout: float = 300.0) -> Dict[str, Any]:
+    """
+    对 HTTP 接口运行各场景，未指定 voice_id 时先注册一段合成的参考语音
+
+    Args:
+        url: 服务地址
+        scenarios: 场景列表，取值见 SCENARIOS
+        texts: 请求文本
+        requests: 每个场景的请求数
+        concurrency: 并发数
+        work_dir: 参考语音目录
+        voice_id: 已注册的参考语音 ID
+        batch_size: batch 场景每个请求的文本数
+        segment_length: stream 场景的每段最大长度
+        warmup: 每个场景的预热请求数
+        headers: 附加请求头
+        timeout: 单个请求的超时时间（秒）
+
+    Returns:
+        Dict[str, Any]: 各场景的统计结果
+    """
+    import httpx
+
+    headers = headers or {}
+
+    async def run() -> Dict[str, Any]:
+        limits = httpx.Limits(max_connections=max(1, concurrency) + 1)
+        async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+            nonlocal voice_id
+            if voice_id is None:
+                voice_path = write_reference_voice(os.path.join(work_dir, "voice.wav"))
+                voice_id = await _register_voice(client, voice_path, headers)
+            target = HTTPTarget(client, voice_id, texts, batch_size, segment_length, headers)
+            return await _run_scenarios(target.request_fn, scenarios, requests, concurrency, warmup)
+
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="语音合成负载测试")
+    parser.add_argument("--target", choices=["http", "python"], default="http", help="压测 HTTP 接口或 Python API")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS,
+                        help="压测场景，可重复指定，默认 synthesize 与 batch")
+    parser.add_argument("--requests", type=int, default=50, help="每个场景的请求数")
+    parser.add_argument("--concurrency", type=int, default=4, help="并发数")
+    parser.add_argument("--warmup", type=int, default=1, help="每个场景的预热请求数，不计入结果")
+    parser.add_argument("--text", action="append", help="请求文本，可重复指定，默认使用内置的长短文本")
+    parser.add_argument("--batch-size", type=int, default=4, help="batch 场景每个请求的文本数")
+    parser.add_argument("--segment-length", type=int, default=50, help="stream 场景的每段最大长度")
+    parser.add_argument("--url", help="已运行的服务地址，不指定时在本进程内用假引擎启动服务")
+    parser.add_argument("--voice-id", help="已注册的参考语音 ID，不指定时注册一段合成的参考语音")
+    parser.add_argument("--api-key", help="X-API-Key 请求头（租户）")
+    parser.add_argument("--engine", default=DEFAULT_ENGINE, help="假引擎类路径（模块:类名）")
+    parser.add_argument("--replicas", type=int, default=1, help="假引擎的模型副本数")
+    parser.add_argument("--base-latency", type=float, default=0.05, help="假引擎每次推理的固定延迟（秒）")
+    parser.add_argument("--latency-per-char", type=float, default=0.005, help="假引擎每个字符的推理延迟（秒）")
+    parser.add_argument("--audio-seconds-per-char", type=float, default=0.2, help="假引擎每个字符生成的音频时长（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="假引擎延迟的相对抖动幅度")
+    parser.add_argument("--seed", type=int, default=None, help="抖动的随机种子")
+    parser.add_argument("--output", help="报告输出路径，不指定时只打印")
+    parser.add_argument("--baseline", help="基线报告路径，指标退化超过容差时以非零状态退出")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="与基线对比的相对容差")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    scenarios = args.scenario or ["synthesize", "batch"]
+    texts = args.text or SAMPLE_TEXTS
+    engine_params = {
+        "base_latency": args.base_latency,
+        "latency_per_char": args.latency_per_char,
+        "audio_seconds_per_char": args.audio_seconds_per_char,
+        "jitter": args.jitter,
+        "seed": args.seed,
+    }
+
+    def engine_factory():
+        return create_engine(args.engine, **engine_params)
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "target": args.target,
+        "url": args.url if args.target == "http" else None,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        # 压测已运行的服务时引擎由服务决定
+        "engine": None if args.target == "http" and args.url else {"spec": args.engine, "replicas": args.replicas, **engine_params},
+    }
+
+    work_dir = tempfile.mkdtemp(prefix="load_test_")
+    try:
+        if args.target == "python":
+            model_pool = build_model_pool(engine_factory, args.replicas)
+            report["results"] = run_python(
+                model_pool, scenarios, texts, args.requests, args.concurrency, work_dir,
+                args.batch_size, args.segment_length, args.warmup
+            )
+        else:
+            headers = {"X-API-Key": args.api_key} if args.api_key else {}
+            run_args = (scenarios, texts, args.requests, args.concurrency, work_dir, args.voice_id,
+                        args.batch_size, args.segment_length, args.warmup, headers)
+            if args.url:
+                report["results"] = run_http(args.url, *run_args)
+            else:
+                with local_server(engine_factory, args.replicas, work_dir) as url:
+                    report["results"] = run_http(url, *run_args)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            report["regressions"] = compare_reports(json.load(f), report, args.tolerance)
+        exit_code = 1 if report["regressions"] else 0
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
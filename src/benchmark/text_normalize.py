@@ -0,0 +1,91 @@
+"""
+文本规范化基准 - 对比 TextNormalizer 与原先逐次 re.sub 的实现
+
+用法:
+    python -m src.benchmark.text_normalize [--repeat 2000]
+"""
+
+import re
+import sys
+import json
+import timeit
+import argparse
+import unicodedata
+from pathlib import Path
+from typing import Callable, Dict
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.text_utils import TextNormalizer
+
+# 典型请求文本：中英混排、多余空白、少量控制字符
+SAMPLES = {
+    "short": "你好，欢迎使用IndexTTS语音合成服务！",
+    "mixed": "今天天气很好，我们去Park散步吧！  Hello世界。\t这是第123个测试\n句子？好的。" * 20,
+    "control": "第一段\u200b文字\x00混入了\u0007控制字符。Second\u200dsegment。" * 20,
+}
+
+
+def legacy_clean_text(text: str) -> str:
+    """原 TextUtils.clean_text 实现"""
+    if not text:
+        return ""
+    text = re.sub(r'\s+', ' ', text.strip())
+    text = ''.join(char for char in text if unicodedata.category(char)[0] != 'C' or char in '\n\t')
+    return text
+
+
+def legacy_format_text_for_tts(text: str) -> str:
+    """原 TextUtils.format_text_for_tts 实现"""
+    text = legacy_clean_text(text)
+    text = re.sub(r'(\d+)', r'\1', text)
+    text = re.sub(r'([。！？])([^。！？])', r'\1 \2', text)
+    text = re.sub(r'([a-zA-Z])([一-鿿])', r'\1 \2', text)
+    text = re.sub(r'([一-鿿])([a-zA-Z])', r'\1 \2', text)
+    return text
+
+
+def _time_us(fn: Callable[[str], str], text: str, repeat: int) -> float:
+    return timeit.timeit(lambda: fn(text), number=repeat) / repeat * 1e6
+
+
+def run(repeat: int = 2000) -> Dict[str, Dict[str, float]]:
+    """
+    运行基准
+
+    Args:
+        repeat: 每个用例的重复次数
+
+    Returns:
+        Dict[str, Dict[str, float]]: 各样本的单次耗时（微秒）与加速比
+    """
+    normalizer = TextNormalizer()
+    cases = {
+        "clean": (legacy_clean_text, normalizer.clean),
+        "format_for_tts": (legacy_format_text_for_tts, normalizer.format_for_tts),
+    }
+    results = {}
+    for sample_name, text in SAMPLES.items():
+        for case_name, (legacy_fn, new_fn) in cases.items():
+            legacy_us = _time_us(legacy_fn, text, repeat)
+            new_us = _time_us(new_fn, text, repeat)
+            results[f"{case_name}/{sample_name}"] = {
+                "chars": len(text),
+                "legacy_us": round(legacy_us, 2),
+                "normalizer_us": round(new_us, 2),
+                "speedup": round(legacy_us / new_us, 2) if new_us else None,
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="文本规范化基准")
+    parser.add_argument("--repeat", type=int, default=2000, help="每个用例的重复次数")
+    args = parser.parse_args()
+    print(json.dumps(run(args.repeat), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -40,18 +40,99 @@ class Settings:
                 "sample_rate": 22050,
                 "output_dir": "outputs",
                 "max_duration": 300,  # 最大时长（秒）
-                "normalize": True
+                "max_segment_seconds": None,
+                "normalize": True,
+                "segment_silence_ms": 200,
+                "crossfade_ms": 20
+            },
+            "output": {
+                "default_format": "wav",
+                "encode_workers": 2,
+                "compression_level": None
+            },
+            "startup": {
+                "background_load": True,
+                "warmup": True,
+                "warmup_text": "你好，欢迎使用语音合成服务。",
+                "warmup_voice": None
+            },
+            "model_pool": {
+                "replicas": 1,
+                "devices": [],
+                "threads_per_replica": None,
+                "max_consecutive_failures": 3,
+                "recovery_seconds": 30
+            },
+            "cache": {
+                "speaker": {
+                    "enabled": True,
+                    "memory_items": 64,
+                    "disk_dir": None,
+                    "disk_max_mb": 512
+                },
+                "result": {
+                    "enabled": True,
+                    "dir": "outputs/cache",
+                    "max_mb": 1024
+                }
+            },
+            "voices": {
+                "enabled": True,
+                "dir": "outputs/voices",
+                "sample_rate": None,
+                "max_seconds": 15,
+                "trim_top_db": 30,
+                "target_rms_db": -20,
+                "peak_limit": 0.95,
+                "registry_db": None,
+                "precompute": True
+            },
+            "scheduler": {
+                "enabled": False,
+                "window_ms": 10,
+                "max_batch_size": 8,
+                "max_batch_tokens": 1000,
+                "max_batch_seconds": None,
+                "max_pending": 64
+            },
+            "estimator": {
+                "enabled": True,
+                "stats_path": "outputs/duration_stats.json",
+                "default_seconds_per_unit": 0.3,
+                "default_realtime_factor": 1.0,
+                "prior_units": 50,
+                "decay": 0.99,
+                "save_interval": 30,
+                "max_voices": 1024
+            },
+            "jobs": {
+                "dir": None,
+                "workers": 1
             },
             "api": {
                 "host": "127.0.0.1",
                 "port": 8000,
-                "workers": 1
+                "workers": 1,
+                "inference_workers": None,
+                "max_queue_size": 16,
+                "metrics_enabled": True,
+                "save_outputs": False,
+                "request_timeout": None,
+                "tenant_weights": {},
+                "default_tenant_weight": 1
             },
             "web": {
                 "host": "127.0.0.1",
                 "port": 7860,
                 "share": False
             },
+            "emotion": {
+                "default_alpha": 0.6,
+                "supported_emotions": ["happy", "angry", "sad", "afraid", "disgusted", "melancholic", "surprised", "calm"],
+                "auto_tag": False,
+                "vector_max_total": 0.8,
+                "lexicon": {}
+            },
             "logging": {
                 "level": "INFO",
                 "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
@@ -132,6 +213,10 @@ class Settings:
         """获取音频配置"""
         return self.get("audio", {})
     
+    def get_cache_config(self) -> Dict[str, Any]:
+        """获取缓存配置"""
+        return self.get("cache", {})
+    
     def get_api_config(self) -> Dict[str, Any]:
         """获取 API 配置"""
         return self.get("api", {})
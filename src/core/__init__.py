@@ -4,5 +4,35 @@
 
 from .tts_wrapper import TTSWrapper
 from .audio_processor import AudioProcessor
+from .audio_stream import AudioStream, StreamingResampler, RunningStats
+from .audio_encoder import AudioEncoder, StreamEncoder
+from .speaker_cache import SpeakerConditioningCache
+from .result_cache import AudioResultCache
+from .voice_store import VoiceStore, InvalidVoiceError
+from .voice_registry import VoiceRegistry
+from .duration_estimator import DurationEstimator
+from .cancellation import CancelToken, RequestCancelledError
+from .stub_engine import StubTTSEngine
+from .model_pool import ModelPool
+from .model_loader import ModelLoader
 
-__all__ = ["TTSWrapper", "AudioProcessor"]
+__all__ = [
+    "TTSWrapper",
+    "AudioProcessor",
+    "AudioStream",
+    "StreamingResampler",
+    "RunningStats",
+    "AudioEncoder",
+    "StreamEncoder",
+    "SpeakerConditioningCache",
+    "AudioResultCache",
+    "VoiceStore",
+    "InvalidVoiceError",
+    "VoiceRegistry",
+    "DurationEstimator",
+    "CancelToken",
+    "RequestCancelledError",
+    "StubTTSEngine",
+    "ModelPool",
+    "ModelLoader",
+]
@@ -0,0 +1,411 @@
+"""
+音频输出编码 - 将合成结果编码为 WAV、PCM、FLAC、MP3 或 Opus，支持边合成边编码的流式输出
+"""
+
+import io
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import soundfile as sf
+
+from .audio_processor import AudioProcessor
+from .audio_stream import StreamingResampler
+
+# 支持的输出格式。sample_rates 为编码器支持的采样率，为 None 时不限制
+OUTPUT_FORMATS = {
+    "wav": {"media_type": "audio/wav", "extension": "wav", "sf_format": "WAV", "subtype": "PCM_16",
+            "sample_rates": None},
+    "pcm": {"media_type": "audio/pcm", "extension": "pcm", "sf_format": None, "subtype": None,
+            "sample_rates": None},
+    "flac": {"media_type": "audio/flac", "extension": "flac", "sf_format": "FLAC", "subtype": "PCM_16",
+             "sample_rates": None},
+    "mp3": {"media_type": "audio/mpeg", "extension": "mp3", "sf_format": "MP3", "subtype": "MPEG_LAYER_III",
+            "sample_rates": (8000, 11025, 12000, 16000, 22050, 24000, 32000, 44100, 48000)},
+    "opus": {"media_type": "audio/ogg", "extension": "ogg", "sf_format": "OGG", "subtype": "OPUS",
+             "sample_rates": (8000, 12000, 16000, 24000, 48000)},
+}
+
+# MP3 未配置压缩等级时的默认值，22.05kHz 下约 48kbps，足以承载语音
+MP3_DEFAULT_COMPRESSION = 0.75
+MP3_MAX_COMPRESSION = 0.95
+
+# format 参数的别名
+FORMAT_ALIASES = {"ogg": "opus", "mpeg": "mp3", "wave": "wav", "s16le": "pcm"}
+
+# Accept 头中的媒体类型 -> 输出格式
+MEDIA_TYPES = {
+    "audio/wav": "wav", "audio/wave": "wav", "audio/x-wav": "wav", "audio/vnd.wave": "wav",
+    "audio/pcm": "pcm", "audio/l16": "pcm",
+    "audio/flac": "flac", "audio/x-flac": "flac",
+    "audio/mpeg": "mp3", "audio/mp3": "mp3",
+    "audio/ogg": "opus", "audio/opus": "opus",
+}
+
+
+class _EncodedBuffer(io.RawIOBase):
+    """
+    libsndfile 的可寻址输出缓冲
+
+    编码器收尾时会回写文件头（如 FLAC 的 STREAMINFO、MP3 的 Xing 帧），
+    已经取走的字节不再重复输出，流式结果中这些字段保持“长度未知”的初始值。
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._data = bytearray()
+        self._pos = 0
+        self._taken = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = memoryview(data).cast('B')
+        end = self._pos + len(data)
+        if end > len(self._data):
+            self._data.extend(bytes(end - len(self._data)))
+        self._data[self._pos:end] = data
+        self._pos = end
+        return len(data)
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._data) if size is None or size < 0 else min(len(self._data), self._pos + size)
+        data = bytes(self._data[self._pos:end])
+        self._pos = max(self._pos, end)
+        return data
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._data)
+        self._pos = max(0, offset)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def take(self) -> bytes:
+        """取走上次以来新产生的字节"""
+        data = bytes(self._data[self._taken:])
+        self._taken = len(self._data)
+        return data
+
+    def getvalue(self) -> bytes:
+        """完整的编码结果（含回写的文件头）"""
+        return bytes(self._data)
+
+
+class StreamEncoder:
+    """流式编码器类：逐块输入音频，返回当前已编码的字节，同一实例需按顺序调用"""
+
+    def __init__(self,
+                 fmt: str,
+                 sample_rate: int,
+                 output_sample_rate: Optional[int] = None,
+                 compression_level: Optional[float] = None):
+        """
+        初始化流式编码器
+
+        Args:
+            fmt: 输出格式，OUTPUT_FORMATS 中的键
+            sample_rate: 输入音频采样率
+            output_sample_rate: 输出采样率，为 None 时与输入相同（编码器不支持时取最接近的支持值）
+            compression_level: 压缩等级（0~1），为 None 时使用编码器默认值
+        """
+        self.format = fmt
+        self.spec = OUTPUT_FORMATS[fmt]
+        self.sample_rate = int(sample_rate)
+        self.output_sample_rate = AudioEncoder.supported_sample_rate(fmt, output_sample_rate or sample_rate)
+        self.resampler = None
+        if self.output_sample_rate != self.sample_rate:
+            self.resampler = StreamingResampler(self.sample_rate, self.output_sample_rate)
+
+        self._buffer = None
+        self._file = None
+        self._header_sent = False
+        self.closed = False
+        if self.spec["sf_format"] and fmt != "wav":
+            self._buffer = _EncodedBuffer()
+            self._file = sf.SoundFile(
+                self._buffer, 'w',
+                samplerate=self.output_sample_rate,
+                channels=1,
+                format=self.spec["sf_format"],
+                subtype=self.spec["subtype"],
+                **AudioEncoder.encoder_options(fmt, compression_level)
+            )
+
+    def encode(self, audio: np.ndarray) -> bytes:
+        """
+        编码一块音频
+
+        Args:
+            audio: 音频数据（int16 或 [-1, 1] 浮点）
+
+        Returns:
+            bytes: 新产生的编码字节，编码器内部缓冲未满时可能为空
+        """
+        audio = AudioProcessor.to_float(audio)
+        if self.resampler is not None:
+            audio = self.resampler.process(audio).astype(np.float32, copy=False)
+        return self._write(audio)
+
+    def close(self) -> bytes:
+        """
+        结束编码
+
+        Returns:
+            bytes: 剩余的编码字节
+        """
+        if self.closed:
+            return b""
+        data = b""
+        if self.resampler is not None:
+            data = self._write(self.resampler.flush().astype(np.float32, copy=False))
+        self.closed = True
+        if self._file is not None:
+            self._file.close()
+            data += self._buffer.take()
+        elif not self._header_sent and self.format == "wav":
+            data += AudioProcessor.build_wav_header(self.output_sample_rate)
+        return data
+
+    def _write(self, audio: np.ndarray) -> bytes:
+        if self._file is not None:
+            if len(audio):
+                self._file.write(audio)
+            return self._buffer.take()
+
+        data = AudioProcessor.to_pcm16(audio)
+        if self.format == "wav" and not self._header_sent:
+            # 流式输出时长度未知，使用长度未定的文件头
+            self._header_sent = True
+            data = AudioProcessor.build_wav_header(self.output_sample_rate) + data
+        return data
+
+
+class AudioEncoder:
+    """音频输出编码类：格式协商、一次性编码与流式编码，编码在独立线程池中执行"""
+
+    def __init__(self,
+                 default_format: str = "wav",
+                 max_workers: int = 2,
+                 compression_level: Optional[float] = None):
+        """
+        初始化音频编码器
+
+        Args:
+            default_format: 未指定格式且 Accept 头无法匹配时的输出格式
+            max_workers: 编码线程数，libsndfile 编码时释放 GIL，可与推理并行
+            compression_level: 压缩等级（0~1），越大压缩率越高、码率越低，为 None 时使用编码器默认值
+        """
+        self.default_format = self.resolve_format(default_format)
+        self.compression_level = compression_level
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix="audio-encode")
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "AudioEncoder":
+        """
+        根据配置创建编码器
+
+        Args:
+            config: output 配置段
+
+        Returns:
+            AudioEncoder: 编码器实例
+        """
+        config = config or {}
+        return cls(
+            default_format=config.get("default_format", "wav"),
+            max_workers=config.get("encode_workers", 2),
+            compression_level=config.get("compression_level")
+        )
+
+    @staticmethod
+    def resolve_format(name: str) -> str:
+        """
+        规范化格式名
+
+        Args:
+            name: 格式名或别名，不区分大小写
+
+        Returns:
+            str: OUTPUT_FORMATS 中的键
+
+        Raises:
+            ValueError: 不支持的格式
+        """
+        fmt = (name or "").strip().lower()
+        fmt = FORMAT_ALIASES.get(fmt, fmt)
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"不支持的输出格式: {name}，可选: {', '.join(OUTPUT_FORMATS)}")
+        return fmt
+
+    def negotiate(self, fmt: Optional[str] = None, accept: Optional[str] = None) -> str:
+        """
+        协商输出格式：format 参数优先，其次按 Accept 头的权重选择，都没有时使用默认格式
+
+        Args:
+            fmt: 请求中的 format 参数
+            accept: 请求的 Accept 头
+
+        Returns:
+            str: 输出格式
+
+        Raises:
+            ValueError: format 参数指定了不支持的格式
+        """
+        if fmt:
+            return self.resolve_format(fmt)
+        if not accept:
+            return self.default_format
+
+        candidates = []
+        for order, item in enumerate(accept.split(',')):
+            media_type, *params = [part.strip() for part in item.split(';')]
+            quality = 1.0
+            for param in params:
+                key, _, value = param.partition('=')
+                if key.strip() == 'q':
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            media_type = media_type.lower()
+            if media_type in ("audio/*", "*/*"):
+                candidate = self.default_format
+            else:
+                candidate = MEDIA_TYPES.get(media_type)
+            if candidate and quality > 0:
+                candidates.append((-quality, order, candidate))
+        return min(candidates)[2] if candidates else self.default_format
+
+    @staticmethod
+    def supported_sample_rate(fmt: str, sample_rate: int) -> int:
+        """
+        格式支持的采样率：不受限制时原样返回，否则取不低于请求值的最小支持值
+
+        Args:
+            fmt: 输出格式
+            sample_rate: 请求的采样率
+
+        Returns:
+            int: 实际输出采样率
+        """
+        rates = OUTPUT_FORMATS[fmt]["sample_rates"]
+        sample_rate = int(sample_rate)
+        if not rates or sample_rate in rates:
+            return sample_rate
+        higher = [rate for rate in rates if rate >= sample_rate]
+        return min(higher) if higher else max(rates)
+
+    @staticmethod
+    def encoder_options(fmt: str, compression_level: Optional[float] = None) -> Dict[str, Any]:
+        """
+        soundfile 编码参数
+
+        MP3 使用恒定码率，流式输出时解码端无需依赖收尾回写的 Xing 帧即可得到正确时长；
+        libsndfile 只有在给出压缩等级时才应用码率模式，未配置时使用 MP3_DEFAULT_COMPRESSION。
+        """
+        options = {}
+        if fmt == "mp3":
+            level = MP3_DEFAULT_COMPRESSION if compression_level is None else compression_level
+            # 压缩等级为 1 时部分采样率下码率低于 LAME 的下限
+            options["compression_level"] = min(float(level), MP3_MAX_COMPRESSION)
+            options["bitrate_mode"] = "CONSTANT"
+        elif compression_level is not None and fmt in ("flac", "opus"):
+            options["compression_level"] = float(compression_level)
+        return options
+
+    @staticmethod
+    def media_type(fmt: str) -> str:
+        """输出格式的媒体类型"""
+        return OUTPUT_FORMATS[fmt]["media_type"]
+
+    @staticmethod
+    def extension(fmt: str) -> str:
+        """输出格式的文件扩展名"""
+        return OUTPUT_FORMATS[fmt]["extension"]
+
+    def encode(self,
+               audio: np.ndarray,
+               sample_rate: int,
+               fmt: str,
+               output_sample_rate: Optional[int] = None) -> bytes:
+        """
+        一次性编码完整音频（在调用线程中执行）
+
+        Args:
+            audio: 音频数据
+            sample_rate: 输入采样率
+            fmt: 输出格式
+            output_sample_rate: 输出采样率，为 None 时与输入相同
+
+        Returns:
+            bytes: 编码后的完整文件内容
+        """
+        output_sample_rate = self.supported_sample_rate(fmt, output_sample_rate or sample_rate)
+        audio = AudioProcessor.to_float(audio)
+        if output_sample_rate != sample_rate:
+            audio = AudioProcessor.resample_batch([audio], sample_rate, output_sample_rate)[0]
+
+        if fmt == "wav":
+            return AudioProcessor.to_wav_bytes(audio, output_sample_rate)
+        if fmt == "pcm":
+            return AudioProcessor.to_pcm16(audio)
+
+        spec = OUTPUT_FORMATS[fmt]
+        buffer = _EncodedBuffer()
+        sf.write(
+            buffer, audio, output_sample_rate,
+            format=spec["sf_format"],
+            subtype=spec["subtype"],
+            **self.encoder_options(fmt, self.compression_level)
+        )
+        return buffer.getvalue()
+
+    def submit_encode(self,
+                      audio: np.ndarray,
+                      sample_rate: int,
+                      fmt: str,
+                      output_sample_rate: Optional[int] = None) -> Future:
+        """
+        在编码线程池中编码完整音频
+
+        Returns:
+            Future: 结果为编码后的字节，参数同 encode
+        """
+        return self._pool.submit(self.encode, audio, sample_rate, fmt, output_sample_rate)
+
+    def stream(self,
+               fmt: str,
+               sample_rate: int,
+               output_sample_rate: Optional[int] = None) -> StreamEncoder:
+        """
+        创建流式编码器
+
+        Args:
+            fmt: 输出格式
+            sample_rate: 输入采样率
+            output_sample_rate: 输出采样率，为 None 时与输入相同
+
+        Returns:
+            StreamEncoder: 流式编码器
+        """
+        return StreamEncoder(fmt, sample_rate, output_sample_rate, self.compression_level)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """在编码线程池中执行任意函数（如 StreamEncoder.encode）"""
+        return self._pool.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = False):
+        """关闭编码线程池"""
+        self._pool.shutdown(wait=wait)
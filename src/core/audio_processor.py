@@ -2,17 +2,34 @@
 音频处理工具类
 """
 
+import io
 import os
+import math
+import struct
+import threading
 import librosa
 import soundfile as sf
 import numpy as np
-from typing import Tuple, Optional, Union
+from collections import OrderedDict
+from functools import lru_cache
+from scipy import signal
+from typing import Tuple, Optional, Union, List
 import logging
 
+# 批量统计时，平均长度不超过该值的片段拼接后一次归约
+CONCAT_MAX_AVG_SAMPLES = 8192
+
+# 音频信息缓存的最大条目数
+INFO_CACHE_SIZE = 4096
+
 
 class AudioProcessor:
     """音频处理工具类"""
     
+    # 按 (路径, 修改时间, 大小) 缓存的音频信息，所有实例共享
+    _info_cache = OrderedDict()
+    _info_cache_lock = threading.Lock()
+    
     def __init__(self, sample_rate: int = 22050):
         """
         初始化音频处理器
@@ -53,7 +70,9 @@ class AudioProcessor:
                 sample_rate = self.sample_rate
             
             # 确保输出目录存在
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            output_dir = os.path.dirname(file_path)
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
             
             sf.write(file_path, audio, sample_rate)
             logging.info(f"音频文件已保存: {file_path}")
@@ -95,32 +114,104 @@ class AudioProcessor:
             logging.warning(f"去除静音失败: {e}")
             return audio
     
-    def get_audio_info(self, file_path: str) -> dict:
+    def get_audio_info(self, file_path: Union[str, bytes], compute_stats: bool = False) -> dict:
         """
         获取音频文件信息
         
+        默认只读取文件头，不解码音频；需要峰值和 RMS 时按块流式读取计算。
+        文件路径的结果按 (路径, 修改时间, 大小) 缓存。
+        
         Args:
-            file_path: 音频文件路径
+            file_path: 音频文件路径，或内存中的音频文件内容
+            compute_stats: 是否计算峰值（max_amplitude）与 RMS（rms）
             
         Returns:
-            dict: 音频信息
+            dict: 音频信息，失败时返回空字典
         """
         try:
-            audio, sr = self.load_audio(file_path)
-            duration = len(audio) / sr
+            if isinstance(file_path, (bytes, bytearray)):
+                info = self._probe(io.BytesIO(file_path))
+                if compute_stats:
+                    info.update(self._stream_stats(io.BytesIO(file_path)))
+                return info
+            
+            stat = os.stat(file_path)
+            key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+            with AudioProcessor._info_cache_lock:
+                cached = AudioProcessor._info_cache.get(key)
+                if cached is not None:
+                    AudioProcessor._info_cache.move_to_end(key)
             
+            if cached is None or (compute_stats and "rms" not in cached):
+                cached = dict(cached) if cached else self._probe(file_path)
+                if compute_stats:
+                    cached.update(self._stream_stats(file_path))
+                with AudioProcessor._info_cache_lock:
+                    AudioProcessor._info_cache[key] = cached
+                    while len(AudioProcessor._info_cache) > INFO_CACHE_SIZE:
+                        AudioProcessor._info_cache.popitem(last=False)
+            
+            info = dict(cached)
+            info["file_path"] = file_path
+            return info
+        except Exception as e:
+            logging.error(f"获取音频信息失败: {e}")
+            return {}
+    
+    @staticmethod
+    def _probe(source) -> dict:
+        """读取文件头获取格式信息，soundfile 不支持的格式退回完整解码"""
+        try:
+            info = sf.info(source)
+            return {
+                "sample_rate": info.samplerate,
+                "duration": info.frames / info.samplerate if info.samplerate else 0.0,
+                "channels": info.channels,
+                "samples": info.frames,
+                "format": info.format,
+                "subtype": info.subtype
+            }
+        except RuntimeError:
+            if hasattr(source, "seek"):
+                source.seek(0)
+            audio, sr = librosa.load(source, sr=None, mono=False)
+            samples = audio.shape[-1]
             return {
-                "file_path": file_path,
                 "sample_rate": sr,
-                "duration": duration,
+                "duration": samples / sr,
                 "channels": 1 if audio.ndim == 1 else audio.shape[0],
-                "samples": len(audio),
-                "max_amplitude": np.max(np.abs(audio)),
-                "rms": np.sqrt(np.mean(audio**2))
+                "samples": samples
             }
-        except Exception as e:
-            logging.error(f"获取音频信息失败: {e}")
-            return {}
+    
+    @staticmethod
+    def _stream_stats(source, block_size: int = 65536) -> dict:
+        """按块读取计算峰值与 RMS，内存占用与文件长度无关"""
+        peak, energy, samples = 0.0, 0.0, 0
+        try:
+            blocks = sf.blocks(source, blocksize=block_size, dtype='float32', always_2d=True)
+            for block in blocks:
+                if block.size:
+                    peak = max(peak, float(np.max(np.abs(block))))
+                    energy += float(np.einsum('ij,ij->', block, block, dtype=np.float64))
+                    samples += block.size
+        except RuntimeError:
+            # soundfile 不支持的格式只能完整解码
+            if hasattr(source, "seek"):
+                source.seek(0)
+            audio, _ = librosa.load(source, sr=None, mono=False)
+            peak = float(np.max(np.abs(audio), initial=0.0))
+            energy = float(np.dot(audio.ravel(), audio.ravel()))
+            samples = audio.size
+        return {
+            "max_amplitude": peak,
+            "rms": float(np.sqrt(energy / samples)) if samples else 0.0
+        }
+    
+    @staticmethod
+    def clear_info_cache():
+        """清空音频信息缓存"""
+        with AudioProcessor._info_cache_lock:
+            AudioProcessor._info_cache.clear()
     
     def resample_audio(self, audio: np.ndarray, target_sr: int) -> np.ndarray:
         """
@@ -139,3 +230,328 @@ class AudioProcessor:
         except Exception as e:
             logging.error(f"重采样失败: {e}")
             return audio
+
+    @staticmethod
+    def pad_batch(clips: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        将多段单声道音频补零对齐为一个二维数组，便于一次性向量化处理
+        
+        Args:
+            clips: 音频列表
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: 形状为 (片段数, 最大长度) 的 float32 数组和各段长度
+        """
+        clips = [AudioProcessor.to_float(clip) for clip in clips]
+        lengths = np.array([len(clip) for clip in clips], dtype=np.int64)
+        batch = np.zeros((len(clips), int(lengths.max()) if len(clips) else 0), dtype=np.float32)
+        for i, clip in enumerate(clips):
+            batch[i, :len(clip)] = clip
+        return batch, lengths
+    
+    @staticmethod
+    def _use_concat(clips: List[np.ndarray]) -> bool:
+        """
+        片段较短时逐段调用的开销占主导，拼接后一次归约更快；
+        片段较长时逐段计算已受内存带宽限制，拼接只会多一次拷贝
+        """
+        return sum(len(clip) for clip in clips) <= CONCAT_MAX_AVG_SAMPLES * len(clips)
+    
+    @staticmethod
+    def _concat_batch(clips: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """首尾相接为一维数组，返回 (数据, 各段长度, 各段起点)，用于分段归约"""
+        clips = [AudioProcessor.to_float(clip) for clip in clips]
+        lengths = np.array([len(clip) for clip in clips], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+        flat = np.concatenate(clips) if clips else np.zeros(0, dtype=np.float32)
+        return flat, lengths, offsets
+    
+    @staticmethod
+    def _segment_reduce(ufunc: np.ufunc, values: np.ndarray, lengths: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+        """按段归约，空段结果为 0"""
+        result = np.zeros(len(lengths), dtype=np.float64)
+        nonempty = lengths > 0
+        if nonempty.any():
+            result[nonempty] = ufunc.reduceat(values, offsets[nonempty])
+        return result
+    
+    @staticmethod
+    def _segment_peak(flat: np.ndarray, lengths: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+        """按段求绝对值峰值，用最大、最小值代替 abs，避免额外的临时数组"""
+        maximum = AudioProcessor._segment_reduce(np.maximum, flat, lengths, offsets)
+        minimum = AudioProcessor._segment_reduce(np.minimum, flat, lengths, offsets)
+        return np.maximum(maximum, -minimum)
+    
+    @staticmethod
+    def batch_stats(clips: List[np.ndarray]) -> dict:
+        """
+        一次扫描计算多段音频的峰值与 RMS
+        
+        Args:
+            clips: 音频列表
+            
+        Returns:
+            dict: peak、rms（均为与输入一一对应的数组）与 samples
+        """
+        if AudioProcessor._use_concat(clips):
+            flat, lengths, offsets = AudioProcessor._concat_batch(clips)
+            peak = AudioProcessor._segment_peak(flat, lengths, offsets)
+            energy = AudioProcessor._segment_reduce(np.add, flat * flat, lengths, offsets)
+        else:
+            clips = [AudioProcessor.to_float(clip) for clip in clips]
+            lengths = np.array([len(clip) for clip in clips], dtype=np.int64)
+            peak = np.array([np.max(np.abs(clip), initial=0.0) for clip in clips])
+            energy = np.array([np.dot(clip, clip) for clip in clips], dtype=np.float64)
+        rms = np.sqrt(energy / np.maximum(lengths, 1))
+        return {"peak": peak, "rms": rms, "samples": lengths}
+    
+    @staticmethod
+    def normalize_batch(clips: List[np.ndarray]) -> List[np.ndarray]:
+        """
+        批量峰值归一化，结果与逐段调用 normalize_audio 一致
+        
+        Args:
+            clips: 音频列表
+            
+        Returns:
+            List[np.ndarray]: 归一化后的音频列表
+        """
+        if not clips:
+            return []
+        if not AudioProcessor._use_concat(clips):
+            peaks = AudioProcessor.batch_stats(clips)["peak"]
+            return [
+                AudioProcessor.to_float(clip) / np.float32(peak) if peak > 0 else AudioProcessor.to_float(clip)
+                for clip, peak in zip(clips, peaks)
+            ]
+        
+        flat, lengths, offsets = AudioProcessor._concat_batch(clips)
+        peak = AudioProcessor._segment_peak(flat, lengths, offsets)
+        gains = (1.0 / np.where(peak > 0, peak, 1.0)).astype(np.float32)
+        flat *= np.repeat(gains, lengths)
+        return np.split(flat, offsets[1:])
+    
+    @staticmethod
+    def trim_silence_batch(clips: List[np.ndarray],
+                           top_db: float = 20,
+                           frame_length: int = 2048,
+                           hop_length: int = 512) -> List[np.ndarray]:
+        """
+        批量去除首尾静音，判定方式同 librosa.effects.trim（相对各段最大帧能量）
+        
+        Args:
+            clips: 音频列表
+            top_db: 低于最大帧能量多少分贝视为静音
+            frame_length: 帧长
+            hop_length: 帧移
+            
+        Returns:
+            List[np.ndarray]: 去除静音后的音频列表
+        """
+        if not clips:
+            return []
+        batch, lengths = AudioProcessor.pad_batch(clips)
+        
+        # 居中分帧：两侧各补半帧，借助平方和的累加和一次求出所有帧能量
+        half = frame_length // 2
+        padded = np.pad(batch.astype(np.float64) ** 2, ((0, 0), (half, half)))
+        cumsum = np.concatenate([np.zeros((len(clips), 1)), np.cumsum(padded, axis=1)], axis=1)
+        n_frames = 1 + (padded.shape[1] - frame_length) // hop_length if padded.shape[1] >= frame_length else 1
+        starts = np.arange(n_frames) * hop_length
+        ends = np.minimum(starts + frame_length, padded.shape[1])
+        energy = (cumsum[:, ends] - cumsum[:, starts]) / frame_length
+        
+        # 超出各段真实长度的帧不参与判定
+        valid = starts[None, :] < lengths[:, None]
+        energy = np.where(valid, energy, 0.0)
+        ref = energy.max(axis=1, keepdims=True)
+        # 与 librosa 的 power_to_db 一致，能量先截断到 amin：全静音（或极弱）的片段各帧都不低于阈值，整段保留
+        amin = 1e-10
+        loud = valid & (np.maximum(energy, amin) > np.maximum(ref, amin) * 10.0 ** (-top_db / 10.0))
+        
+        results = []
+        for i, length in enumerate(lengths):
+            frames = np.flatnonzero(loud[i])
+            if len(frames) == 0:
+                results.append(batch[i, :0])
+                continue
+            start = int(frames[0] * hop_length)
+            end = int(min(length, (frames[-1] + 1) * hop_length))
+            results.append(batch[i, start:end])
+        return results
+    
+    @staticmethod
+    def resample_batch(clips: List[np.ndarray], orig_sr: int, target_sr: int) -> List[np.ndarray]:
+        """
+        批量多相滤波重采样，同一采样率组合的滤波器只设计一次
+        
+        Args:
+            clips: 音频列表
+            orig_sr: 原采样率
+            target_sr: 目标采样率
+            
+        Returns:
+            List[np.ndarray]: 重采样后的音频列表
+        """
+        clips = [AudioProcessor.to_float(clip) for clip in clips]
+        if orig_sr == target_sr:
+            return clips
+        
+        up, down, fir = _polyphase_filter(int(orig_sr), int(target_sr))
+        # 各段长度差异大时补零对齐会浪费大量卷积计算，因此逐段滤波，只复用滤波器
+        return [
+            signal.resample_poly(clip, up, down, window=fir).astype(np.float32, copy=False)
+            for clip in clips
+        ]
+    
+    @staticmethod
+    def crossfade(first: np.ndarray, second: np.ndarray, fade_samples: int) -> np.ndarray:
+        """
+        等功率交叉淡化拼接两段音频
+        
+        Args:
+            first: 前一段音频
+            second: 后一段音频
+            fade_samples: 重叠采样数，超出任一段长度时自动截短
+            
+        Returns:
+            np.ndarray: 拼接后的音频
+        """
+        fade_samples = min(int(fade_samples), len(first), len(second))
+        if fade_samples <= 0:
+            return np.concatenate([first, second])
+        
+        # cos/sin 增益的平方和恒为 1，重叠区域能量保持不变
+        t = np.linspace(0.0, np.pi / 2, fade_samples, dtype=np.float32)
+        overlap = first[-fade_samples:] * np.cos(t) + second[:fade_samples] * np.sin(t)
+        return np.concatenate([first[:-fade_samples], overlap, second[fade_samples:]])
+    
+    @staticmethod
+    def concatenate_segments(segments: List[np.ndarray],
+                             sample_rate: int,
+                             silence_ms: float = 200,
+                             crossfade_ms: float = 20) -> np.ndarray:
+        """
+        按顺序拼接多段音频，段间插入静音并做等功率交叉淡化
+        
+        Args:
+            segments: 音频段列表
+            sample_rate: 采样率
+            silence_ms: 段间静音时长（毫秒）
+            crossfade_ms: 交叉淡化时长（毫秒），有静音时相当于段尾淡出、段首淡入
+            
+        Returns:
+            np.ndarray: 拼接后的单声道 float32 音频
+        """
+        segments = [AudioProcessor.to_float(segment) for segment in segments if len(segment)]
+        if not segments:
+            return np.zeros(0, dtype=np.float32)
+        
+        fade_samples = int(sample_rate * crossfade_ms / 1000)
+        silence_samples = int(sample_rate * silence_ms / 1000)
+        # 静音需覆盖两侧的淡化区域，保证两段语音之间仍有完整的静音
+        silence = np.zeros(silence_samples + 2 * fade_samples if silence_samples else 0, dtype=np.float32)
+        
+        result = segments[0]
+        for segment in segments[1:]:
+            if len(silence):
+                result = AudioProcessor.crossfade(result, silence, fade_samples)
+            result = AudioProcessor.crossfade(result, segment, fade_samples)
+        return result
+    
+    @staticmethod
+    def to_float(audio: np.ndarray) -> np.ndarray:
+        """
+        转换为单声道 float32 数据
+        
+        Args:
+            audio: 音频数据，整数数据按 16 位 PCM 处理
+            
+        Returns:
+            np.ndarray: 取值范围为 [-1, 1] 的一维音频数据
+        """
+        audio = np.asarray(audio)
+        if audio.dtype == np.int16:
+            audio = audio.astype(np.float32) / 32768.0
+        else:
+            audio = audio.astype(np.float32, copy=False)
+        if audio.ndim > 1:
+            audio = audio.reshape(audio.shape[0], -1).mean(axis=1)
+        return audio
+    
+    @staticmethod
+    def to_pcm16(audio: np.ndarray) -> bytes:
+        """
+        转换为 16 位小端 PCM 字节
+        
+        Args:
+            audio: 音频数据，浮点数据取值范围为 [-1, 1]，形状为 (samples,) 或 (samples, channels)
+            
+        Returns:
+            bytes: PCM 字节数据
+        """
+        audio = np.asarray(audio)
+        if audio.dtype != np.int16:
+            audio = np.clip(audio, -1.0, 1.0)
+            audio = (audio * 32767.0).astype(np.int16)
+        return audio.astype('<i2', copy=False).tobytes()
+    
+    @staticmethod
+    def to_wav_bytes(audio: np.ndarray, sample_rate: int) -> bytes:
+        """
+        在内存中编码为 16 位 PCM WAV 文件
+        
+        Args:
+            audio: 音频数据，形状为 (samples,) 或 (samples, channels)
+            sample_rate: 采样率
+            
+        Returns:
+            bytes: 完整的 WAV 文件内容
+        """
+        audio = np.asarray(audio)
+        channels = audio.shape[1] if audio.ndim == 2 else 1
+        pcm = AudioProcessor.to_pcm16(audio)
+        return AudioProcessor.build_wav_header(sample_rate, channels=channels, data_size=len(pcm)) + pcm
+    
+    @staticmethod
+    def build_wav_header(sample_rate: int,
+                         channels: int = 1,
+                         sample_width: int = 2,
+                         data_size: Optional[int] = None) -> bytes:
+        """
+        生成 WAV 文件头
+        
+        Args:
+            sample_rate: 采样率
+            channels: 声道数
+            sample_width: 每个采样的字节数
+            data_size: 音频数据字节数，为 None 时生成长度未定的流式文件头
+            
+        Returns:
+            bytes: 44 字节的 WAV 文件头
+        """
+        if data_size is None:
+            # 流式输出时长度未知，按惯例填入最大值
+            riff_size = data_size = 0xFFFFFFFF
+        else:
+            riff_size = 36 + data_size
+        
+        byte_rate = sample_rate * channels * sample_width
+        block_align = channels * sample_width
+        return struct.pack(
+            '<4sI4s4sIHHIIHH4sI',
+            b'RIFF', riff_size, b'WAVE',
+            b'fmt ', 16, 1, channels, sample_rate, byte_rate, block_align, sample_width * 8,
+            b'data', data_size
+        )
+
+
+@lru_cache(maxsize=32)
+def _polyphase_filter(orig_sr: int, target_sr: int) -> Tuple[int, int, np.ndarray]:
+    """按采样率组合缓存多相重采样的升降倍数与低通滤波器（设计方式同 scipy 默认值）"""
+    divisor = math.gcd(orig_sr, target_sr)
+    up, down = target_sr // divisor, orig_sr // divisor
+    max_rate = max(up, down)
+    fir = signal.firwin(2 * 10 * max_rate + 1, 1.0 / max_rate, window=('kaiser', 5.0)).astype(np.float32)
+    fir.setflags(write=False)
+    return up, down, fir
@@ -0,0 +1,341 @@
+"""
+分块音频流处理 - 以固定内存处理任意长度的录音
+"""
+
+import math
+from typing import Iterable, Iterator, Optional, Union
+
+import numpy as np
+import soundfile as sf
+
+from .audio_processor import AudioProcessor, _polyphase_filter
+
+
+class RunningStats:
+    """分块累计的峰值与 RMS"""
+
+    def __init__(self):
+        self.peak = 0.0
+        self.energy = 0.0
+        self.samples = 0
+
+    def update(self, block: np.ndarray):
+        """
+        累计一个音频块
+
+        Args:
+            block: 音频块
+        """
+        if block.size == 0:
+            return
+        self.peak = max(self.peak, float(np.max(np.abs(block))))
+        flat = block.reshape(-1)
+        self.energy += float(np.dot(flat.astype(np.float64, copy=False), flat))
+        self.samples += block.size
+
+    @property
+    def rms(self) -> float:
+        return math.sqrt(self.energy / self.samples) if self.samples else 0.0
+
+    def to_dict(self) -> dict:
+        return {"max_amplitude": self.peak, "rms": self.rms, "samples": self.samples}
+
+
+class StreamingResampler:
+    """流式多相重采样类，分块输入的结果与一次性调用 scipy.signal.resample_poly 一致"""
+
+    def __init__(self, orig_sr: int, target_sr: int):
+        """
+        初始化重采样器
+
+        Args:
+            orig_sr: 原采样率
+            target_sr: 目标采样率
+        """
+        self.orig_sr = int(orig_sr)
+        self.target_sr = int(target_sr)
+        self.up, self.down, fir = _polyphase_filter(self.orig_sr, self.target_sr)
+
+        h = fir.astype(np.float64) * self.up
+        # resample_poly 以滤波器中心对齐输出，补偿群延迟
+        self.delay = (len(h) - 1) // 2
+        self.taps = -(-len(h) // self.up)
+        h = np.pad(h, (0, self.taps * self.up - len(h)))
+        # phases[p, t] = h[p + t * up]：每个输出采样只需与对应相位的 taps 个输入做点积
+        self.phases = h.reshape(self.taps, self.up).T.copy()
+
+        # 历史输入，开头补零相当于信号前的静音
+        self._buffer = np.zeros(self.taps - 1, dtype=np.float64)
+        self._buffer_start = -(self.taps - 1)
+        self._consumed = 0
+        self._produced = 0
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """
+        输入一个单声道音频块
+
+        Args:
+            block: 音频块
+
+        Returns:
+            np.ndarray: 当前已可确定的输出采样
+        """
+        block = np.asarray(block, dtype=np.float64).reshape(-1)
+        if block.size == 0:
+            return np.zeros(0, dtype=np.float32)
+        self._buffer = np.concatenate([self._buffer, block])
+        self._consumed += block.size
+
+        # 所需输入均已到达的输出：(k * down + delay) // up <= consumed - 1
+        end = (self._consumed * self.up - 1 - self.delay) // self.down + 1
+        return self._emit(max(end, self._produced))
+
+    def flush(self) -> np.ndarray:
+        """
+        输入结束，输出剩余采样（信号之后视为静音）
+
+        Returns:
+            np.ndarray: 剩余输出采样
+        """
+        end = math.ceil(self._consumed * self.up / self.down)
+        if end <= self._produced:
+            return np.zeros(0, dtype=np.float32)
+        last_input = ((end - 1) * self.down + self.delay) // self.up
+        missing = last_input - (self._buffer_start + len(self._buffer)) + 1
+        if missing > 0:
+            self._buffer = np.concatenate([self._buffer, np.zeros(missing)])
+        return self._emit(end)
+
+    def _emit(self, end: int) -> np.ndarray:
+        ks = np.arange(self._produced, end)
+        if ks.size == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        m = ks * self.down + self.delay
+        phase = m % self.up
+        index = (m // self.up - self._buffer_start)[:, None] - np.arange(self.taps)[None, :]
+        output = np.einsum('kt,kt->k', self.phases[phase], self._buffer[index])
+        self._produced = end
+
+        # 丢弃后续输出不再需要的历史输入
+        next_first = (end * self.down + self.delay) // self.up - (self.taps - 1)
+        drop = min(max(0, next_first - self._buffer_start), len(self._buffer))
+        self._buffer = self._buffer[drop:]
+        self._buffer_start += drop
+        return output.astype(np.float32)
+
+
+class AudioStream:
+    """分块音频流处理类，所有方法的内存占用只与块大小有关"""
+
+    DEFAULT_BLOCK_SIZE = 65536
+
+    @staticmethod
+    def iter_blocks(source: Union[str, object],
+                    block_size: int = DEFAULT_BLOCK_SIZE,
+                    mono: bool = True) -> Iterator[np.ndarray]:
+        """
+        分块读取音频文件
+
+        Args:
+            source: 音频文件路径或文件对象
+            block_size: 每块帧数
+            mono: 是否下混为单声道
+
+        Yields:
+            np.ndarray: float32 音频块，单声道时形状为 (frames,)，否则为 (frames, channels)
+        """
+        for block in sf.blocks(source, blocksize=block_size, dtype='float32', always_2d=True):
+            yield block.mean(axis=1) if mono else block
+
+    @staticmethod
+    def load(source: Union[str, object],
+             sample_rate: Optional[int] = None,
+             block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[np.ndarray]:
+        """
+        分块读取并下混为单声道，按需重采样，对应 AudioProcessor.load_audio 的流式版本
+
+        Args:
+            source: 音频文件路径
+            sample_rate: 目标采样率，为 None 时保持原采样率
+            block_size: 每块帧数
+
+        Yields:
+            np.ndarray: 单声道 float32 音频块
+        """
+        orig_sr = AudioStream.get_sample_rate(source)
+        blocks = AudioStream.iter_blocks(source, block_size)
+        if sample_rate is None or sample_rate == orig_sr:
+            yield from blocks
+        else:
+            yield from AudioStream.resample(blocks, orig_sr, sample_rate)
+
+    @staticmethod
+    def get_sample_rate(source: Union[str, object]) -> int:
+        """读取文件头中的采样率"""
+        sample_rate = sf.info(source).samplerate
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return sample_rate
+
+    @staticmethod
+    def compute_stats(blocks: Iterable[np.ndarray]) -> RunningStats:
+        """
+        累计峰值与 RMS
+
+        Args:
+            blocks: 音频块
+
+        Returns:
+            RunningStats: 统计结果
+        """
+        stats = RunningStats()
+        for block in blocks:
+            stats.update(block)
+        return stats
+
+    @staticmethod
+    def resample(blocks: Iterable[np.ndarray], orig_sr: int, target_sr: int) -> Iterator[np.ndarray]:
+        """
+        流式重采样
+
+        Args:
+            blocks: 单声道音频块
+            orig_sr: 原采样率
+            target_sr: 目标采样率
+
+        Yields:
+            np.ndarray: 重采样后的音频块
+        """
+        if orig_sr == target_sr:
+            yield from blocks
+            return
+
+        resampler = StreamingResampler(orig_sr, target_sr)
+        for block in blocks:
+            output = resampler.process(block)
+            if output.size:
+                yield output
+        tail = resampler.flush()
+        if tail.size:
+            yield tail
+
+    @staticmethod
+    def normalize(source: str,
+                  block_size: int = DEFAULT_BLOCK_SIZE,
+                  peak: float = 1.0) -> Iterator[np.ndarray]:
+        """
+        峰值归一化：第一遍扫描峰值，第二遍按块缩放输出
+
+        Args:
+            source: 音频文件路径（需读取两遍）
+            block_size: 每块帧数
+            peak: 目标峰值
+
+        Yields:
+            np.ndarray: 归一化后的单声道音频块
+        """
+        stats = AudioStream.compute_stats(AudioStream.iter_blocks(source, block_size))
+        gain = peak / stats.peak if stats.peak > 0 else 1.0
+        for block in AudioStream.iter_blocks(source, block_size):
+            yield block * np.float32(gain)
+
+    @staticmethod
+    def trim_silence(blocks: Iterable[np.ndarray],
+                     sample_rate: int,
+                     threshold_db: float = -40.0,
+                     frame_ms: float = 20.0,
+                     max_lookahead_s: float = 10.0) -> Iterator[np.ndarray]:
+        """
+        去除首尾静音，向后最多缓存 max_lookahead_s 秒的静音
+
+        整段录音的最大能量在读完之前未知，因此阈值相对满幅（dBFS）而不是相对最大帧能量。
+        中间静音超过缓存上限时，超出部分按原样输出，结尾最多去除 max_lookahead_s 秒。
+
+        Args:
+            blocks: 单声道音频块
+            sample_rate: 采样率
+            threshold_db: 帧 RMS 低于该值（dBFS）视为静音
+            frame_ms: 判定帧长（毫秒）
+            max_lookahead_s: 最多缓存的静音时长（秒）
+
+        Yields:
+            np.ndarray: 去除静音后的音频块
+        """
+        frame = max(1, int(sample_rate * frame_ms / 1000))
+        max_pending = max(frame, int(sample_rate * max_lookahead_s))
+        threshold = 10.0 ** (threshold_db / 20.0)
+
+        carry = np.zeros(0, dtype=np.float32)
+        pending = []
+        pending_samples = 0
+        started = False
+
+        for block in blocks:
+            data = np.concatenate([carry, np.asarray(block, dtype=np.float32).reshape(-1)])
+            n_frames = len(data) // frame
+            carry = data[n_frames * frame:]
+            if n_frames == 0:
+                continue
+
+            frames = data[:n_frames * frame].reshape(n_frames, frame)
+            loud = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1)) > threshold
+            if not started:
+                if not loud.any():
+                    continue
+                # 丢弃开头的静音帧
+                first = int(np.argmax(loud))
+                frames, loud = frames[first:], loud[first:]
+                started = True
+
+            loud_frames = np.flatnonzero(loud)
+            if len(loud_frames):
+                # 有声帧之前缓存的静音属于中间停顿，原样输出
+                end = (int(loud_frames[-1]) + 1) * frame
+                yield from pending
+                pending, pending_samples = [], 0
+                yield frames.reshape(-1)[:end]
+                quiet = frames.reshape(-1)[end:]
+            else:
+                quiet = frames.reshape(-1)
+
+            if len(quiet):
+                pending.append(quiet)
+                pending_samples += len(quiet)
+            # 超出缓存上限的静音不可能全是结尾静音，按顺序输出最早的部分
+            while pending_samples > max_pending:
+                overflow = pending_samples - max_pending
+                head = pending[0]
+                if len(head) <= overflow:
+                    pending.pop(0)
+                    pending_samples -= len(head)
+                    yield head
+                else:
+                    pending[0] = head[overflow:]
+                    pending_samples -= overflow
+                    yield head[:overflow]
+        # 结束时缓存的静音与不足一帧的尾部均视为结尾静音，直接丢弃
+
+    @staticmethod
+    def write(blocks: Iterable[np.ndarray],
+              file_path: str,
+              sample_rate: int,
+              subtype: Optional[str] = None) -> int:
+        """
+        分块写入音频文件
+
+        Args:
+            blocks: 音频块
+            file_path: 输出文件路径
+            sample_rate: 采样率
+            subtype: soundfile 子类型，如 PCM_16，为 None 时按格式默认
+
+        Returns:
+            int: 写入的帧数
+        """
+        frames = 0
+        with sf.SoundFile(file_path, 'w', samplerate=sample_rate, channels=1, subtype=subtype) as f:
+            for block in blocks:
+                f.write(AudioProcessor.to_float(block))
+                frames += len(block)
+        return frames
@@ -0,0 +1,100 @@
+"""
+请求取消 - 截止时间与协作式取消，在任务出队前与分段之间检查
+"""
+
+import time
+import threading
+import logging
+from typing import Callable, List, Optional
+
+
+class RequestCancelledError(Exception):
+    """请求已取消或已超过截止时间"""
+
+    def __init__(self, reason: str):
+        """
+        Args:
+            reason: 取消原因，CancelToken.CANCELLED、DEADLINE 或 DISCONNECTED
+        """
+        super().__init__(f"请求已取消: {reason}")
+        self.reason = reason
+
+
+class CancelToken:
+    """取消令牌类：随请求传递，可显式取消，超过截止时间后也视为已取消"""
+
+    CANCELLED = "cancelled"
+    DEADLINE = "deadline"
+    DISCONNECTED = "disconnected"
+
+    def __init__(self, timeout: Optional[float] = None):
+        """
+        初始化取消令牌
+
+        Args:
+            timeout: 从现在起的超时时间（秒），为 None 时没有截止时间
+        """
+        self.deadline = time.monotonic() + float(timeout) if timeout is not None else None
+        self._reason: Optional[str] = None
+        self._callbacks: List[Callable[["CancelToken"], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def reason(self) -> Optional[str]:
+        """取消原因，未取消时为 None"""
+        if self._reason is None and self.deadline is not None and time.monotonic() >= self.deadline:
+            return self.DEADLINE
+        return self._reason
+
+    @property
+    def cancelled(self) -> bool:
+        """是否已取消或已超过截止时间"""
+        return self.reason is not None
+
+    def remaining(self) -> Optional[float]:
+        """距截止时间的秒数，没有截止时间时为 None"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def cancel(self, reason: str = CANCELLED):
+        """
+        取消请求并执行已注册的回调，重复取消无效
+
+        Args:
+            reason: 取消原因
+        """
+        with self._lock:
+            if self._reason is not None:
+                return
+            self._reason = reason
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            self._run_callback(callback)
+
+    def add_callback(self, callback: Callable[["CancelToken"], None]):
+        """
+        注册取消回调（如将排队中的任务移出队列），已取消时立即执行
+
+        截止时间到达本身不会触发回调，由持有方在检查时调用 cancel(DEADLINE)
+
+        Args:
+            callback: 回调函数，参数为本令牌
+        """
+        with self._lock:
+            if self._reason is None:
+                self._callbacks.append(callback)
+                return
+        self._run_callback(callback)
+
+    def raise_if_cancelled(self):
+        """已取消时抛出 RequestCancelledError"""
+        reason = self.reason
+        if reason is not None:
+            raise RequestCancelledError(reason)
+
+    def _run_callback(self, callback: Callable[["CancelToken"], None]):
+        try:
+            callback(self)
+        except Exception as e:
+            logging.error(f"取消回调执行失败: {e}")
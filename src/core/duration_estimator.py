@@ -0,0 +1,234 @@
+"""
+合成时长估计 - 从实际合成结果学习各参考语音的语速与模型耗时，预测音频时长与推理耗时
+"""
+
+import os
+import json
+import time
+import threading
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from ..utils.text_utils import TextUtils
+
+
+class DurationEstimator:
+    """时长估计器类：按参考语音维护指数衰减的语速统计，样本少时向全局统计收缩"""
+
+    # 全局统计的键，汇总所有参考语音
+    GLOBAL_KEY = "__global__"
+
+    def __init__(self,
+                 stats_path: Optional[Union[str, Path]] = None,
+                 default_seconds_per_unit: float = 0.3,
+                 default_realtime_factor: float = 1.0,
+                 prior_units: float = 50.0,
+                 decay: float = 0.99,
+                 save_interval: float = 30.0,
+                 max_voices: int = 1024):
+        """
+        初始化时长估计器
+
+        Args:
+            stats_path: 统计数据 JSON 文件路径，为 None 时不持久化
+            default_seconds_per_unit: 无统计时每个文本单位（汉字或英文单词）的音频秒数，0.3 即每分钟 200 字
+            default_realtime_factor: 无统计时的实时率（音频秒数 / 推理秒数）
+            prior_units: 先验的等效样本量（文本单位数），参考语音样本少于该量级时主要参考全局统计
+            decay: 每记录一次，已有统计的衰减系数，使估计跟随模型与硬件的变化
+            save_interval: 自动保存的最小间隔（秒）
+            max_voices: 最多保留的参考语音统计数，超出时淘汰最久未更新的
+        """
+        self.stats_path = Path(stats_path) if stats_path else None
+        self.default_seconds_per_unit = float(default_seconds_per_unit)
+        self.default_realtime_factor = float(default_realtime_factor)
+        self.prior_units = float(prior_units)
+        self.decay = float(decay)
+        self.save_interval = float(save_interval)
+        self.max_voices = max(1, int(max_voices))
+
+        # 键 -> {"units", "audio", "wall", "wall_audio", "count", "updated_at"}，
+        # 前四项为衰减累计值，wall_audio 只累计有推理耗时的样本的音频时长
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._last_save = time.monotonic()
+        self._dirty = False
+        self._load()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "DurationEstimator":
+        """
+        根据配置创建估计器
+
+        Args:
+            config: estimator 配置段
+
+        Returns:
+            DurationEstimator: 估计器实例
+        """
+        config = config or {}
+        return cls(
+            stats_path=config.get("stats_path", "outputs/duration_stats.json"),
+            default_seconds_per_unit=config.get("default_seconds_per_unit", 0.3),
+            default_realtime_factor=config.get("default_realtime_factor", 1.0),
+            prior_units=config.get("prior_units", 50),
+            decay=config.get("decay", 0.99),
+            save_interval=config.get("save_interval", 30),
+            max_voices=config.get("max_voices", 1024)
+        )
+
+    @staticmethod
+    def count_units(text: str) -> int:
+        """文本单位数：汉字数加英文单词数，至少为 1"""
+        return max(1, TextUtils.count_words(text))
+
+    def record(self,
+               text: str,
+               audio_seconds: float,
+               wall_seconds: Optional[float] = None,
+               voice_key: Optional[str] = None):
+        """
+        记录一次完成的合成
+
+        Args:
+            text: 合成的文本
+            audio_seconds: 生成的音频时长（秒）
+            wall_seconds: 推理耗时（秒），未知时只更新语速
+            voice_key: 参考语音键（内容哈希），为 None 时只更新全局统计
+        """
+        if audio_seconds <= 0:
+            return
+        units = self.count_units(text)
+        now = time.time()
+        with self._lock:
+            keys = [self.GLOBAL_KEY] if voice_key is None else [self.GLOBAL_KEY, voice_key]
+            for key in keys:
+                entry = self._stats.get(key)
+                if entry is None:
+                    entry = self._stats[key] = {"units": 0.0, "audio": 0.0, "wall": 0.0,
+                                                "wall_audio": 0.0, "count": 0}
+                for field in ("units", "audio", "wall", "wall_audio"):
+                    entry[field] *= self.decay
+                entry["units"] += units
+                entry["audio"] += audio_seconds
+                if wall_seconds is not None and wall_seconds > 0:
+                    entry["wall"] += wall_seconds
+                    entry["wall_audio"] += audio_seconds
+                entry["count"] += 1
+                entry["updated_at"] = now
+            self._evict()
+            self._dirty = True
+            should_save = time.monotonic() - self._last_save >= self.save_interval
+        if should_save:
+            self.save()
+
+    def seconds_per_unit(self, voice_key: Optional[str] = None) -> float:
+        """
+        每个文本单位的预计音频秒数
+
+        Args:
+            voice_key: 参考语音键，为 None 或无统计时使用全局统计
+
+        Returns:
+            float: 秒数
+        """
+        with self._lock:
+            global_rate = self._rate(self._stats.get(self.GLOBAL_KEY), self.default_seconds_per_unit)
+            if voice_key is None:
+                return global_rate
+            return self._rate(self._stats.get(voice_key), global_rate)
+
+    def realtime_factor(self) -> float:
+        """预计实时率（音频秒数 / 推理秒数）"""
+        with self._lock:
+            entry = self._stats.get(self.GLOBAL_KEY)
+            # 先验：prior_units 个单位的音频按默认实时率合成
+            prior_audio = self.prior_units * self.default_seconds_per_unit
+            audio = prior_audio + (entry["wall_audio"] if entry else 0.0)
+            wall = prior_audio / self.default_realtime_factor + (entry["wall"] if entry else 0.0)
+        return audio / wall if wall > 0 else self.default_realtime_factor
+
+    def predict(self, text: str, voice_key: Optional[str] = None) -> Dict[str, float]:
+        """
+        预测合成结果
+
+        Args:
+            text: 要合成的文本
+            voice_key: 参考语音键
+
+        Returns:
+            Dict[str, float]: units（文本单位数）、audio_seconds（预计音频时长）、
+            inference_seconds（预计推理耗时）
+        """
+        units = self.count_units(text)
+        audio_seconds = units * self.seconds_per_unit(voice_key)
+        return {
+            "units": units,
+            "audio_seconds": audio_seconds,
+            "inference_seconds": audio_seconds / self.realtime_factor()
+        }
+
+    def predict_audio_seconds(self, text: str, voice_key: Optional[str] = None) -> float:
+        """预计音频时长（秒）"""
+        return self.count_units(text) * self.seconds_per_unit(voice_key)
+
+    def predict_inference_seconds(self, text: str, voice_key: Optional[str] = None) -> float:
+        """预计推理耗时（秒）"""
+        return self.predict_audio_seconds(text, voice_key) / self.realtime_factor()
+
+    def get_stats(self) -> dict:
+        """获取全局统计与已学习的参考语音数"""
+        with self._lock:
+            voices = len(self._stats) - (1 if self.GLOBAL_KEY in self._stats else 0)
+            samples = self._stats.get(self.GLOBAL_KEY, {}).get("count", 0)
+        return {
+            "seconds_per_unit": self.seconds_per_unit(),
+            "realtime_factor": self.realtime_factor(),
+            "samples": samples,
+            "voices": voices
+        }
+
+    def save(self):
+        """将统计数据写入文件（原子替换）"""
+        if self.stats_path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps({"version": 1, "stats": self._stats}, ensure_ascii=False)
+            self._dirty = False
+            self._last_save = time.monotonic()
+        try:
+            self.stats_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.stats_path.with_suffix(".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, self.stats_path)
+        except OSError as e:
+            logging.warning(f"保存时长统计失败: {e}")
+
+    def _rate(self, entry: Optional[Dict[str, float]], prior_rate: float) -> float:
+        """按先验收缩的每单位秒数（调用方需持有锁）"""
+        if not entry:
+            return prior_rate
+        return (entry["audio"] + prior_rate * self.prior_units) / (entry["units"] + self.prior_units)
+
+    def _evict(self):
+        """淘汰最久未更新的参考语音统计（调用方需持有锁）"""
+        voices = len(self._stats) - (1 if self.GLOBAL_KEY in self._stats else 0)
+        if voices <= self.max_voices:
+            return
+        candidates = sorted(
+            (entry.get("updated_at", 0), key) for key, entry in self._stats.items() if key != self.GLOBAL_KEY
+        )
+        for _, key in candidates[:voices - self.max_voices]:
+            del self._stats[key]
+
+    def _load(self):
+        if self.stats_path is None or not self.stats_path.exists():
+            return
+        try:
+            with open(self.stats_path, 'r', encoding='utf-8') as f:
+                self._stats = json.load(f).get("stats", {})
+        except (OSError, ValueError) as e:
+            logging.warning(f"加载时长统计失败: {e}")
@@ -0,0 +1,200 @@
+"""
+模型后台加载器 - 在后台线程中加载并预热模型，对外报告加载进度
+"""
+
+import os
+import time
+import tempfile
+import threading
+import logging
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import soundfile as sf
+
+
+class ModelLoader:
+    """模型后台加载器类"""
+
+    PENDING = "pending"
+    LOADING = "loading"
+    WARMING_UP = "warming_up"
+    READY = "ready"
+    FAILED = "failed"
+
+    def __init__(self,
+                 load_fn: Callable[[Callable[[int, int], None]], Any],
+                 warmup_fn: Optional[Callable[[Any], None]] = None):
+        """
+        初始化加载器
+
+        Args:
+            load_fn: 加载函数，参数为进度回调 (已完成数, 总数)，返回加载好的模型
+            warmup_fn: 预热函数，参数为加载好的模型；为 None 时跳过预热
+        """
+        self.load_fn = load_fn
+        self.warmup_fn = warmup_fn
+        self.model = None
+        self.state = self.PENDING
+        self.error = None
+        self.progress = {"loaded": 0, "total": 0}
+        self.timings = {}
+
+        self._ready_event = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == self.READY
+
+    def start(self, background: bool = True):
+        """
+        开始加载
+
+        Args:
+            background: 是否在后台线程中加载
+        """
+        with self._lock:
+            if self._thread is not None or self.state != self.PENDING:
+                return
+            self.state = self.LOADING
+            if background:
+                self._thread = threading.Thread(target=self._run, name="model-loader", daemon=True)
+                self._thread.start()
+                return
+        self._run()
+
+    def set_model(self, model: Any):
+        """
+        直接设置已加载好的模型并标记为就绪（用于注入外部创建的模型）
+
+        Args:
+            model: 模型
+        """
+        with self._lock:
+            self.model = model
+            self.state = self.READY if model is not None else self.PENDING
+            self.error = None
+        if model is not None:
+            self._ready_event.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待加载结束
+
+        Args:
+            timeout: 超时时间（秒）
+
+        Returns:
+            bool: 模型是否已就绪
+        """
+        self._ready_event.wait(timeout)
+        return self.is_ready
+
+    def get_status(self) -> Dict[str, Any]:
+        """获取加载状态"""
+        with self._lock:
+            return {
+                "state": self.state,
+                "ready": self.state == self.READY,
+                "progress": dict(self.progress),
+                "timings": dict(self.timings),
+                "error": self.error
+            }
+
+    def _set_progress(self, loaded: int, total: int):
+        with self._lock:
+            self.progress = {"loaded": loaded, "total": total}
+
+    def _set_state(self, state: str, error: Optional[str] = None):
+        with self._lock:
+            self.state = state
+            self.error = error
+
+    def _run(self):
+        try:
+            start = time.perf_counter()
+            model = self.load_fn(self._set_progress)
+            self.timings["load_seconds"] = round(time.perf_counter() - start, 3)
+
+            if self.warmup_fn is not None:
+                self._set_state(self.WARMING_UP)
+                start = time.perf_counter()
+                try:
+                    self.warmup_fn(model)
+                except Exception as e:
+                    # 预热失败不影响服务，首个请求会承担预热开销
+                    logging.warning(f"模型预热失败: {e}")
+                self.timings["warmup_seconds"] = round(time.perf_counter() - start, 3)
+
+            self.model = model
+            self._set_state(self.READY)
+            logging.info(f"模型加载完成: {self.timings}")
+        except Exception as e:
+            logging.error(f"TTS 模型初始化失败: {e}")
+            self._set_state(self.FAILED, str(e))
+        finally:
+            self._ready_event.set()
+
+    @staticmethod
+    def warmup_model(model: Any, text: str, voice_path: Optional[str] = None):
+        """
+        执行一次预热合成，触发 JIT 编译与显存分配器预热
+
+        Args:
+            model: 提供 warmup(text, voice_path) 方法的 TTSWrapper 或 ModelPool
+            text: 预热文本
+            voice_path: 预热参考语音，为 None 时使用合成音
+        """
+        temp_voice = None
+        if not voice_path or not os.path.exists(voice_path):
+            voice_path = temp_voice = ModelLoader.make_warmup_voice()
+        try:
+            model.warmup(text, voice_path)
+        finally:
+            if temp_voice:
+                os.unlink(temp_voice)
+
+    @classmethod
+    def from_config(cls,
+                    load_fn: Callable[[Callable[[int, int], None]], Any],
+                    startup_config: Optional[Dict[str, Any]] = None) -> "ModelLoader":
+        """
+        根据配置创建加载器
+
+        Args:
+            load_fn: 加载函数
+            startup_config: startup 配置段
+
+        Returns:
+            ModelLoader: 加载器实例
+        """
+        startup_config = startup_config or {}
+        warmup_fn = None
+        if startup_config.get("warmup", True):
+            text = startup_config.get("warmup_text", "你好，欢迎使用语音合成服务。")
+            voice_path = startup_config.get("warmup_voice")
+            warmup_fn = lambda model: cls.warmup_model(model, text, voice_path)
+        return cls(load_fn, warmup_fn)
+
+    @staticmethod
+    def make_warmup_voice(sample_rate: int = 22050, duration: float = 3.0) -> str:
+        """
+        生成预热用的参考音频（带谐波的合成音），未配置预热参考语音时使用
+
+        Args:
+            sample_rate: 采样率
+            duration: 时长（秒）
+
+        Returns:
+            str: 临时 WAV 文件路径，由调用方删除
+        """
+        t = np.arange(int(sample_rate * duration), dtype=np.float32) / sample_rate
+        audio = sum(np.sin(2 * np.pi * 150.0 * k * t) / k for k in range(1, 6))
+        audio = 0.3 * audio / np.max(np.abs(audio))
+
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        sf.write(path, audio, sample_rate)
+        return path
@@ -0,0 +1,297 @@
+"""
+模型副本池 - 在同一进程内加载多个 TTSWrapper 副本，并将请求路由到最空闲的副本
+"""
+
+import os
+import re
+import time
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .tts_wrapper import TTSWrapper
+from .speaker_cache import SpeakerConditioningCache
+from .voice_store import VoiceStore
+from .duration_estimator import DurationEstimator
+from .cancellation import CancelToken, RequestCancelledError
+from ..utils.text_utils import TextUtils
+from ..utils.metrics import metrics
+
+# 由请求本身导致的错误（参考语音无效或不存在、参数无效、请求已取消），不计入副本的失败次数
+CLIENT_ERRORS = (ValueError, TypeError, OSError, RequestCancelledError)
+
+
+class ModelReplica:
+    """模型副本及其负载、健康状态"""
+
+    def __init__(self, index: int, wrapper: TTSWrapper):
+        """
+        初始化模型副本
+
+        Args:
+            index: 副本编号
+            wrapper: TTS 包装器
+        """
+        self.index = index
+        self.wrapper = wrapper
+        self.in_flight = 0
+        self.total_requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.healthy = True
+        self.unhealthy_since = None
+
+    def to_dict(self) -> dict:
+        return {
+            "index": self.index,
+            "device": self.wrapper.device,
+            "healthy": self.healthy,
+            "in_flight": self.in_flight,
+            "total_requests": self.total_requests,
+            "failures": self.failures
+        }
+
+
+class ModelPool:
+    """模型副本池类"""
+
+    def __init__(self,
+                 wrappers: List[TTSWrapper],
+                 max_consecutive_failures: int = 3,
+                 recovery_seconds: float = 30.0):
+        """
+        初始化模型副本池
+
+        Args:
+            wrappers: 已加载的 TTS 包装器列表
+            max_consecutive_failures: 连续失败多少次后将副本标记为不健康
+            recovery_seconds: 不健康副本在多少秒后重新参与路由
+        """
+        if not wrappers:
+            raise ValueError("模型副本池至少需要一个副本")
+
+        self.replicas = [ModelReplica(i, wrapper) for i, wrapper in enumerate(wrappers)]
+        self.max_consecutive_failures = max(1, int(max_consecutive_failures))
+        self.recovery_seconds = recovery_seconds
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls,
+                    tts_config: Dict[str, Any],
+                    pool_config: Optional[Dict[str, Any]] = None,
+                    speaker_cache_config: Optional[Dict[str, Any]] = None,
+                    voice_store: Optional[VoiceStore] = None,
+                    duration_estimator: Optional[DurationEstimator] = None,
+                    progress_callback: Optional[Callable[[int, int], None]] = None) -> "ModelPool":
+        """
+        根据配置加载模型副本
+
+        Args:
+            tts_config: tts 配置段，作为每个副本的 TTSWrapper 参数
+            pool_config: model_pool 配置段
+            speaker_cache_config: cache.speaker 配置段
+            voice_store: 参考语音存储，所有副本共用
+            duration_estimator: 时长估计器，所有副本共用
+            progress_callback: 加载进度回调，参数为 (已加载副本数, 副本总数)
+
+        Returns:
+            ModelPool: 模型副本池
+        """
+        pool_config = pool_config or {}
+        speaker_cache_config = speaker_cache_config or {}
+        num_replicas = max(1, int(pool_config.get("replicas", 1)))
+        devices = pool_config.get("devices") or [tts_config.get("device")]
+
+        cls._configure_threads(pool_config.get("threads_per_replica"), num_replicas)
+
+        wrappers = []
+        if progress_callback:
+            progress_callback(0, num_replicas)
+        for i in range(num_replicas):
+            device = devices[i % len(devices)]
+            wrapper_config = dict(tts_config)
+            wrapper_config["device"] = device
+            wrappers.append(TTSWrapper(
+                speaker_cache=cls._create_speaker_cache(speaker_cache_config, device),
+                use_speaker_cache=speaker_cache_config.get("enabled", True),
+                voice_store=voice_store,
+                duration_estimator=duration_estimator,
+                **wrapper_config
+            ))
+            logging.info(f"已加载模型副本 {i+1}/{num_replicas}，设备: {device or 'auto'}")
+            if progress_callback:
+                progress_callback(i + 1, num_replicas)
+
+        return cls(
+            wrappers,
+            max_consecutive_failures=pool_config.get("max_consecutive_failures", 3),
+            recovery_seconds=pool_config.get("recovery_seconds", 30)
+        )
+
+    @staticmethod
+    def _create_speaker_cache(config: Dict[str, Any], device: Optional[str]) -> SpeakerConditioningCache:
+        """每个副本使用独立的说话人条件缓存，磁盘层按设备分目录，避免张量跨设备加载"""
+        config = dict(config)
+        if config.get("disk_dir") and device:
+            config["disk_dir"] = os.path.join(config["disk_dir"], re.sub(r'[^\w.-]', '_', device))
+        return SpeakerConditioningCache.from_config(config)
+
+    @staticmethod
+    def _configure_threads(threads_per_replica: Optional[int], num_replicas: int):
+        """限制 PyTorch 的 CPU 线程数，避免多个副本争抢同一批核心"""
+        if not threads_per_replica and num_replicas == 1:
+            return
+
+        threads = threads_per_replica or max(1, (os.cpu_count() or 1) // num_replicas)
+        try:
+            import torch
+            # PyTorch 的线程数是进程级设置，所有副本共享
+            torch.set_num_threads(int(threads))
+            logging.info(f"每个模型副本的 CPU 线程数: {threads}")
+        except ImportError:
+            pass
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    @contextmanager
+    def acquire(self, index: Optional[int] = None) -> Iterator[TTSWrapper]:
+        """
+        获取当前最空闲的健康副本，使用期间计入该副本的负载
+
+        Args:
+            index: 指定副本序号，为 None 时按负载选择
+
+        Yields:
+            TTSWrapper: 被选中的副本
+        """
+        replica = self._select(index)
+        try:
+            yield replica.wrapper
+        except CLIENT_ERRORS:
+            self._release(replica, success=None)
+            raise
+        except Exception:
+            self._release(replica, success=False)
+            raise
+        else:
+            self._release(replica, success=True)
+
+    def synthesize(self, text: str, voice_path, output_path: str, **kwargs) -> bool:
+        """语音合成，参数同 TTSWrapper.synthesize"""
+        try:
+            with self.acquire() as wrapper:
+                wrapper.synthesize_file(text, voice_path, output_path, **kwargs)
+            return True
+        except Exception as e:
+            logging.error(f"语音合成失败: {e}")
+            return False
+
+    def synthesize_array(self, text: str, voice_path: str, **kwargs) -> Tuple[int, np.ndarray]:
+        """语音合成并返回内存中的音频，参数同 TTSWrapper.synthesize_array"""
+        with self.acquire() as wrapper:
+            return wrapper.synthesize_array(text, voice_path, **kwargs)
+
+    def synthesize_stream(self,
+                          text: str,
+                          voice_path: str,
+                          max_length: int = 120,
+                          emotion_fn: Optional[Callable[[str], Optional[List[float]]]] = None,
+                          cancel_token: Optional[CancelToken] = None,
+                          **kwargs) -> Iterator[Tuple[int, np.ndarray]]:
+        """分段流式语音合成，每段单独路由到最空闲的副本，参数同 TTSWrapper.synthesize_stream"""
+        with metrics.timer("text_segment"):
+            segments = TextUtils.split_text(text, max_length=max_length)
+        for segment in segments:
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            yield self.synthesize_array(
+                segment, voice_path, **TTSWrapper.segment_params(segment, kwargs, emotion_fn)
+            )
+
+    def synthesize_long(self, text: str, voice_path: str, **kwargs) -> Tuple[int, np.ndarray]:
+        """
+        长文本合成，各段分散到所有副本并发执行，参数同 TTSWrapper.synthesize_long
+        """
+        kwargs.setdefault("max_workers", len(self.replicas))
+        return self.replicas[0].wrapper.synthesize_long(
+            text, voice_path, synthesize_fn=self.synthesize_array, **kwargs
+        )
+
+    def batch_infer(self, texts: List[str], voice_path: str, **kwargs) -> List[Tuple[int, np.ndarray]]:
+        """批量推理，参数同 TTSWrapper.batch_infer"""
+        with self.acquire() as wrapper:
+            return wrapper.batch_infer(texts, voice_path, **kwargs)
+
+    def batch_synthesize(self, texts: List[str], voice_path: str, output_dir: str, **kwargs) -> List[str]:
+        """批量语音合成，参数同 TTSWrapper.batch_synthesize"""
+        with self.acquire() as wrapper:
+            return wrapper.batch_synthesize(texts, voice_path, output_dir, **kwargs)
+
+    def warmup(self, text: str, voice_path: str):
+        """依次预热每个副本"""
+        for replica in self.replicas:
+            replica.wrapper.warmup(text, voice_path)
+
+    def precompute_conditioning(self, index: int, voice_path: str, text: str) -> bool:
+        """在指定副本上预先计算说话人条件，参数同 TTSWrapper.precompute_conditioning"""
+        with self.acquire(index) as wrapper:
+            return wrapper.precompute_conditioning(voice_path, text)
+
+    def get_model_info(self) -> dict:
+        """获取模型信息"""
+        info = self.replicas[0].wrapper.get_model_info()
+        info["replicas"] = self.get_stats()
+        return info
+
+    def get_stats(self) -> List[dict]:
+        """获取各副本的负载与健康状态"""
+        with self._lock:
+            return [replica.to_dict() for replica in self.replicas]
+
+    def healthy_count(self) -> int:
+        """健康副本数"""
+        with self._lock:
+            return sum(1 for replica in self.replicas if replica.healthy)
+
+    def _select(self, index: Optional[int] = None) -> ModelReplica:
+        """选择负载最低的健康副本；全部不健康时退化为在所有副本中选择；指定序号时直接使用该副本"""
+        now = time.monotonic()
+        with self._lock:
+            if index is not None:
+                replica = self.replicas[index]
+                replica.in_flight += 1
+                replica.total_requests += 1
+                return replica
+
+            for replica in self.replicas:
+                if not replica.healthy and now - replica.unhealthy_since >= self.recovery_seconds:
+                    # 冷却结束后允许重新尝试
+                    replica.healthy = True
+                    replica.consecutive_failures = self.max_consecutive_failures - 1
+
+            candidates = [replica for replica in self.replicas if replica.healthy] or self.replicas
+            replica = min(candidates, key=lambda r: (r.in_flight, r.total_requests))
+            replica.in_flight += 1
+            replica.total_requests += 1
+            return replica
+
+    def _release(self, replica: ModelReplica, success: Optional[bool]):
+        """释放副本；success 为 None 表示请求本身出错，副本的失败计数保持不变"""
+        with self._lock:
+            replica.in_flight -= 1
+            if success is None:
+                return
+            if success:
+                replica.consecutive_failures = 0
+                return
+
+            replica.failures += 1
+            replica.consecutive_failures += 1
+            if replica.healthy and replica.consecutive_failures >= self.max_consecutive_failures:
+                replica.healthy = False
+                replica.unhealthy_since = time.monotonic()
+                logging.warning(f"模型副本 {replica.index} 连续失败 {replica.consecutive_failures} 次，暂停路由")
@@ -0,0 +1,237 @@
+"""
+合成结果缓存 - 以请求内容寻址缓存已合成的 WAV 文件
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Union
+
+
+class AudioResultCache:
+    """合成结果缓存类（按字节预算 LRU 淘汰）"""
+
+    def __init__(self,
+                 cache_dir: Union[str, Path] = "outputs/cache",
+                 max_bytes: int = 1024 * 1024 * 1024):
+        """
+        初始化合成结果缓存
+
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 缓存最大占用字节数
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = int(max_bytes)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # key -> 文件大小，按最近访问排序
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._load_index()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "AudioResultCache":
+        """
+        根据配置创建缓存
+
+        Args:
+            config: cache.result 配置段
+
+        Returns:
+            AudioResultCache: 缓存实例
+        """
+        config = config or {}
+        return cls(
+            cache_dir=config.get("dir", "outputs/cache"),
+            max_bytes=int(config.get("max_mb", 1024)) * 1024 * 1024
+        )
+
+    @staticmethod
+    def make_key(text: str,
+                 voice_hash: str,
+                 emotion_vector: Optional[List[float]] = None,
+                 use_emo_text: bool = False,
+                 emo_text: Optional[str] = None,
+                 emo_alpha: float = 0.6,
+                 auto_emotion: bool = False) -> str:
+        """
+        计算请求的内容寻址键
+
+        Args:
+            text: 要合成的文本
+            voice_hash: 参考音频内容哈希
+            emotion_vector: 情感向量
+            use_emo_text: 是否使用文本情感
+            emo_text: 情感文本
+            emo_alpha: 情感强度
+            auto_emotion: 是否逐段自动标注情感
+
+        Returns:
+            str: 缓存键
+        """
+        params = {
+            "text": text,
+            "voice": voice_hash,
+            "emotion_vector": emotion_vector,
+            "use_emo_text": use_emo_text,
+            "emo_text": emo_text,
+            "emo_alpha": round(float(emo_alpha), 6)
+        }
+        # 仅在开启时加入，保持已有缓存键不变
+        if auto_emotion:
+            params["auto_emotion"] = True
+        payload = json.dumps(params, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Path]:
+        """
+        获取缓存的音频文件
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[Path]: 缓存文件路径，未命中时返回 None
+        """
+        with self._lock:
+            if key not in self._entries:
+                self._stats["misses"] += 1
+                return None
+
+            path = self._path_for(key)
+            if not path.exists():
+                self._total_bytes -= self._entries.pop(key)
+                self._stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return path
+
+    def read(self, key: str) -> Optional[bytes]:
+        """
+        读取缓存的音频数据
+
+        命中后文件可能随即被并发的淘汰删除，调用方拿到数据后不再依赖缓存文件
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[bytes]: WAV 数据，未命中或文件已被淘汰时返回 None
+        """
+        path = self.get(key)
+        if path is None:
+            return None
+        try:
+            return path.read_bytes()
+        except OSError:
+            with self._lock:
+                self._stats["hits"] -= 1
+                self._stats["misses"] += 1
+            return None
+
+    def put(self, key: str, source: Union[str, Path, bytes]) -> Optional[Path]:
+        """
+        将合成结果加入缓存
+
+        Args:
+            key: 缓存键
+            source: 已合成的音频文件路径，或内存中的 WAV 数据
+
+        Returns:
+            Optional[Path]: 缓存文件路径，失败时返回 None
+        """
+        path = self._path_for(key)
+        # 每次写入使用独立的临时文件，同一键的并发写入不会把半写或交错的文件替换进缓存
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.cache_dir)
+        try:
+            if isinstance(source, (bytes, bytearray, memoryview)):
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(source)
+            else:
+                os.close(fd)
+                # 复制而非硬链接，避免源文件被覆盖写入时污染缓存
+                shutil.copyfile(source, tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logging.warning(f"写入合成结果缓存失败: {e}")
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return None
+
+        size = path.stat().st_size
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)
+            self._entries[key] = size
+            self._total_bytes += size
+            self._evict()
+            if key not in self._entries:
+                return None
+        return path
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+
+    def get_stats(self) -> dict:
+        """获取缓存统计信息"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["items"] = len(self._entries)
+            stats["bytes"] = self._total_bytes
+            total = stats["hits"] + stats["misses"]
+            stats["hit_ratio"] = stats["hits"] / total if total else 0.0
+            return stats
+
+    def _path_for(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.wav"
+
+    def _load_index(self):
+        """扫描缓存目录重建索引，按修改时间恢复 LRU 顺序"""
+        files = []
+        for path in self.cache_dir.glob("*.wav"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, path.stem, stat.st_size))
+
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total_bytes += size
+
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        """淘汰最久未访问的条目直到满足字节预算（调用方需持有锁）"""
+        while self._total_bytes > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            self._remove(key)
+            self._stats["evictions"] += 1
+
+    def _remove(self, key: str):
+        """删除条目（调用方需持有锁）"""
+        self._total_bytes -= self._entries.pop(key)
+        try:
+            self._path_for(key).unlink()
+        except OSError:
+            pass
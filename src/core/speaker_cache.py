@@ -0,0 +1,206 @@
+"""
+说话人条件缓存 - 按参考音频内容哈希缓存 IndexTTS2 的说话人/风格条件
+"""
+
+import os
+import pickle
+import tempfile
+import threading
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Any, Union
+
+
+class SpeakerConditioningCache:
+    """说话人条件缓存类（内存 LRU + 可选磁盘层）"""
+
+    def __init__(self,
+                 max_items: int = 64,
+                 disk_dir: Optional[Union[str, Path]] = None,
+                 disk_max_bytes: int = 512 * 1024 * 1024):
+        """
+        初始化说话人条件缓存
+
+        Args:
+            max_items: 内存层最大条目数
+            disk_dir: 磁盘层目录，为 None 时不启用磁盘层
+            disk_max_bytes: 磁盘层最大占用字节数
+        """
+        self.max_items = max(1, int(max_items))
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = int(disk_max_bytes)
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "disk_evictions": 0
+        }
+
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "SpeakerConditioningCache":
+        """
+        根据配置创建缓存
+
+        Args:
+            config: cache.speaker 配置段
+
+        Returns:
+            SpeakerConditioningCache: 缓存实例
+        """
+        config = config or {}
+        return cls(
+            max_items=config.get("memory_items", 64),
+            disk_dir=config.get("disk_dir"),
+            disk_max_bytes=int(config.get("disk_max_mb", 512)) * 1024 * 1024
+        )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        获取缓存的条件
+
+        Args:
+            key: 参考音频内容哈希
+
+        Returns:
+            Optional[Dict[str, Any]]: 条件字典，未命中时返回 None
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return entry
+
+        entry = self._load_from_disk(key)
+
+        with self._lock:
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+
+            self._stats["disk_hits"] += 1
+            self._put_memory(key, entry)
+            return entry
+
+    def put(self, key: str, entry: Dict[str, Any]):
+        """
+        写入缓存
+
+        Args:
+            key: 参考音频内容哈希
+            entry: 条件字典
+        """
+        with self._lock:
+            self._put_memory(key, entry)
+
+        self._save_to_disk(key, entry)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            if key in self._memory:
+                return True
+        return self.disk_dir is not None and self._disk_path(key).exists()
+
+    def clear(self):
+        """清空缓存（包括磁盘层）"""
+        with self._lock:
+            self._memory.clear()
+            if self.disk_dir is not None:
+                for path in self.disk_dir.glob("*.pkl"):
+                    try:
+                        path.unlink()
+                    except OSError:
+                        pass
+
+    def get_stats(self) -> dict:
+        """获取缓存统计信息"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_items"] = len(self._memory)
+            hits = stats["memory_hits"] + stats["disk_hits"]
+            total = hits + stats["misses"]
+            stats["hit_ratio"] = hits / total if total else 0.0
+            if self.disk_dir is not None:
+                stats["disk_bytes"] = sum(p.stat().st_size for p in self.disk_dir.glob("*.pkl"))
+            return stats
+
+    def _put_memory(self, key: str, entry: Dict[str, Any]):
+        """写入内存层（调用方需持有锁）"""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.pkl"
+
+    def _load_from_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        """从磁盘层加载条目"""
+        if self.disk_dir is None:
+            return None
+
+        path = self._disk_path(key)
+        if not path.exists():
+            return None
+
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+            # 更新访问时间，供按 LRU 淘汰使用
+            os.utime(path, None)
+            return entry
+        except Exception as e:
+            logging.warning(f"读取说话人条件缓存失败: {e}")
+            return None
+
+    def _save_to_disk(self, key: str, entry: Dict[str, Any]):
+        """写入磁盘层并按容量淘汰"""
+        if self.disk_dir is None:
+            return
+
+        path = self._disk_path(key)
+        # 每次写入使用独立的临时文件，并发写入同一条目时不会互相覆盖半写的数据
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.disk_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logging.warning(f"写入说话人条件缓存失败: {e}")
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return
+
+        self._evict_disk()
+
+    def _evict_disk(self):
+        """按最近访问时间淘汰磁盘层条目，直到总大小不超过上限"""
+        with self._lock:
+            files = []
+            for path in self.disk_dir.glob("*.pkl"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in files)
+            files.sort()
+            for _, size, path in files:
+                if total <= self.disk_max_bytes:
+                    break
+                try:
+                    path.unlink()
+                    total -= size
+                    self._stats["disk_evictions"] += 1
+                except OSError:
+                    pass
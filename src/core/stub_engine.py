@@ -0,0 +1,130 @@
+"""
+桩 TTS 引擎 - 模拟 IndexTTS2 的推理接口，用于在无 GPU、无模型文件时测试
+"""
+
+import time
+import threading
+from typing import Optional, List, Tuple
+
+import numpy as np
+import soundfile as sf
+
+
+class StubTTSEngine:
+    """桩 TTS 引擎类"""
+
+    def __init__(self,
+                 sample_rate: int = 22050,
+                 audio_seconds_per_char: float = 0.2,
+                 base_latency: float = 0.0,
+                 latency_per_char: float = 0.0,
+                 conditioning_latency: float = 0.0):
+        """
+        初始化桩引擎
+
+        Args:
+            sample_rate: 输出采样率
+            audio_seconds_per_char: 每个字符生成的音频时长（秒）
+            base_latency: 每次推理调用的固定延迟（秒）
+            latency_per_char: 每个字符的推理延迟（秒）
+            conditioning_latency: 计算说话人条件的延迟（秒）
+        """
+        self.sample_rate = sample_rate
+        self.audio_seconds_per_char = audio_seconds_per_char
+        self.base_latency = base_latency
+        self.latency_per_char = latency_per_char
+        self.conditioning_latency = conditioning_latency
+
+        # 与 IndexTTS2 相同的说话人条件缓存属性
+        self.cache_spk_cond = None
+        self.cache_s2mel_style = None
+        self.cache_s2mel_prompt = None
+        self.cache_spk_audio_prompt = None
+        self.cache_emo_cond = None
+        self.cache_emo_audio_prompt = None
+        self.cache_mel = None
+
+        self.calls = 0
+        self.batch_calls = 0
+        self.conditioning_calls = 0
+        self._lock = threading.Lock()
+
+    def infer(self,
+              spk_audio_prompt: str,
+              text: str,
+              output_path: Optional[str],
+              emo_audio_prompt: Optional[str] = None,
+              emo_alpha: float = 1.0,
+              emo_vector: Optional[List[float]] = None,
+              use_emo_text: bool = False,
+              emo_text: Optional[str] = None,
+              use_random: bool = False,
+              interval_silence: int = 200,
+              verbose: bool = False,
+              max_text_tokens_per_segment: int = 120,
+              **generation_kwargs):
+        """
+        模拟 IndexTTS2.infer
+
+        Returns:
+            output_path 不为 None 时返回 output_path，否则返回 (采样率, int16 音频数据)
+        """
+        with self._lock:
+            self.calls += 1
+        self._prepare_conditioning(spk_audio_prompt)
+        self._simulate_latency(len(text))
+        return self._emit(self._generate(text), output_path)
+
+    def infer_batch(self,
+                    spk_audio_prompt: str,
+                    texts: List[str],
+                    **kwargs) -> List[Tuple[int, np.ndarray]]:
+        """
+        模拟批量推理：一次调用生成多段文本，延迟由最长的文本决定
+
+        Args:
+            spk_audio_prompt: 参考语音文件路径
+            texts: 文本列表
+            **kwargs: 其他参数，同 infer
+
+        Returns:
+            List[Tuple[int, np.ndarray]]: 每段文本的采样率和音频数据
+        """
+        with self._lock:
+            self.batch_calls += 1
+        self._prepare_conditioning(spk_audio_prompt)
+        self._simulate_latency(max((len(text) for text in texts), default=0))
+        return [(self.sample_rate, self._generate(text)) for text in texts]
+
+    def _prepare_conditioning(self, spk_audio_prompt: str):
+        """与 IndexTTS2 一致：仅在参考音频变化时重新计算说话人条件"""
+        if self.cache_spk_cond is not None and self.cache_spk_audio_prompt == spk_audio_prompt:
+            return
+
+        with self._lock:
+            self.conditioning_calls += 1
+        time.sleep(self.conditioning_latency)
+        self.cache_spk_cond = np.zeros(8, dtype=np.float32)
+        self.cache_s2mel_style = np.zeros(8, dtype=np.float32)
+        self.cache_s2mel_prompt = np.zeros(8, dtype=np.float32)
+        self.cache_mel = np.zeros(8, dtype=np.float32)
+        self.cache_emo_cond = np.zeros(8, dtype=np.float32)
+        self.cache_spk_audio_prompt = spk_audio_prompt
+        self.cache_emo_audio_prompt = spk_audio_prompt
+
+    def _simulate_latency(self, chars: int):
+        """模拟一次推理调用的耗时"""
+        time.sleep(self.base_latency + self.latency_per_char * chars)
+
+    def _generate(self, text: str) -> np.ndarray:
+        """生成与文本长度成正比的正弦波，形状与 IndexTTS2 输出一致 (samples, 1)"""
+        samples = max(1, int(len(text) * self.audio_seconds_per_char * self.sample_rate))
+        t = np.arange(samples, dtype=np.float32) / self.sample_rate
+        wave = 0.3 * np.sin(2 * np.pi * 220.0 * t)
+        return (wave * 32767).astype(np.int16).reshape(-1, 1)
+
+    def _emit(self, wav: np.ndarray, output_path: Optional[str]):
+        if output_path:
+            sf.write(output_path, wav, self.sample_rate, subtype='PCM_16')
+            return output_path
+        return self.sample_rate, wav
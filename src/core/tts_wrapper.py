@@ -4,9 +4,17 @@ IndexTTS 包装器 - 提供简化的 API 接口
 
 import os
 import sys
+import time
 import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Union, List
+from typing import Any, Dict, Optional, Union, List, Iterator, Tuple, Callable
+
+import numpy as np
+import soundfile as sf
 
 # 添加 IndexTTS 路径
 current_dir = Path(__file__).parent
@@ -22,6 +30,30 @@ except ImportError as e:
     IndexTTS2 = None
     IndexTTS = None
 
+from .speaker_cache import SpeakerConditioningCache
+from .voice_store import VoiceStore, InvalidVoiceError
+from .duration_estimator import DurationEstimator
+from .audio_processor import AudioProcessor
+from .cancellation import CancelToken
+from ..utils.file_utils import FileUtils
+from ..utils.text_utils import TextUtils
+from ..utils.metrics import metrics
+
+# IndexTTS2 内部用于缓存说话人/风格条件的属性
+SPEAKER_CONDITIONING_ATTRS = (
+    "cache_spk_cond",
+    "cache_s2mel_style",
+    "cache_s2mel_prompt",
+    "cache_mel",
+    "cache_emo_cond",
+)
+
+# 参考语音：文件路径、音频文件内容 (bytes) 或 (采样率, 音频数组)
+VoiceInput = Union[str, bytes, Tuple[int, np.ndarray]]
+
+# 内存中的参考语音需要落盘时优先使用内存文件系统，避免网络存储的 IO 开销
+MEMORY_TEMP_DIR = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
 
 class TTSWrapper:
     """IndexTTS 包装器类"""
@@ -32,7 +64,13 @@ class TTSWrapper:
                  use_v2: bool = True,
                  use_fp16: bool = False,
                  use_cuda_kernel: bool = False,
-                 use_deepspeed: bool = False):
+                 use_deepspeed: bool = False,
+                 speaker_cache: Optional[SpeakerConditioningCache] = None,
+                 use_speaker_cache: bool = True,
+                 engine: Optional[object] = None,
+                 device: Optional[str] = None,
+                 voice_store: Optional[VoiceStore] = None,
+                 duration_estimator: Optional[DurationEstimator] = None):
         """
         初始化 TTS 包装器
         
@@ -43,11 +81,32 @@ class TTSWrapper:
             use_fp16: 是否使用半精度
             use_cuda_kernel: 是否使用 CUDA 内核
             use_deepspeed: 是否使用 DeepSpeed
+            speaker_cache: 说话人条件缓存，为 None 时使用默认内存缓存
+            use_speaker_cache: 是否启用说话人条件缓存
+            engine: 已创建的推理引擎（如 StubTTSEngine），提供时不再加载模型
+            device: 推理设备（如 "cuda:0"、"cpu"），为 None 时由模型自动选择
+            voice_store: 参考语音存储，提供时参考语音先规范化再传给模型
+            duration_estimator: 时长估计器，提供时每次合成完成后记录文本长度、音频时长与推理耗时
         """
         self.model_dir = model_dir
         self.config_path = config_path
         self.use_v2 = use_v2
+        self.use_fp16 = use_fp16
+        self.use_cuda_kernel = use_cuda_kernel
+        self.use_deepspeed = use_deepspeed
+        self.device = device
+        self.voice_store = voice_store
+        self.duration_estimator = duration_estimator
+        self.speaker_cache = None
+        if use_speaker_cache:
+            self.speaker_cache = speaker_cache or SpeakerConditioningCache()
         self.tts = None
+        # 模型实例及其内部条件缓存不是线程安全的
+        self._lock = threading.RLock()
+        
+        if engine is not None:
+            self.tts = engine
+            return
         
         # 检查模型文件是否存在
         if not os.path.exists(model_dir):
@@ -65,6 +124,7 @@ class TTSWrapper:
                     cfg_path=self.config_path,
                     model_dir=self.model_dir,
                     use_fp16=self.use_fp16,
+                    device=self.device,
                     use_cuda_kernel=self.use_cuda_kernel,
                     use_deepspeed=self.use_deepspeed
                 )
@@ -72,7 +132,8 @@ class TTSWrapper:
             elif IndexTTS is not None:
                 self.tts = IndexTTS(
                     model_dir=self.model_dir,
-                    cfg_path=self.config_path
+                    cfg_path=self.config_path,
+                    device=self.device
                 )
                 logging.info("已加载 IndexTTS1 模型")
             else:
@@ -83,7 +144,7 @@ class TTSWrapper:
     
     def synthesize(self, 
                    text: str,
-                   voice_path: str,
+                   voice_path: VoiceInput,
                    output_path: str,
                    emotion_vector: Optional[List[float]] = None,
                    use_emo_text: bool = False,
@@ -109,13 +170,254 @@ class TTSWrapper:
             bool: 合成是否成功
         """
         try:
-            if not os.path.exists(voice_path):
-                raise FileNotFoundError(f"参考语音文件不存在: {voice_path}")
+            self.synthesize_file(
+                text=text,
+                voice_path=voice_path,
+                output_path=output_path,
+                emotion_vector=emotion_vector,
+                use_emo_text=use_emo_text,
+                emo_text=emo_text,
+                emo_alpha=emo_alpha,
+                use_random=use_random,
+                verbose=verbose
+            )
+            return True
+            
+        except Exception as e:
+            logging.error(f"语音合成失败: {e}")
+            return False
+    
+    def synthesize_file(self, text: str, voice_path: VoiceInput, output_path: str, **kwargs):
+        """
+        语音合成并写入文件，失败时抛出异常而不是返回 False
+        
+        Args:
+            text: 要合成的文本
+            voice_path: 参考语音
+            output_path: 输出文件路径
+            **kwargs: 其他参数，同 synthesize
+        """
+        self.check_voice(voice_path)
+        self._infer(text=text, voice_path=voice_path, output_path=output_path, **kwargs)
+        logging.info(f"语音合成完成: {output_path}")
+    
+    def synthesize_stream(self,
+                          text: str,
+                          voice_path: VoiceInput,
+                          max_length: int = 120,
+                          emotion_fn: Optional[Callable[[str], Optional[List[float]]]] = None,
+                          cancel_token: Optional[CancelToken] = None,
+                          **kwargs) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        分段流式语音合成，每合成完一段即返回该段音频
+        
+        Args:
+            text: 要合成的文本
+            voice_path: 参考语音文件路径
+            max_length: 每段最大长度
+            emotion_fn: 逐段计算情感向量的函数（如 EmotionMatcher.vector），仅在未指定 emotion_vector 时使用
+            cancel_token: 取消令牌，每段开始前检查，已取消时抛出 RequestCancelledError
+            **kwargs: 其他参数，同 synthesize
+            
+        Yields:
+            Tuple[int, np.ndarray]: 采样率和该段音频数据
+        """
+        self.check_voice(voice_path)
+        
+        with metrics.timer("text_segment"):
+            segments = TextUtils.split_text(text, max_length=max_length)
+        for i, segment in enumerate(segments):
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            sample_rate, audio = self.synthesize_array(
+                segment, voice_path, **self.segment_params(segment, kwargs, emotion_fn)
+            )
+            logging.info(f"流式合成第 {i+1}/{len(segments)} 段完成")
+            yield sample_rate, audio
+    
+    def synthesize_long(self,
+                        text: str,
+                        voice_path: VoiceInput,
+                        output_path: Optional[str] = None,
+                        max_length: int = 500,
+                        max_workers: int = 1,
+                        silence_ms: float = 200,
+                        crossfade_ms: float = 20,
+                        synthesize_fn: Optional[Callable[..., Tuple[int, np.ndarray]]] = None,
+                        submit_fn: Optional[Callable[..., Future]] = None,
+                        emotion_fn: Optional[Callable[[str], Optional[List[float]]]] = None,
+                        cancel_token: Optional[CancelToken] = None,
+                        **kwargs) -> Tuple[int, np.ndarray]:
+        """
+        长文本合成：分段并发合成后按顺序拼接
+        
+        Args:
+            text: 要合成的文本
+            voice_path: 参考语音文件路径
+            output_path: 输出文件路径，为 None 时不写文件
+            max_length: 每段最大长度
+            max_workers: 并发合成的段数，仅在未提供 submit_fn 时使用
+            silence_ms: 段间静音时长（毫秒）
+            crossfade_ms: 段间交叉淡化时长（毫秒）
+            synthesize_fn: 单段合成函数，签名同 synthesize_array，默认使用本实例
+            submit_fn: 任务提交函数，签名同 Executor.submit，用于在外部执行器中并发合成
+            emotion_fn: 逐段计算情感向量的函数（如 EmotionMatcher.vector），仅在未指定 emotion_vector 时使用
+            cancel_token: 取消令牌，每段开始前检查，已取消时其余分段不再合成并抛出 RequestCancelledError；
+                submit_fn 为推理执行器时应同时绑定该令牌，使排队中的分段在取消时立即出队
+            **kwargs: 其他参数，同 synthesize
+            
+        Returns:
+            Tuple[int, np.ndarray]: 采样率和拼接后的音频数据
+        """
+        self.check_voice(voice_path)
+        
+        synthesize_fn = synthesize_fn or self.synthesize_array
+        if cancel_token is not None:
+            synthesize_fn = self._cancellable(synthesize_fn, cancel_token)
+        with metrics.timer("text_segment"):
+            segments = TextUtils.split_text(text, max_length=max_length)
+        if not segments:
+            raise ValueError("文本内容为空")
+        logging.info(f"长文本合成：共 {len(segments)} 段")
+        
+        pool = None
+        if submit_fn is None:
+            pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(segments))))
+            submit_fn = pool.submit
+        futures = []
+        try:
+            for segment in segments:
+                futures.append(submit_fn(
+                    synthesize_fn, segment, voice_path, **self.segment_params(segment, kwargs, emotion_fn)
+                ))
+            results = [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=False)
+        
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        sample_rate = results[0][0]
+        audio = AudioProcessor.concatenate_segments(
+            [segment_audio for _, segment_audio in results],
+            sample_rate,
+            silence_ms=silence_ms,
+            crossfade_ms=crossfade_ms
+        )
+        
+        if output_path:
+            AudioProcessor(sample_rate=sample_rate).save_audio(audio, output_path)
+        return sample_rate, audio
+    
+    def synthesize_array(self,
+                         text: str,
+                         voice_path: VoiceInput,
+                         **kwargs) -> Tuple[int, np.ndarray]:
+        """
+        语音合成，直接返回内存中的音频数据，参考语音同样可以直接传入内存数据
+        
+        Args:
+            text: 要合成的文本
+            voice_path: 参考语音文件路径、音频文件内容 (bytes) 或 (采样率, 音频数组)
+            **kwargs: 其他参数，同 synthesize
+            
+        Returns:
+            Tuple[int, np.ndarray]: 采样率和音频数据
+        """
+        self.check_voice(voice_path)
+        
+        return self._infer(text, voice_path, None, **kwargs)
+    
+    def batch_infer(self,
+                    texts: List[str],
+                    voice_path: VoiceInput,
+                    **kwargs) -> List[Tuple[int, np.ndarray]]:
+        """
+        同一参考语音、同一参数的多段文本一次性推理
+        
+        引擎提供 infer_batch 时作为一次批量调用执行，否则在一次加锁内逐段推理，
+        说话人条件只需准备一次。
+        
+        Args:
+            texts: 文本列表
+            voice_path: 参考语音文件路径
+            **kwargs: 其他参数，同 synthesize
+            
+        Returns:
+            List[Tuple[int, np.ndarray]]: 每段文本的采样率和音频数据
+        """
+        self.check_voice(voice_path)
+        
+        if not hasattr(self.tts, 'infer_batch'):
+            with self._lock:
+                return [self._infer(text, voice_path, None, **kwargs) for text in texts]
+        
+        with self._lock, self._voice_prompt(voice_path) as (prompt, voice_hash, entry):
+            start = time.perf_counter()
+            cond_hash = self._restore_speaker_conditioning(prompt, voice_hash, entry)
+            results = self.tts.infer_batch(
+                spk_audio_prompt=prompt,
+                texts=texts,
+                emo_vector=kwargs.get("emotion_vector"),
+                use_emo_text=kwargs.get("use_emo_text", False),
+                emo_text=kwargs.get("emo_text"),
+                emo_alpha=kwargs.get("emo_alpha", 0.6),
+                use_random=kwargs.get("use_random", False),
+                verbose=kwargs.get("verbose", False)
+            )
+            self._store_speaker_conditioning(cond_hash, prompt)
+            elapsed = time.perf_counter() - start
+        
+        voice_hash = cond_hash or voice_hash
+        results = [(sr, np.asarray(audio)) for sr, audio in results]
+        durations = [len(audio) / sr for sr, audio in results]
+        total_duration = sum(durations)
+        metrics.observe("stage_seconds", elapsed, stage="inference")
+        metrics.record_synthesis(total_duration, elapsed)
+        if self.duration_estimator is not None and total_duration > 0:
+            # 批量推理只有总耗时，按音频时长分摊到每段
+            for text, duration in zip(texts, durations):
+                self.duration_estimator.record(text, duration, elapsed * duration / total_duration, voice_hash)
+        return results
+    
+    def _infer(self,
+               text: str,
+               voice_path: str,
+               output_path: Optional[str],
+               emotion_vector: Optional[List[float]] = None,
+               use_emo_text: bool = False,
+               emo_text: Optional[str] = None,
+               emo_alpha: float = 0.6,
+               use_random: bool = False,
+               verbose: bool = False):
+        """
+        调用模型推理
+        
+        Args:
+            text: 要合成的文本
+            voice_path: 参考语音文件路径
+            output_path: 输出文件路径，为 None 时返回内存中的音频
+            emotion_vector: 情感向量
+            use_emo_text: 是否使用文本情感
+            emo_text: 情感文本
+            emo_alpha: 情感强度
+            use_random: 是否使用随机采样
+            verbose: 是否显示详细信息
             
+        Returns:
+            output_path 为 None 时返回 (采样率, 音频数据)，否则返回模型的原始结果
+        """
+        with self._lock, self._voice_prompt(voice_path) as (prompt, voice_hash, entry):
+            start = time.perf_counter()
             if self.use_v2 and hasattr(self.tts, 'infer'):
                 # IndexTTS2 接口
-                self.tts.infer(
-                    spk_audio_prompt=voice_path,
+                cond_hash = self._restore_speaker_conditioning(prompt, voice_hash, entry)
+                result = self.tts.infer(
+                    spk_audio_prompt=prompt,
                     text=text,
                     output_path=output_path,
                     emo_vector=emotion_vector,
@@ -125,21 +427,201 @@ class TTSWrapper:
                     use_random=use_random,
                     verbose=verbose
                 )
+                self._store_speaker_conditioning(cond_hash, prompt)
+                voice_hash = cond_hash or voice_hash
             else:
                 # IndexTTS1 接口
-                self.tts.infer(voice_path, text, output_path)
-            
-            logging.info(f"语音合成完成: {output_path}")
-            return True
-            
-        except Exception as e:
-            logging.error(f"语音合成失败: {e}")
-            return False
+                result = self.tts.infer(prompt, text, output_path)
+            elapsed = time.perf_counter() - start
+        
+        metrics.observe("stage_seconds", elapsed, stage="inference")
+        if output_path is None:
+            sample_rate, audio = result
+            audio = np.asarray(audio)
+            self._record_duration(text, len(audio) / sample_rate, elapsed, voice_hash)
+            return sample_rate, audio
+        
+        if os.path.exists(output_path):
+            self._record_duration(text, sf.info(output_path).duration, elapsed, voice_hash)
+        return result
+    
+    def _record_duration(self, text: str, audio_seconds: float, elapsed: float, voice_hash: Optional[str]):
+        """记录合成结果的时长指标，并交给时长估计器校准"""
+        metrics.record_synthesis(audio_seconds, elapsed)
+        if self.duration_estimator is not None:
+            self.duration_estimator.record(text, audio_seconds, elapsed, voice_hash)
     
+    def _restore_speaker_conditioning(self,
+                                      voice_path: str,
+                                      voice_hash: Optional[str] = None,
+                                      entry: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        按参考音频内容哈希恢复说话人条件，使模型跳过参考音频的解码与编码
+
+        Args:
+            voice_path: 传给模型的参考语音路径
+            voice_hash: 已知的内容哈希（内存参考语音），为 None 时按文件内容计算并查询缓存
+            entry: 已查询到的缓存条目，仅在给出 voice_hash 时使用
+
+        Returns:
+            Optional[str]: 参考音频内容哈希，模型不支持条件缓存时返回 None
+        """
+        if not self._supports_conditioning_cache():
+            return None
+
+        if voice_hash is None:
+            voice_hash = FileUtils.get_file_hash(voice_path)
+            entry = self.speaker_cache.get(voice_hash)
+        if entry is not None:
+            for attr, value in entry.items():
+                setattr(self.tts, attr, value)
+            # 模型内部以路径判断缓存是否有效，这里指向本次的路径
+            self.tts.cache_spk_audio_prompt = voice_path
+            self.tts.cache_emo_audio_prompt = voice_path
+        return voice_hash
+
+    def _supports_conditioning_cache(self) -> bool:
+        return self.speaker_cache is not None and hasattr(self.tts, SPEAKER_CONDITIONING_ATTRS[0])
+
+    @contextmanager
+    def _voice_prompt(self, voice: VoiceInput) -> Iterator[Tuple[str, Optional[str], Optional[Dict[str, Any]]]]:
+        """
+        将参考语音转换为传给模型的路径
+
+        配置了参考语音存储时，传给模型的是规范化后的存储文件。否则文件路径直接使用，
+        内存中的参考语音在说话人条件缓存命中时以虚拟路径代替，模型不会读取参考音频；
+        未命中时写入临时文件供模型读取，用完即删。
+
+        Args:
+            voice: 参考语音
+
+        Yields:
+            Tuple[str, Optional[str], Optional[Dict[str, Any]]]: (模型路径, 内容哈希, 缓存条目)，
+            文件路径输入时哈希与条目为 None
+        """
+        if self.voice_store is not None:
+            # 以规范化结果的存储键作为说话人条件缓存键，命中时连规范化文件也不需要
+            voice_hash = self.voice_store.get_key(voice)
+            entry = self.speaker_cache.get(voice_hash) if self._supports_conditioning_cache() else None
+            if entry is not None:
+                yield f"memory://{voice_hash}", voice_hash, entry
+            else:
+                yield str(self.voice_store.ingest(voice, voice_hash)), voice_hash, None
+            return
+
+        if isinstance(voice, (str, os.PathLike)):
+            yield str(voice), None, None
+            return
+
+        voice_hash = self.get_voice_hash(voice)
+        if self._supports_conditioning_cache():
+            entry = self.speaker_cache.get(voice_hash)
+            if entry is not None:
+                yield f"memory://{voice_hash}", voice_hash, entry
+                return
+
+        fd, path = tempfile.mkstemp(suffix=".wav", dir=MEMORY_TEMP_DIR)
+        try:
+            with metrics.timer("temp_write"), os.fdopen(fd, 'wb') as f:
+                if isinstance(voice, tuple):
+                    sample_rate, audio = voice
+                    sf.write(f, np.asarray(audio), sample_rate, format='WAV')
+                else:
+                    f.write(voice)
+            yield path, voice_hash, None
+        finally:
+            os.unlink(path)
+
+    @staticmethod
+    def _cancellable(fn: Callable[..., Tuple[int, np.ndarray]],
+                     cancel_token: CancelToken) -> Callable[..., Tuple[int, np.ndarray]]:
+        """包装单段合成函数，开始合成前检查取消令牌"""
+        def run(*args, **kwargs):
+            cancel_token.raise_if_cancelled()
+            return fn(*args, **kwargs)
+        return run
+
+    @staticmethod
+    def segment_params(segment: str,
+                       kwargs: Dict[str, Any],
+                       emotion_fn: Optional[Callable[[str], Optional[List[float]]]] = None) -> Dict[str, Any]:
+        """
+        计算单段的合成参数：未指定情感向量且提供了 emotion_fn 时按该段文本自动标注情感
+
+        Args:
+            segment: 分段文本
+            kwargs: 整段请求的合成参数
+            emotion_fn: 情感向量计算函数
+
+        Returns:
+            Dict[str, Any]: 该段的合成参数
+        """
+        if emotion_fn is None or kwargs.get("emotion_vector") is not None:
+            return kwargs
+        return {**kwargs, "emotion_vector": emotion_fn(segment)}
+
+    @staticmethod
+    def check_voice(voice: VoiceInput):
+        """
+        检查参考语音是否可用
+
+        Args:
+            voice: 参考语音文件路径、音频文件内容或 (采样率, 音频数组)
+        """
+        if isinstance(voice, (str, os.PathLike)):
+            if not os.path.exists(voice):
+                raise FileNotFoundError(f"参考语音文件不存在: {voice}")
+        elif isinstance(voice, (bytes, bytearray, memoryview)):
+            if len(voice) == 0:
+                raise InvalidVoiceError("参考语音数据为空")
+        elif isinstance(voice, tuple) and len(voice) == 2:
+            if np.asarray(voice[1]).size == 0:
+                raise InvalidVoiceError("参考语音数据为空")
+        else:
+            raise TypeError(f"不支持的参考语音类型: {type(voice).__name__}")
+
+    @staticmethod
+    def get_voice_hash(voice: VoiceInput) -> str:
+        """
+        计算参考语音内容哈希，文件路径与相同内容的 bytes 结果一致
+
+        Args:
+            voice: 参考语音
+
+        Returns:
+            str: 内容哈希
+        """
+        if isinstance(voice, (bytes, bytearray, memoryview)):
+            return FileUtils.get_bytes_hash(voice)
+        if isinstance(voice, tuple):
+            sample_rate, audio = voice
+            audio = np.ascontiguousarray(audio)
+            header = f"{sample_rate}:{audio.dtype}:{audio.shape}".encode()
+            return FileUtils.get_bytes_hash(header + memoryview(audio).cast('B'))
+        return FileUtils.get_file_hash(voice)
+
+    def _store_speaker_conditioning(self, voice_hash: Optional[str], voice_path: str):
+        """
+        推理完成后保存模型计算出的说话人条件
+
+        Args:
+            voice_hash: 参考音频内容哈希
+            voice_path: 参考语音文件路径
+        """
+        if voice_hash is None or voice_hash in self.speaker_cache:
+            return
+        if getattr(self.tts, "cache_spk_audio_prompt", None) != voice_path:
+            return
+
+        entry = {attr: getattr(self.tts, attr, None) for attr in SPEAKER_CONDITIONING_ATTRS}
+        if entry["cache_spk_cond"] is not None:
+            self.speaker_cache.put(voice_hash, entry)
+
     def batch_synthesize(self, 
                         texts: List[str],
                         voice_path: str,
                         output_dir: str,
+                        cancel_token: Optional[CancelToken] = None,
                         **kwargs) -> List[str]:
         """
         批量语音合成
@@ -148,6 +630,7 @@ class TTSWrapper:
             texts: 文本列表
             voice_path: 参考语音文件路径
             output_dir: 输出目录
+            cancel_token: 取消令牌，每条开始前检查，已取消时抛出 RequestCancelledError
             **kwargs: 其他参数
             
         Returns:
@@ -157,6 +640,8 @@ class TTSWrapper:
         output_paths = []
         
         for i, text in enumerate(texts):
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
             output_path = os.path.join(output_dir, f"output_{i:03d}.wav")
             success = self.synthesize(text, voice_path, output_path, **kwargs)
             if success:
@@ -166,11 +651,48 @@ class TTSWrapper:
         
         return output_paths
     
+    def warmup(self, text: str, voice_path: str):
+        """
+        预热模型，结果丢弃
+        
+        Args:
+            text: 预热文本
+            voice_path: 参考语音文件路径
+        """
+        self.synthesize_array(text, voice_path, verbose=False)
+    
+    def precompute_conditioning(self, voice_path: VoiceInput, text: str) -> bool:
+        """
+        预先计算并缓存参考语音的说话人条件
+
+        模型没有单独计算条件的接口，缓存未命中时以短文本推理一次，结果丢弃；已缓存时不做任何推理。
+
+        Args:
+            voice_path: 参考语音
+            text: 缓存未命中时用于推理的短文本
+
+        Returns:
+            bool: 是否进行了计算，已缓存或模型不支持条件缓存时返回 False
+        """
+        if not self._supports_conditioning_cache():
+            return False
+        # 与 _voice_prompt 使用相同的缓存键
+        if self.voice_store is not None:
+            voice_hash = self.voice_store.get_key(voice_path)
+        else:
+            voice_hash = self.get_voice_hash(voice_path)
+        if voice_hash in self.speaker_cache:
+            return False
+        self.synthesize_array(text, voice_path, verbose=False)
+        return True
+    
     def get_model_info(self) -> dict:
         """获取模型信息"""
         return {
             "model_dir": self.model_dir,
             "config_path": self.config_path,
             "use_v2": self.use_v2,
-            "model_loaded": self.tts is not None
+            "device": self.device,
+            "model_loaded": self.tts is not None,
+            "speaker_cache": self.speaker_cache.get_stats() if self.speaker_cache else None
         }
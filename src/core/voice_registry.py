@@ -0,0 +1,136 @@
+"""
+参考语音注册表 - 参考语音上传一次，之后以 voice_id 引用
+"""
+
+import time
+import uuid
+import sqlite3
+import threading
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import soundfile as sf
+
+from .voice_store import VoiceStore
+
+
+class VoiceRegistry:
+    """基于 SQLite 索引的参考语音注册表类，音频本身保存在 VoiceStore 中"""
+
+    def __init__(self, store: VoiceStore, db_path: Optional[Union[str, Path]] = None):
+        """
+        初始化参考语音注册表
+
+        Args:
+            store: 参考语音存储
+            db_path: SQLite 数据库文件路径，为 None 时使用存储目录下的 registry.db
+        """
+        self.store = store
+        self.db_path = Path(db_path) if db_path else store.store_dir / "registry.db"
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._create_tables()
+
+    def _create_tables(self):
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS voices (
+                    id TEXT PRIMARY KEY,
+                    name TEXT,
+                    store_key TEXT NOT NULL UNIQUE,
+                    sample_rate INTEGER NOT NULL,
+                    duration REAL NOT NULL,
+                    created_at REAL NOT NULL
+                );
+            """)
+
+    def register(self, voice, name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        注册参考语音，相同内容重复注册时返回已有记录
+
+        Args:
+            voice: 参考语音文件路径、音频文件内容 (bytes) 或 (采样率, 音频数组)
+            name: 显示名称
+
+        Returns:
+            Dict[str, Any]: 参考语音记录
+        """
+        key = self.store.get_key(voice)
+        existing = self._get_by_key(key)
+        if existing is not None and self.store.get_path(key).exists():
+            return existing
+
+        path = self.store.ingest(voice, key)
+        info = sf.info(str(path))
+        with self._lock, self._conn:
+            # 在锁内重新查询，并发注册相同内容时只插入一条记录
+            row = self._conn.execute("SELECT * FROM voices WHERE store_key = ?", (key,)).fetchone()
+            if row is not None:
+                return dict(row)
+            voice_id = uuid.uuid4().hex
+            self._conn.execute(
+                "INSERT INTO voices (id, name, store_key, sample_rate, duration, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (voice_id, name, key, info.samplerate, info.duration, time.time())
+            )
+        logging.info(f"已注册参考语音 {voice_id}（{name or '未命名'}）")
+        return self.get(voice_id)
+
+    def get(self, voice_id: str) -> Optional[Dict[str, Any]]:
+        """获取参考语音记录"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM voices WHERE id = ?", (voice_id,)).fetchone()
+        return dict(row) if row else None
+
+    def resolve(self, voice_id: str) -> Optional[Path]:
+        """
+        获取已注册参考语音的规范化文件路径
+
+        Args:
+            voice_id: 参考语音 ID
+
+        Returns:
+            Optional[Path]: 文件路径，未注册或文件已丢失时返回 None
+        """
+        record = self.get(voice_id)
+        if record is None:
+            return None
+        path = self.store.get_path(record["store_key"])
+        return path if path.exists() else None
+
+    def list_voices(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """按注册时间倒序列出参考语音"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM voices ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def delete(self, voice_id: str) -> bool:
+        """
+        删除参考语音及其规范化文件
+
+        Args:
+            voice_id: 参考语音 ID
+
+        Returns:
+            bool: 是否存在并已删除
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT store_key FROM voices WHERE id = ?", (voice_id,)).fetchone()
+            if row is None:
+                return False
+            self._conn.execute("DELETE FROM voices WHERE id = ?", (voice_id,))
+        try:
+            self.store.get_path(row["store_key"]).unlink()
+        except OSError:
+            pass
+        return True
+
+    def _get_by_key(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM voices WHERE store_key = ?", (key,)).fetchone()
+        return dict(row) if row else None
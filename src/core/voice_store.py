@@ -0,0 +1,242 @@
+"""
+参考语音存储 - 参考语音只预处理一次，按内容寻址保存规范化结果
+"""
+
+import io
+import os
+import json
+import hashlib
+import tempfile
+import threading
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple, Union
+
+import librosa
+import numpy as np
+import soundfile as sf
+
+from .audio_processor import AudioProcessor
+from ..utils.file_utils import FileUtils
+
+# 文件路径输入按 (路径, 修改时间, 大小) 缓存的内容哈希条目数
+PATH_KEY_CACHE_SIZE = 1024
+
+
+class InvalidVoiceError(ValueError):
+    """参考语音为空或无法解码，属于请求本身的错误"""
+
+
+class VoiceStore:
+    """参考语音存储类：下混、重采样、去静音、截断并响度归一化后按内容哈希落盘"""
+
+    def __init__(self,
+                 store_dir: Union[str, Path] = "outputs/voices",
+                 sample_rate: int = 22050,
+                 max_seconds: float = 15.0,
+                 trim_top_db: float = 30.0,
+                 target_rms_db: float = -20.0,
+                 peak_limit: float = 0.95):
+        """
+        初始化参考语音存储
+
+        Args:
+            store_dir: 存储目录
+            sample_rate: 规范化后的采样率（模型采样率）
+            max_seconds: 参考语音最大时长（秒），超出部分截断
+            trim_top_db: 去除首尾静音的阈值（低于最大能量多少 dB 视为静音）
+            target_rms_db: 响度归一化的目标 RMS（dBFS）
+            peak_limit: 归一化后的峰值上限，避免削波
+        """
+        self.store_dir = Path(store_dir)
+        self.sample_rate = int(sample_rate)
+        self.max_seconds = float(max_seconds) if max_seconds else None
+        self.trim_top_db = trim_top_db
+        self.target_rms_db = float(target_rms_db)
+        self.peak_limit = float(peak_limit)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+
+        self.processor = AudioProcessor(sample_rate=self.sample_rate)
+        # 处理参数变化后旧的规范化结果不再适用，参数指纹参与内容寻址
+        self._fingerprint = json.dumps({
+            "sample_rate": self.sample_rate,
+            "max_seconds": self.max_seconds,
+            "trim_top_db": self.trim_top_db,
+            "target_rms_db": self.target_rms_db,
+            "peak_limit": self.peak_limit
+        }, sort_keys=True)
+        self._path_keys = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "ingested": 0}
+
+    @classmethod
+    def from_config(cls,
+                    config: Optional[Dict[str, Any]],
+                    default_sample_rate: int = 22050) -> "VoiceStore":
+        """
+        根据配置创建参考语音存储
+
+        Args:
+            config: voices 配置段
+            default_sample_rate: 未配置采样率时使用的采样率（audio.sample_rate）
+
+        Returns:
+            VoiceStore: 存储实例
+        """
+        config = config or {}
+        return cls(
+            store_dir=config.get("dir", "outputs/voices"),
+            sample_rate=config.get("sample_rate") or default_sample_rate,
+            max_seconds=config.get("max_seconds", 15.0),
+            trim_top_db=config.get("trim_top_db", 30.0),
+            target_rms_db=config.get("target_rms_db", -20.0),
+            peak_limit=config.get("peak_limit", 0.95)
+        )
+
+    def get_key(self, voice) -> str:
+        """
+        计算参考语音的存储键（原始内容哈希与处理参数共同决定）
+
+        Args:
+            voice: 参考语音文件路径、音频文件内容 (bytes) 或 (采样率, 音频数组)
+
+        Returns:
+            str: 存储键
+        """
+        if self.contains(voice):
+            # 已是存储中的规范化文件（如已注册的参考语音），直接以文件名为键，不再重复处理
+            return Path(voice).stem
+        return self._key_for(self._content_hash(voice))
+
+    def get_path(self, key: str) -> Path:
+        """存储键对应的规范化文件路径"""
+        return self.store_dir / f"{key}.wav"
+
+    def contains(self, voice) -> bool:
+        """参考语音是否为存储中的规范化文件路径"""
+        if not isinstance(voice, (str, os.PathLike)):
+            return False
+        path = Path(voice)
+        return path.suffix == ".wav" and path.parent.resolve() == self.store_dir.resolve()
+
+    def ingest(self, voice, key: Optional[str] = None) -> Path:
+        """
+        获取参考语音的规范化文件，首次出现时预处理并保存
+
+        Args:
+            voice: 参考语音文件路径、音频文件内容 (bytes) 或 (采样率, 音频数组)
+            key: 已计算的存储键，为 None 时重新计算
+
+        Returns:
+            Path: 规范化后的 WAV 文件路径
+        """
+        key = key or self.get_key(voice)
+        path = self.get_path(key)
+        if path.exists():
+            with self._lock:
+                self._stats["hits"] += 1
+            return path
+
+        audio = self.preprocess(*self._decode(voice))
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.store_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                sf.write(f, audio, self.sample_rate, format='WAV', subtype='PCM_16')
+            # 原子替换，并发写入同一参考语音时结果相同，后写者覆盖即可
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        with self._lock:
+            self._stats["ingested"] += 1
+        logging.info(f"参考语音已规范化: {path.name}，时长 {len(audio) / self.sample_rate:.2f}s")
+        return path
+
+    def preprocess(self, audio: np.ndarray, sample_rate: int) -> np.ndarray:
+        """
+        规范化参考语音：下混为单声道、重采样、去除首尾静音、截断、响度归一化
+
+        Args:
+            audio: 音频数据，多声道时形状为 (frames, channels)
+            sample_rate: 原采样率
+
+        Returns:
+            np.ndarray: 规范化后的 float32 单声道音频
+        """
+        audio = AudioProcessor.to_float(np.asarray(audio))
+        if audio.ndim > 1:
+            audio = audio.mean(axis=1)
+        if audio.size == 0:
+            raise ValueError("参考语音数据为空")
+
+        audio = AudioProcessor.resample_batch([audio], sample_rate, self.sample_rate)[0]
+        if self.trim_top_db is not None:
+            audio = self.processor.trim_silence(audio, top_db=self.trim_top_db)
+        if self.max_seconds:
+            audio = audio[:int(self.max_seconds * self.sample_rate)]
+
+        rms = float(np.sqrt(np.mean(np.square(audio, dtype=np.float64))))
+        if rms > 0:
+            gain = 10.0 ** (self.target_rms_db / 20.0) / rms
+            peak = float(np.max(np.abs(audio)))
+            gain = min(gain, self.peak_limit / peak)
+            audio = audio * np.float32(gain)
+        return audio.astype(np.float32, copy=False)
+
+    def get_stats(self) -> dict:
+        """获取存储统计信息"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["items"] = sum(1 for _ in self.store_dir.glob("*.wav"))
+        return stats
+
+    def _key_for(self, content_hash: str) -> str:
+        return hashlib.sha256(f"{content_hash}:{self._fingerprint}".encode('utf-8')).hexdigest()
+
+    def _content_hash(self, voice) -> str:
+        """原始内容哈希，与 TTSWrapper.get_voice_hash 一致；文件路径按修改时间缓存，避免每次重读"""
+        if isinstance(voice, (bytes, bytearray, memoryview)):
+            return FileUtils.get_bytes_hash(voice)
+        if isinstance(voice, tuple):
+            sample_rate, audio = voice
+            audio = np.ascontiguousarray(audio)
+            header = f"{sample_rate}:{audio.dtype}:{audio.shape}".encode()
+            return FileUtils.get_bytes_hash(header + memoryview(audio).cast('B'))
+
+        stat = os.stat(voice)
+        cache_key = (os.path.abspath(voice), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            content_hash = self._path_keys.get(cache_key)
+            if content_hash is not None:
+                self._path_keys.move_to_end(cache_key)
+                return content_hash
+
+        content_hash = FileUtils.get_file_hash(voice)
+        with self._lock:
+            self._path_keys[cache_key] = content_hash
+            if len(self._path_keys) > PATH_KEY_CACHE_SIZE:
+                self._path_keys.popitem(last=False)
+        return content_hash
+
+    @staticmethod
+    def _decode(voice) -> Tuple[np.ndarray, int]:
+        """解码参考语音为 (音频数组, 采样率)"""
+        if isinstance(voice, tuple):
+            sample_rate, audio = voice
+            return np.asarray(audio), int(sample_rate)
+        if isinstance(voice, (bytes, bytearray, memoryview)):
+            voice = io.BytesIO(voice)
+        try:
+            audio, sample_rate = sf.read(voice, dtype='float32', always_2d=True)
+        except Exception:
+            # libsndfile 不支持的格式（如 m4a）交给 librosa 解码
+            if isinstance(voice, io.BytesIO):
+                voice.seek(0)
+            try:
+                audio, sample_rate = librosa.load(voice, sr=None, mono=True)
+            except Exception as e:
+                raise InvalidVoiceError(f"无法解码参考语音: {e}") from e
+        return audio, int(sample_rate)
@@ -0,0 +1,84 @@
+"""
+音频输出编码测试
+"""
+
+import pytest
+import io
+import numpy as np
+import soundfile as sf
+from pathlib import Path
+import sys
+
+# 添加项目根目录到路径
+current_dir = Path(__file__).parent
+project_root = current_dir.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.audio_encoder import AudioEncoder
+
+
+class TestAudioEncoder:
+    """音频输出编码测试类"""
+
+    def setup_method(self):
+        """测试前准备"""
+        self.encoder = AudioEncoder(max_workers=1)
+        self.sample_rate = 22050
+        t = np.arange(self.sample_rate * 2) / self.sample_rate
+        self.audio = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+    def teardown_method(self):
+        """测试后清理"""
+        self.encoder.shutdown()
+
+    def test_negotiate(self):
+        """测试 format 参数优先，其次按 Accept 头权重选择"""
+        assert self.encoder.negotiate("MP3") == "mp3"
+        assert self.encoder.negotiate("ogg") == "opus"
+        assert self.encoder.negotiate(None, "audio/ogg;q=0.5, audio/flac") == "flac"
+        assert self.encoder.negotiate(None, "audio/mpeg;q=0.9, audio/ogg;q=0.1") == "mp3"
+        assert self.encoder.negotiate(None, "application/json") == "wav"
+        assert self.encoder.negotiate(None, "*/*") == "wav"
+        assert self.encoder.negotiate() == "wav"
+        with pytest.raises(ValueError):
+            self.encoder.negotiate("aac")
+
+    def test_supported_sample_rate(self):
+        """测试编码器不支持的采样率取不低于请求值的最小支持值"""
+        assert AudioEncoder.supported_sample_rate("opus", 22050) == 24000
+        assert AudioEncoder.supported_sample_rate("opus", 96000) == 48000
+        assert AudioEncoder.supported_sample_rate("mp3", 22050) == 22050
+        assert AudioEncoder.supported_sample_rate("flac", 22050) == 22050
+
+    @pytest.mark.parametrize("fmt", ["wav", "flac", "mp3", "opus"])
+    def test_encode_roundtrip(self, fmt):
+        """测试一次性编码结果可解码，压缩格式明显小于 WAV"""
+        data = self.encoder.submit_encode(self.audio, self.sample_rate, fmt, 16000).result(timeout=10)
+        audio, sample_rate = sf.read(io.BytesIO(data))
+
+        assert sample_rate == 16000
+        assert len(audio) / sample_rate == pytest.approx(2.0, abs=0.1)
+        if fmt != "wav":
+            assert len(data) < len(self.encoder.encode(self.audio, self.sample_rate, "wav")) / 2
+
+    def test_encode_pcm(self):
+        """测试原始 PCM 输出"""
+        data = self.encoder.encode(self.audio, self.sample_rate, "pcm")
+        assert len(data) == len(self.audio) * 2
+
+    @pytest.mark.parametrize("fmt", ["wav", "mp3", "opus"])
+    def test_stream_roundtrip(self, fmt):
+        """测试逐块编码：编码过程中即有输出，拼接后的结果可完整解码"""
+        stream = self.encoder.stream(fmt, self.sample_rate, 16000)
+        chunks = [stream.encode(self.audio[i:i + 4096]) for i in range(0, len(self.audio), 4096)]
+        chunks.append(stream.close())
+
+        assert any(chunks[:-1])
+        audio, sample_rate = sf.read(io.BytesIO(b"".join(chunks)))
+        assert sample_rate == 16000
+        # 流式 MP3 没有收尾回写的 LAME 帧，解码结果包含编码器首尾的填充
+        assert len(audio) / sample_rate == pytest.approx(2.0, abs=0.2)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,136 @@
+"""
+音频处理工具测试
+"""
+
+import pytest
+import io
+import numpy as np
+import soundfile as sf
+from pathlib import Path
+import sys
+
+# 添加项目根目录到路径
+current_dir = Path(__file__).parent
+project_root = current_dir.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.audio_processor import AudioProcessor, _polyphase_filter
+
+
+class TestAudioProcessor:
+    """音频处理工具测试类"""
+
+    def test_wav_header_roundtrip(self):
+        """测试生成的 WAV 文件头可被正常解析"""
+        audio = np.linspace(-0.5, 0.5, 1000).astype(np.float32)
+        pcm = AudioProcessor.to_pcm16(audio)
+        data = AudioProcessor.build_wav_header(16000, data_size=len(pcm)) + pcm
+
+        decoded, sr = sf.read(io.BytesIO(data), dtype='float32')
+        assert sr == 16000
+        assert len(decoded) == 1000
+        assert np.allclose(decoded, audio, atol=1e-3)
+
+    def test_streaming_wav_header(self):
+        """测试流式 WAV 文件头"""
+        header = AudioProcessor.build_wav_header(22050)
+        assert len(header) == 44
+        assert header[:4] == b'RIFF'
+        assert header[-4:] == b'\xff\xff\xff\xff'
+
+    def test_to_float_from_int16(self):
+        """测试 16 位 PCM 转浮点并下混"""
+        audio = np.array([[16384, -16384], [0, 0]], dtype=np.int16)
+        result = AudioProcessor.to_float(audio)
+        assert result.shape == (2,)
+        assert np.allclose(result, [0.0, 0.0])
+
+    def test_crossfade_keeps_constant_power(self):
+        """测试等功率交叉淡化的长度与过渡段能量"""
+        first = np.ones(100, dtype=np.float32)
+        second = np.ones(100, dtype=np.float32)
+        result = AudioProcessor.crossfade(first, second, 20)
+        assert len(result) == 180
+        # 两段不相关时过渡段能量守恒；相同信号叠加峰值不超过 sqrt(2)
+        assert np.max(np.abs(result)) <= np.sqrt(2) + 1e-6
+
+    def test_concatenate_segments_length(self):
+        """测试分段拼接后的总长度"""
+        sr = 1000
+        segments = [np.ones(500, dtype=np.float32), np.ones(300, dtype=np.float32)]
+        result = AudioProcessor.concatenate_segments(segments, sr, silence_ms=100, crossfade_ms=10)
+        # 静音段两端各被交叉淡化吃掉一个淡化长度，总长 = 各段之和 + 静音时长
+        assert len(result) == 500 + 300 + 100
+        assert np.allclose(result[520:580], 0.0)
+
+    def test_batch_stats_and_normalize(self):
+        """测试批量峰值、RMS 与归一化结果和逐段计算一致"""
+        rng = np.random.default_rng(0)
+        clips = [rng.standard_normal(n).astype(np.float32) for n in (100, 2000, 0, 50000)]
+        stats = AudioProcessor.batch_stats(clips)
+        for clip, peak, rms in zip(clips, stats["peak"], stats["rms"]):
+            expected_peak = np.max(np.abs(clip)) if len(clip) else 0.0
+            expected_rms = np.sqrt(np.mean(clip ** 2)) if len(clip) else 0.0
+            assert peak == pytest.approx(expected_peak, rel=1e-5)
+            assert rms == pytest.approx(expected_rms, rel=1e-4)
+
+        processor = AudioProcessor()
+        for clip, normalized in zip(clips, AudioProcessor.normalize_batch(clips)):
+            assert len(normalized) == len(clip)
+            if len(clip):
+                assert np.allclose(normalized, processor.normalize_audio(clip), atol=1e-6)
+
+    def test_trim_silence_batch_matches_librosa(self):
+        """测试批量去静音与 librosa.effects.trim 结果一致"""
+        import librosa
+        rng = np.random.default_rng(1)
+        clips = []
+        for n in (4000, 22050):
+            clip = np.zeros(n + 8000, dtype=np.float32)
+            clip[3000:3000 + n] = rng.standard_normal(n) * 0.3
+            clips.append(clip)
+        for clip, trimmed in zip(clips, AudioProcessor.trim_silence_batch(clips)):
+            expected, _ = librosa.effects.trim(clip, top_db=20)
+            assert len(trimmed) == len(expected)
+
+    def test_trim_silence_batch_all_silent(self):
+        """测试全静音片段与 librosa.effects.trim 一致：整段保留"""
+        import librosa
+        loud = np.zeros(12000, dtype=np.float32)
+        loud[3000:6000] = 0.3
+        clips = [np.zeros(5000, dtype=np.float32), loud, np.full(3000, 1e-7, dtype=np.float32)]
+        for clip, trimmed in zip(clips, AudioProcessor.trim_silence_batch(clips)):
+            expected, _ = librosa.effects.trim(clip, top_db=20)
+            assert len(trimmed) == len(expected)
+        assert len(AudioProcessor.trim_silence_batch(clips)[0]) == 5000
+
+    def test_resample_batch_reuses_filter(self):
+        """测试批量重采样长度正确且同一采样率组合复用滤波器"""
+        clips = [np.ones(22050, dtype=np.float32), np.ones(11025, dtype=np.float32)]
+        results = AudioProcessor.resample_batch(clips, 22050, 16000)
+        assert [len(r) for r in results] == [16000, 8000]
+        assert _polyphase_filter(22050, 16000) is _polyphase_filter(22050, 16000)
+
+    def test_get_audio_info_probe_and_cache(self, tmp_path):
+        """测试只读文件头的音频信息、按需计算的统计量与文件变化后的缓存失效"""
+        path = str(tmp_path / "voice.wav")
+        audio = np.full((8000, 2), 0.25, dtype=np.float32)
+        sf.write(path, audio, 16000)
+
+        processor = AudioProcessor()
+        info = processor.get_audio_info(path)
+        assert info["sample_rate"] == 16000
+        assert info["channels"] == 2
+        assert info["duration"] == pytest.approx(0.5)
+        assert "rms" not in info
+
+        info = processor.get_audio_info(path, compute_stats=True)
+        assert info["max_amplitude"] == pytest.approx(0.25, abs=1e-3)
+        assert info["rms"] == pytest.approx(0.25, abs=1e-3)
+
+        sf.write(path, audio[:4000], 16000)
+        assert processor.get_audio_info(path)["duration"] == pytest.approx(0.25)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
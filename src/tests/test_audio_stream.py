@@ -0,0 +1,75 @@
+"""
+分块音频流处理测试
+"""
+
+import pytest
+import os
+import tempfile
+import numpy as np
+import soundfile as sf
+from scipy import signal
+from pathlib import Path
+import sys
+
+# 添加项目根目录到路径
+current_dir = Path(__file__).parent
+project_root = current_dir.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.audio_stream import AudioStream, StreamingResampler
+
+
+class TestAudioStream:
+    """分块音频流处理测试类"""
+
+    def setup_method(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        """测试后清理"""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @pytest.mark.parametrize("orig_sr,target_sr", [(22050, 16000), (16000, 22050), (24000, 16000)])
+    def test_streaming_resampler_matches_resample_poly(self, orig_sr, target_sr):
+        """测试分块重采样与一次性多相重采样结果一致"""
+        audio = np.random.default_rng(0).standard_normal(30011)
+        resampler = StreamingResampler(orig_sr, target_sr)
+        chunks = [resampler.process(audio[i:i + 4097]) for i in range(0, len(audio), 4097)]
+        chunks.append(resampler.flush())
+        result = np.concatenate(chunks)
+
+        expected = signal.resample_poly(audio, resampler.up, resampler.down)
+        assert len(result) == len(expected)
+        assert np.allclose(result, expected, atol=1e-5)
+
+    def test_trim_silence_with_bounded_lookahead(self):
+        """测试去除首尾静音，中间停顿保留"""
+        sr = 1000
+        tone = 0.5 * np.sin(np.arange(sr) * 0.3).astype(np.float32)
+        silence = np.zeros(sr, dtype=np.float32)
+        audio = np.concatenate([silence, tone, silence, tone, silence])
+        blocks = (audio[i:i + 300] for i in range(0, len(audio), 300))
+
+        result = np.concatenate(list(AudioStream.trim_silence(blocks, sr, frame_ms=20, max_lookahead_s=2)))
+        assert len(result) == pytest.approx(3 * sr, abs=40)
+
+    def test_write_and_stats_roundtrip(self):
+        """测试分块写入、读取与累计统计"""
+        path = os.path.join(self.temp_dir, "long.wav")
+        audio = np.full(200000, 0.5, dtype=np.float32)
+        frames = AudioStream.write((audio[i:i + 65536] for i in range(0, len(audio), 65536)), path, 16000)
+        assert frames == len(audio)
+
+        stats = AudioStream.compute_stats(AudioStream.iter_blocks(path, block_size=4096))
+        assert stats.samples == len(audio)
+        assert stats.peak == pytest.approx(0.5)
+        assert stats.rms == pytest.approx(0.5)
+
+        normalized = np.concatenate(list(AudioStream.normalize(path, block_size=4096)))
+        assert np.max(np.abs(normalized)) == pytest.approx(1.0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
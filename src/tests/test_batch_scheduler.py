@@ -0,0 +1,127 @@
+"""
+动态微批调度器测试
+"""
+
+import pytest
+import os
+import tempfile
+from pathlib import Path
+import sys
+
+# 添加项目根目录到路径
+current_dir = Path(__file__).parent
+project_root = current_dir.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.api.batch_scheduler import BatchScheduler, SynthesisRequest
+from src.api.inference_executor import InferenceExecutor
+from src.core.cancellation import CancelToken, RequestCancelledError
+from src.core.stub_engine import StubTTSEngine
+from src.core.tts_wrapper import TTSWrapper
+
+
+class TestBatchScheduler:
+    """动态微批调度器测试类"""
+
+    def setup_method(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.voice_path = os.path.join(self.temp_dir, "voice.wav")
+        with open(self.voice_path, 'wb') as f:
+            f.write(b"voice")
+
+        self.engine = StubTTSEngine(audio_seconds_per_char=0.01)
+        self.wrapper = TTSWrapper(engine=self.engine)
+        self.executor = InferenceExecutor(max_workers=1)
+
+    def teardown_method(self):
+        """测试后清理"""
+        import shutil
+        self.executor.shutdown(wait=False)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _make_scheduler(self, **kwargs) -> BatchScheduler:
+        return BatchScheduler(
+            dispatch_fn=lambda texts, voice_path, params: self.wrapper.batch_infer(texts, voice_path, **params),
+            executor=self.executor,
+            **kwargs
+        )
+
+    def test_requests_in_window_are_batched(self):
+        """测试时间窗口内的同组请求合并为一次批量推理"""
+        scheduler = self._make_scheduler(window_ms=100, max_batch_size=8)
+        futures = [scheduler.submit("文本" * (i + 1), self.voice_path, "v1", emo_alpha=0.6) for i in range(4)]
+
+        results = [future.result(timeout=5) for future in futures]
+        scheduler.shutdown()
+
+        assert self.engine.batch_calls == 1
+        # 结果按请求一一对应
+        lengths = [len(audio) for _, audio in results]
+        assert lengths == sorted(lengths)
+
+    def test_groups_by_voice_and_params(self):
+        """测试不同参考语音或参数的请求分属不同批次"""
+        scheduler = self._make_scheduler(window_ms=100)
+        futures = [
+            scheduler.submit("a", self.voice_path, "v1", emo_alpha=0.6),
+            scheduler.submit("b", self.voice_path, "v2", emo_alpha=0.6),
+            scheduler.submit("c", self.voice_path, "v1", emo_alpha=0.9),
+            scheduler.submit("d", self.voice_path, "v1", emo_alpha=0.6),
+        ]
+        for future in futures:
+            future.result(timeout=5)
+        scheduler.shutdown()
+
+        assert self.engine.batch_calls == 3
+
+    def test_max_batch_size(self):
+        """测试批大小上限"""
+        scheduler = self._make_scheduler(window_ms=100, max_batch_size=2)
+        futures = [scheduler.submit("a", self.voice_path, "v1") for _ in range(5)]
+        for future in futures:
+            future.result(timeout=5)
+
+        stats = scheduler.get_stats()
+        scheduler.shutdown()
+        assert stats["batches"] >= 3
+        assert stats["batched_requests"] == 5
+
+    def test_max_batch_seconds_groups_similar_lengths(self):
+        """测试按预计音频时长切分批次，时长相近的请求同批"""
+        scheduler = self._make_scheduler(
+            window_ms=100,
+            duration_fn=lambda text, voice_hash: len(text) * 1.0,
+            max_batch_seconds=12
+        )
+        batches = scheduler._form_batches([
+            SynthesisRequest(text, self.voice_path, "v1", {}, seconds=len(text) * 1.0)
+            for text in ("a" * 10, "b", "c" * 9, "d")
+        ])
+        scheduler.shutdown()
+
+        assert [[request.text for request in batch] for batch in batches] == [
+            ["b", "d", "c" * 9], ["a" * 10]
+        ]
+
+
+    def test_cancelled_requests_are_not_dispatched(self):
+        """测试组批前已取消的请求不参与推理"""
+        scheduler = self._make_scheduler(window_ms=100, max_batch_size=8)
+        token = CancelToken()
+        cancelled = scheduler.submit("取消的文本", self.voice_path, "v1", cancel_token=token)
+        kept = scheduler.submit("保留的文本", self.voice_path, "v1")
+        token.cancel()
+
+        assert kept.result(timeout=5)[1].size > 0
+        with pytest.raises(RequestCancelledError):
+            cancelled.result(timeout=5)
+        stats = scheduler.get_stats()
+        scheduler.shutdown()
+
+        assert stats["cancelled"] == 1
+        assert self.engine.batch_calls == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
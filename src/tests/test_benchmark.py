@@ -0,0 +1,89 @@
+"""
+负载测试与假引擎测试
+"""
+
+import pytest
+import time
+import tempfile
+import threading
+from pathlib import Path
+import sys
+
+# 添加项目根目录到路径
+current_dir = Path(__file__).parent
+project_root = current_dir.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.benchmark.fake_engine import FakeTTSEngine, create_engine, build_model_pool
+from src.benchmark.load_test import summarize, compare_reports, run_python
+
+
+class TestLoadTest:
+    """负载测试类"""
+
+    def setup_method(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        """测试后清理"""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_fake_engine_serializes_inference(self):
+        """测试假引擎按字符数模拟延迟，并发调用串行执行"""
+        engine = create_engine(
+            "src.benchmark.fake_engine:FakeTTSEngine", base_latency=0.0, latency_per_char=0.01, jitter=0.1, seed=1
+        )
+        assert isinstance(engine, FakeTTSEngine)
+
+        threads = [threading.Thread(target=engine.infer, args=("voice.wav", "12345", None)) for _ in range(3)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert time.perf_counter() - start >= 3 * 0.05 * 0.9
+        assert engine.calls == 3
+
+        with pytest.raises(ValueError):
+            create_engine("FakeTTSEngine")
+
+    def test_summarize_and_compare(self):
+        """测试分位数统计与基线对比"""
+        stats = summarize([float(i) for i in range(1, 101)])
+        assert stats["count"] == 100 and stats["p50"] == 51.0 and stats["p99"] == 100.0
+        assert summarize([])["p95"] is None
+
+        baseline = {"results": {"synthesize": {"error_rate": 0.0, "throughput_rps": 10.0,
+                                               "latency": {"p50": 1.0, "p95": 2.0}}}}
+        current = {"results": {"synthesize": {"error_rate": 0.0, "throughput_rps": 9.5,
+                                              "latency": {"p50": 1.05, "p95": 3.0}},
+                               "batch": {"error_rate": 0.5}}}
+        regressions = compare_reports(baseline, current, tolerance=0.1)
+        assert len(regressions) == 1 and regressions[0].startswith("synthesize.latency.p95")
+
+        # 实时率与 /metrics 的 realtime_factor 同义（音频秒数 / 耗时秒数），下降才是退化
+        baseline = {"results": {"synthesize": {"rtf": {"p50": 10.0}}}}
+        assert compare_reports(baseline, {"results": {"synthesize": {"rtf": {"p50": 20.0}}}}) == []
+        assert len(compare_reports(baseline, {"results": {"synthesize": {"rtf": {"p50": 5.0}}}})) == 1
+
+    def test_run_python_api(self):
+        """测试对 Python API 压测，报告包含吞吐、延迟、TTFB 与 RTF"""
+        model_pool = build_model_pool(
+            lambda: FakeTTSEngine(base_latency=0.01, latency_per_char=0.0, audio_seconds_per_char=0.01), replicas=2
+        )
+        results = run_python(model_pool, ["synthesize", "stream", "batch"], ["第一句。第二句。", "你好"],
+                             requests=6, concurrency=3, work_dir=self.temp_dir, batch_size=2, segment_length=4)
+
+        for scenario in ["synthesize", "stream", "batch"]:
+            result = results[scenario]
+            assert result["succeeded"] == 6 and result["failed"] == 0
+            assert result["throughput_rps"] > 0 and result["audio_seconds"] > 0
+            assert result["latency"]["count"] == result["rtf"]["count"] == 6
+        stream = results["stream"]
+        assert stream["ttfb"]["p50"] <= stream["latency"]["p50"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,91 @@
+"""
+请求取消测试
+"""
+
+import pytest
+import os
+import time
+import tempfile
+import numpy as np
+from pathlib import Path
+import sys
+
+# 添加项目根目录到路径
+current_dir = Path(__file__).parent
+project_root = current_dir.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.cancellation import CancelToken, RequestCancelledError
+from src.core.tts_wrapper import TTSWrapper
+from src.core.stub_engine import StubTTSEngine
+
+
+class TestCancellation:
+    """请求取消测试类"""
+
+    def setup_method(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.voice_path = os.path.join(self.temp_dir, "voice.wav")
+        with open(self.voice_path, 'wb') as f:
+            f.write(b"voice")
+        self.wrapper = TTSWrapper(engine=StubTTSEngine(audio_seconds_per_char=0.01))
+        self.text = "第一段文本。第二段文本。第三段文本。"
+
+    def teardown_method(self):
+        """测试后清理"""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_token_deadline_and_callbacks(self):
+        """测试截止时间到达后视为已取消，回调只在显式取消时执行一次"""
+        token = CancelToken(timeout=0.05)
+        reasons = []
+        token.add_callback(lambda t: reasons.append(t.reason))
+        assert not token.cancelled
+        assert 0 < token.remaining() <= 0.05
+
+        time.sleep(0.06)
+        assert token.reason == CancelToken.DEADLINE
+        assert token.remaining() == 0
+        assert reasons == []
+        with pytest.raises(RequestCancelledError):
+            token.raise_if_cancelled()
+
+        token.cancel(CancelToken.DEADLINE)
+        token.cancel(CancelToken.DISCONNECTED)
+        assert reasons == [CancelToken.DEADLINE]
+        # 已取消的令牌注册回调时立即执行
+        token.add_callback(lambda t: reasons.append("late"))
+        assert reasons == [CancelToken.DEADLINE, "late"]
+        assert CancelToken().remaining() is None
+
+    def test_long_synthesis_stops_between_segments(self):
+        """测试长文本合成在分段之间检查取消，其余分段不再合成"""
+        token = CancelToken()
+        segments = []
+
+        def synthesize(text, voice_path, **kwargs):
+            segments.append(text)
+            token.cancel()
+            return 22050, np.zeros(100, dtype=np.float32)
+
+        with pytest.raises(RequestCancelledError):
+            self.wrapper.synthesize_long(
+                self.text, self.voice_path, max_length=6, synthesize_fn=synthesize, cancel_token=token
+            )
+        assert segments == ["第一段文本。"]
+
+    def test_stream_stops_between_segments(self):
+        """测试流式合成在分段之间检查取消"""
+        token = CancelToken()
+        stream = self.wrapper.synthesize_stream(self.text, self.voice_path, max_length=6, cancel_token=token)
+        next(stream)
+        token.cancel(CancelToken.DISCONNECTED)
+        with pytest.raises(RequestCancelledError) as exc_info:
+            next(stream)
+        assert exc_info.value.reason == CancelToken.DISCONNECTED
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,119 @@
+"""
+合成时长估计测试
+"""
+
+import pytest
+import os
+import tempfile
+from pathlib import Path
+import sys
+
+# 添加项目根目录到路径
+current_dir = Path(__file__).parent
+project_root = current_dir.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.duration_estimator import DurationEstimator
+from src.core.tts_wrapper import TTSWrapper
+from src.core.stub_engine import StubTTSEngine
+
+
+class TestDurationEstimator:
+    """合成时长估计测试类"""
+
+    def setup_method(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.stats_path = os.path.join(self.temp_dir, "duration_stats.json")
+
+    def teardown_method(self):
+        """测试后清理"""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_default_rate_without_stats(self):
+        """测试无统计时按每分钟 200 字估计，与 TextUtils.estimate_duration 一致"""
+        estimator = DurationEstimator()
+        prediction = estimator.predict("你好世界 hello world")
+
+        assert prediction["units"] == 6
+        assert prediction["audio_seconds"] == pytest.approx(1.8)
+        assert prediction["inference_seconds"] == pytest.approx(1.8)
+
+    def test_learns_per_voice_rate(self):
+        """测试按参考语音学习语速，未见过的参考语音使用全局语速"""
+        estimator = DurationEstimator(prior_units=10, decay=1.0)
+        for _ in range(50):
+            estimator.record("十个字的一段测试文本", 1.0, voice_key="fast")
+            estimator.record("十个字的一段测试文本", 5.0, voice_key="slow")
+
+        fast = estimator.seconds_per_unit("fast")
+        slow = estimator.seconds_per_unit("slow")
+        assert fast == pytest.approx(0.1, abs=0.01)
+        assert slow == pytest.approx(0.5, abs=0.01)
+        assert fast < estimator.seconds_per_unit("unknown") < slow
+        assert estimator.seconds_per_unit("unknown") == estimator.seconds_per_unit()
+
+    def test_few_samples_shrink_to_global(self):
+        """测试样本少的参考语音向全局语速收缩"""
+        estimator = DurationEstimator(prior_units=50, decay=1.0)
+        for _ in range(100):
+            estimator.record("十个字的一段测试文本", 3.0, voice_key="common")
+        estimator.record("短", 10.0, voice_key="rare")
+
+        rare = estimator.seconds_per_unit("rare")
+        assert estimator.seconds_per_unit() < rare < 1.0
+
+    def test_realtime_factor(self):
+        """测试按推理耗时学习实时率"""
+        estimator = DurationEstimator(prior_units=1, decay=1.0)
+        for _ in range(100):
+            estimator.record("十个字的一段测试文本", 2.0, wall_seconds=1.0)
+
+        assert estimator.realtime_factor() == pytest.approx(2.0, rel=0.02)
+        prediction = estimator.predict("十个字的一段测试文本")
+        assert prediction["inference_seconds"] == pytest.approx(prediction["audio_seconds"] / 2, rel=0.02)
+
+    def test_persistence(self):
+        """测试统计数据保存后可重新加载"""
+        estimator = DurationEstimator(self.stats_path, prior_units=10)
+        for _ in range(20):
+            estimator.record("十个字的一段测试文本", 1.0, 0.5, voice_key="v1")
+        estimator.save()
+
+        reloaded = DurationEstimator(self.stats_path, prior_units=10)
+        assert reloaded.seconds_per_unit("v1") == pytest.approx(estimator.seconds_per_unit("v1"))
+        assert reloaded.get_stats()["samples"] == 20
+        assert reloaded.get_stats()["voices"] == 1
+
+    def test_evicts_oldest_voices(self):
+        """测试参考语音统计数超过上限时淘汰最久未更新的"""
+        estimator = DurationEstimator(max_voices=2)
+        for key in ("a", "b", "c"):
+            estimator.record("文本", 1.0, voice_key=key)
+
+        assert estimator.get_stats()["voices"] == 2
+        assert estimator.seconds_per_unit("a") == estimator.seconds_per_unit()
+
+    def test_wrapper_records_synthesis(self):
+        """测试合成完成后 TTSWrapper 自动记录统计"""
+        voice_path = os.path.join(self.temp_dir, "voice.wav")
+        with open(voice_path, 'wb') as f:
+            f.write(b"voice")
+        estimator = DurationEstimator(prior_units=1, decay=1.0)
+        wrapper = TTSWrapper(
+            engine=StubTTSEngine(audio_seconds_per_char=0.1),
+            duration_estimator=estimator
+        )
+
+        for _ in range(10):
+            wrapper.synthesize_array("十个字的一段测试文本", voice_path)
+        wrapper.batch_infer(["十个字的一段测试文本"] * 5, voice_path)
+
+        voice_key = TTSWrapper.get_voice_hash(voice_path)
+        assert estimator.get_stats()["samples"] == 15
+        assert estimator.seconds_per_unit(voice_key) == pytest.approx(0.1, abs=0.02)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
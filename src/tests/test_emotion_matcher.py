@@ -0,0 +1,72 @@
+"""
+情感关键词匹配测试
+"""
+
+import pytest
+import random
+from pathlib import Path
+import sys
+
+# 添加项目根目录到路径
+current_dir = Path(__file__).parent
+project_root = current_dir.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.emotion_matcher import EmotionMatcher, DEFAULT_EMOTIONS
+from src.utils.text_utils import TextUtils
+from src.core.tts_wrapper import TTSWrapper
+
+
+class TestEmotionMatcher:
+    """情感关键词匹配测试类"""
+
+    def test_find_matches_brute_force(self):
+        """测试自动机结果与逐词查找一致（含重叠与嵌套的关键词）"""
+        lexicon = {"happy": ["he", "she", "his", "hers"], "sad": ["hers", "s"]}
+        matcher = EmotionMatcher(lexicon)
+        rng = random.Random(0)
+        for _ in range(500):
+            text = ''.join(rng.choice("hersiax") for _ in range(30))
+            expected = sorted(
+                (start, start + len(keyword), keyword, emotion)
+                for emotion, keywords in lexicon.items()
+                for keyword in keywords
+                for start in range(len(text)) if text.startswith(keyword, start)
+            )
+            assert sorted(matcher.find(text)) == expected
+
+    def test_analyze_counts_and_vector(self):
+        """测试命中次数、位置与情感向量"""
+        matcher = EmotionMatcher()
+        result = matcher.analyze("真开心，太开心了！没想到会这样")
+        assert result["counts"]["happy"] == 2
+        assert result["counts"]["surprised"] == 1
+        assert result["matches"][0] == (1, 3, "开心", "happy")
+
+        vector = result["vector"]
+        assert len(vector) == len(DEFAULT_EMOTIONS)
+        assert sum(vector) == pytest.approx(0.8, abs=1e-3)
+        assert vector[DEFAULT_EMOTIONS.index("happy")] > vector[DEFAULT_EMOTIONS.index("surprised")]
+        assert matcher.vector("今天是星期一") is None
+
+    def test_configured_lexicon_and_weights(self):
+        """测试配置词典覆盖、权重与大小写"""
+        matcher = EmotionMatcher.from_config({
+            "supported_emotions": ["happy", "sad"],
+            "vector_max_total": 1.0,
+            "lexicon": {"happy": {"Great": 3.0}, "sad": ["bad"]}
+        })
+        assert matcher.vector("great but bad") == [0.75, 0.25]
+        assert TextUtils.extract_emotions("很开心")["happy"] > 0
+
+    def test_segment_params(self):
+        """测试逐段自动标注不覆盖显式指定的情感向量"""
+        matcher = EmotionMatcher()
+        params = TTSWrapper.segment_params("好开心", {"emo_alpha": 0.6}, matcher.vector)
+        assert params["emotion_vector"][0] > 0
+        explicit = {"emotion_vector": [0.0] * 8}
+        assert TTSWrapper.segment_params("好开心", explicit, matcher.vector) is explicit
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
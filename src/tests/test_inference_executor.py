@@ -0,0 +1,193 @@
+"""
+推理执行器测试
+"""
+
+import pytest
+import time
+import threading
+from pathlib import Path
+import sys
+
+# 添加项目根目录到路径
+current_dir = Path(__file__).parent
+project_root = current_dir.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.api.inference_executor import InferenceExecutor, QueueFullError
+from src.core.cancellation import CancelToken, RequestCancelledError
+
+
+class TestInferenceExecutor:
+    """推理执行器测试类"""
+
+    def setup_method(self):
+        """测试前准备"""
+        self.executor = InferenceExecutor(max_workers=1, max_queue_size=1)
+
+    def teardown_method(self):
+        """测试后清理"""
+        self.executor.shutdown(wait=False)
+
+    def test_submit_returns_result(self):
+        """测试任务结果返回"""
+        future = self.executor.submit(lambda a, b: a + b, 1, b=2)
+        assert future.result(timeout=5) == 3
+
+    def test_rejects_when_queue_full(self):
+        """测试队列已满时拒绝新任务"""
+        release = threading.Event()
+        started = threading.Event()
+
+        def blocking():
+            started.set()
+            release.wait(5)
+
+        running = self.executor.submit(blocking)
+        started.wait(5)
+        queued = self.executor.submit(lambda: "queued")
+
+        with pytest.raises(QueueFullError):
+            self.executor.submit(lambda: "rejected")
+
+        # 已接纳请求的后续任务不受限制
+        continuation = self.executor.submit_continuation(lambda: "continued")
+
+        release.set()
+        assert queued.result(timeout=5) == "queued"
+        assert continuation.result(timeout=5) == "continued"
+        running.result(timeout=5)
+        assert self.executor.get_stats()["rejected"] == 1
+
+    def test_drops_cancelled_and_expired_tasks(self):
+        """测试取消的任务立即出队，过期的任务不再执行且不占用队列容量"""
+        release = threading.Event()
+        started = threading.Event()
+        calls = []
+
+        def blocking():
+            started.set()
+            release.wait(5)
+
+        running = self.executor.submit(blocking)
+        started.wait(5)
+
+        token = CancelToken()
+        cancelled = self.executor.submit(calls.append, "cancelled", cancel_token=token)
+        token.cancel()
+        with pytest.raises(RequestCancelledError) as exc_info:
+            cancelled.result(timeout=1)
+        assert exc_info.value.reason == CancelToken.CANCELLED
+
+        expired = self.executor.submit(calls.append, "expired", cancel_token=CancelToken(timeout=0.05))
+        time.sleep(0.1)
+        # 过期任务在容量检查时被清理，新任务不会因队列已满被拒绝
+        accepted = self.executor.submit(calls.append, "accepted")
+        with pytest.raises(RequestCancelledError) as exc_info:
+            expired.result(timeout=1)
+        assert exc_info.value.reason == CancelToken.DEADLINE
+
+        with pytest.raises(RequestCancelledError):
+            self.executor.submit(calls.append, "late", cancel_token=token)
+
+        release.set()
+        accepted.result(timeout=5)
+        running.result(timeout=5)
+        assert calls == ["accepted"]
+        assert self.executor.get_stats()["cancelled"] == 2
+
+    def _block_worker(self, executor: InferenceExecutor) -> threading.Event:
+        """占住唯一的工作线程，返回释放事件"""
+        release = threading.Event()
+        started = threading.Event()
+
+        def blocking():
+            started.set()
+            release.wait(5)
+
+        executor.submit(blocking)
+        started.wait(5)
+        return release
+
+    def test_interactive_before_bulk(self):
+        """测试空闲工作线程先执行 interactive 任务，bulk 队列满时不影响 interactive 接纳"""
+        order = []
+        release = self._block_worker(self.executor)
+
+        bulk = [self.executor.submit(order.append, "bulk-0", priority=InferenceExecutor.BULK)]
+        with pytest.raises(QueueFullError):
+            self.executor.submit(order.append, "bulk-rejected", priority=InferenceExecutor.BULK)
+        bulk.append(self.executor.submit_continuation(order.append, "bulk-1", priority=InferenceExecutor.BULK))
+        interactive = self.executor.submit(order.append, "interactive")
+
+        release.set()
+        for future in bulk + [interactive]:
+            future.result(timeout=5)
+        assert order == ["interactive", "bulk-0", "bulk-1"]
+
+        stats = self.executor.get_stats()
+        assert stats["classes"]["bulk"]["rejected"] == 1
+        assert stats["classes"]["bulk"]["completed"] == 2
+        assert stats["classes"]["interactive"]["completed"] == 2
+        assert stats["classes"]["bulk"]["wait_max"] >= stats["classes"]["bulk"]["wait_p50"] > 0
+        with pytest.raises(ValueError):
+            self.executor.submit(order.append, "x", priority="urgent")
+
+    def test_weighted_fair_queuing_across_tenants(self):
+        """测试同一优先级内按租户权重轮流出队，提交大量任务的租户不会独占执行器"""
+        executor = InferenceExecutor(max_workers=1, tenant_weights={"heavy": 2})
+        try:
+            order = []
+            release = self._block_worker(executor)
+            futures = [
+                executor.submit_continuation(order.append, f"a{i}", priority=InferenceExecutor.BULK, tenant="a")
+                for i in range(4)
+            ]
+            futures += [
+                executor.submit_continuation(order.append, f"b{i}", priority=InferenceExecutor.BULK, tenant="b")
+                for i in range(2)
+            ]
+            futures += [
+                executor.submit_continuation(order.append, f"h{i}", priority=InferenceExecutor.BULK, tenant="heavy")
+                for i in range(4)
+            ]
+
+            release.set()
+            for future in futures:
+                future.result(timeout=5)
+        finally:
+            executor.shutdown(wait=False)
+
+        # 按虚拟完成时间出队：权重为 2 的租户每个任务的虚拟开销减半，同样时间内出队两倍的任务
+        assert order == ["h0", "a0", "b0", "h1", "h2", "a1", "b1", "h3", "a2", "a3"]
+
+    def test_exception_propagates(self):
+        """测试任务异常传递给调用方"""
+        def failing():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            self.executor.submit(failing).result(timeout=5)
+
+        def cancelled():
+            raise RequestCancelledError(CancelToken.DEADLINE)
+
+        # 执行中途的取消计入 cancelled 而不是 failed
+        with pytest.raises(RequestCancelledError):
+            self.executor.submit(cancelled).result(timeout=5)
+        stats = self.executor.get_stats()["classes"][InferenceExecutor.INTERACTIVE]
+        assert stats["failed"] == 1
+        assert stats["cancelled"] == 1
+
+    @pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+    def test_base_exception_resolves_future(self):
+        """测试 KeyboardInterrupt 等非 Exception 异常同样结束调用方的 Future，并继续向上抛出结束工作线程"""
+        def interrupted():
+            raise KeyboardInterrupt()
+
+        with pytest.raises(KeyboardInterrupt):
+            self.executor.submit(interrupted).result(timeout=5)
+        assert self.executor.get_stats()["classes"][InferenceExecutor.INTERACTIVE]["failed"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,141 @@
+"""
+批量合成任务管理测试
+"""
+
+import pytest
+import time
+import zipfile
+import tempfile
+from pathlib import Path
+import sys
+
+# 添加项目根目录到路径
+current_dir = Path(__file__).parent
+project_root = current_dir.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.api.job_manager import JobManager, JobStore
+from src.core.voice_store import VoiceStore
+
+
+def fake_synthesize(text, voice_path, output_path, **kwargs):
+    """模拟合成：文本为“失败”时返回失败"""
+    if text == "失败":
+        return False
+    with open(output_path, 'wb') as f:
+        f.write(text.encode('utf-8'))
+    return True
+
+
+class TestJobManager:
+    """批量合成任务管理测试类"""
+
+    def setup_method(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        """测试后清理"""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _wait_finished(self, manager, job_id, timeout=5.0):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = manager.store.get_job(job_id)
+            if job["status"] not in ("queued", "running"):
+                return job
+            time.sleep(0.01)
+        raise TimeoutError(job_id)
+
+    def test_job_progress_and_archive(self):
+        """测试任务执行、逐条状态与打包下载"""
+        manager = JobManager(self.temp_dir, fake_synthesize)
+        job_id = manager.submit(["第一", "失败", "第三"], b"voice", {"emo_alpha": 0.6})
+
+        job = self._wait_finished(manager, job_id)
+        assert job["status"] == "completed"
+        assert job["progress"] == {"completed": 2, "failed": 1}
+
+        archive = manager.build_archive(job_id)
+        with zipfile.ZipFile(archive) as zf:
+            assert sorted(zf.namelist()) == ["output_0000.wav", "output_0002.wav"]
+
+    def test_unfinished_jobs_resume(self):
+        """测试重启后恢复未完成的任务"""
+        # 模拟进程退出前已入库但尚未执行的任务
+        store = JobStore(Path(self.temp_dir) / "jobs.db")
+        store.create_job("pending", ["a", "b"], str(Path(self.temp_dir) / "v.wav"), {})
+        store.close()
+        (Path(self.temp_dir) / "pending").mkdir()
+
+        manager = JobManager(self.temp_dir, fake_synthesize)
+        job = self._wait_finished(manager, "pending")
+        assert job["progress"] == {"completed": 2}
+
+    def test_tenant_passed_but_not_stored(self):
+        """测试租户随合成调用传入，但不写入任务参数"""
+        tenants = []
+
+        def recording_synthesize(tenant=None, **kwargs):
+            tenants.append(tenant)
+            return fake_synthesize(**kwargs)
+
+        manager = JobManager(self.temp_dir, recording_synthesize)
+        job_id = manager.submit(["a", "b"], b"voice", {"emo_alpha": 0.6}, tenant="key-1")
+        job = self._wait_finished(manager, job_id)
+
+        assert tenants == ["key-1", "key-1"]
+        assert job["params"] == {"emo_alpha": 0.6}
+
+    def test_estimate_remaining(self):
+        """测试按预计推理耗时估算剩余时间，排队任务计入前面的任务"""
+        import threading
+        release = threading.Event()
+
+        def blocking_synthesize(**kwargs):
+            release.wait(5)
+            return fake_synthesize(**kwargs)
+
+        manager = JobManager(
+            self.temp_dir, blocking_synthesize,
+            estimate_fn=lambda texts, voice_path: 10.0 * len(texts)
+        )
+        first = manager.submit(["a", "b", "c"], b"voice")
+        second = manager.submit(["d"], b"voice")
+
+        deadline = time.time() + 5
+        while manager.store.get_job(first)["progress"].get("running") != 1 and time.time() < deadline:
+            time.sleep(0.01)
+        # 第一个任务：2 条待合成 + 1 条进行中；第二个任务还需等第一个完成
+        assert manager.estimate_remaining(first) == pytest.approx(30.0, abs=1.0)
+        assert manager.estimate_remaining(second) == pytest.approx(40.0, abs=1.0)
+
+        release.set()
+        self._wait_finished(manager, first)
+        self._wait_finished(manager, second)
+        assert manager.estimate_remaining(first) is None
+
+    def test_stored_voice_not_copied(self):
+        """测试存储中的规范化参考语音直接引用，合成与估时使用同一存储键"""
+        voice_store = VoiceStore(Path(self.temp_dir) / "voices")
+        stored_path = voice_store.get_path("abc")
+        stored_path.write_bytes(b"voice")
+        voice_paths = []
+
+        def recording_synthesize(**kwargs):
+            voice_paths.append(kwargs["voice_path"])
+            return fake_synthesize(**kwargs)
+
+        manager = JobManager(Path(self.temp_dir) / "jobs", recording_synthesize, voice_store=voice_store)
+        stored_job = self._wait_finished(manager, manager.submit(["a"], str(stored_path)))
+        assert voice_paths == [str(stored_path)]
+        assert voice_store.get_key(stored_job["voice_path"]) == "abc"
+
+        # 上传内容与其他路径仍复制到任务目录
+        uploaded_job = self._wait_finished(manager, manager.submit(["b"], b"voice"))
+        assert Path(uploaded_job["voice_path"]).parent == manager.job_dir(uploaded_job["id"])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,61 @@
+"""
+指标统计测试
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+# 添加项目根目录到路径
+current_dir = Path(__file__).parent
+project_root = current_dir.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry:
+    """指标注册表测试类"""
+
+    def setup_method(self):
+        """测试前准备"""
+        self.registry = MetricsRegistry(prefix="test")
+
+    def test_timer_records_stage(self):
+        """测试阶段计时器在异常时同样记录耗时"""
+        with self.registry.timer("upload"):
+            pass
+        with pytest.raises(ValueError):
+            with self.registry.timer("upload"):
+                raise ValueError("boom")
+
+        stats = self.registry.get_stats()["stages"]
+        assert stats["upload"]["count"] == 2
+
+    def test_realtime_factor(self):
+        """测试实时率按累计音频时长与耗时计算"""
+        self.registry.record_synthesis(audio_seconds=4.0, wall_seconds=1.0)
+        self.registry.record_synthesis(audio_seconds=2.0, wall_seconds=2.0)
+        assert self.registry.get_realtime_factor() == pytest.approx(2.0)
+
+    def test_render_prometheus_text(self):
+        """测试导出的 Prometheus 文本格式"""
+        self.registry.describe("requests_total", "请求数")
+        self.registry.inc("requests_total", path="/synthesize", status=200)
+        self.registry.inc("requests_total", path="/synthesize", status=200)
+        self.registry.set_gauge("queue_depth", 3)
+        self.registry.observe("latency_seconds", 0.02)
+
+        text = self.registry.render()
+        assert "# HELP test_requests_total 请求数" in text
+        assert "# TYPE test_requests_total counter" in text
+        assert 'test_requests_total{path="/synthesize",status="200"} 2' in text
+        assert "test_queue_depth 3" in text
+        assert 'test_latency_seconds_bucket{le="0.01"} 0' in text
+        assert 'test_latency_seconds_bucket{le="0.025"} 1' in text
+        assert 'test_latency_seconds_bucket{le="+Inf"} 1' in text
+        assert "test_latency_seconds_count 1" in text
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
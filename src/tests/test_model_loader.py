@@ -0,0 +1,61 @@
+"""
+模型后台加载器测试
+"""
+
+import pytest
+import threading
+from pathlib import Path
+import sys
+
+# 添加项目根目录到路径
+current_dir = Path(__file__).parent
+project_root = current_dir.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.model_loader import ModelLoader
+from src.core.stub_engine import StubTTSEngine
+from src.core.tts_wrapper import TTSWrapper
+
+
+class TestModelLoader:
+    """模型后台加载器测试类"""
+
+    def test_background_load_and_warmup(self):
+        """测试后台加载、预热与就绪状态"""
+        release = threading.Event()
+        engine = StubTTSEngine()
+
+        def load(progress):
+            progress(0, 1)
+            release.wait(5)
+            progress(1, 1)
+            return TTSWrapper(engine=engine)
+
+        loader = ModelLoader.from_config(load, {"warmup": True, "warmup_text": "预热"})
+        loader.start()
+        assert loader.get_status()["state"] == ModelLoader.LOADING
+        assert loader.model is None
+
+        release.set()
+        assert loader.wait(5)
+        status = loader.get_status()
+        assert status["ready"]
+        assert status["progress"] == {"loaded": 1, "total": 1}
+        assert "warmup_seconds" in status["timings"]
+        assert engine.calls == 1
+
+    def test_load_failure(self):
+        """测试加载失败时报告错误"""
+        def load(progress):
+            raise FileNotFoundError("模型目录不存在")
+
+        loader = ModelLoader(load)
+        loader.start(background=False)
+        status = loader.get_status()
+        assert status["state"] == ModelLoader.FAILED
+        assert "模型目录不存在" in status["error"]
+        assert not loader.wait(0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,133 @@
+"""
+模型副本池测试
+"""
+
+import pytest
+import os
+import tempfile
+import threading
+from pathlib import Path
+import sys
+
+# 添加项目根目录到路径
+current_dir = Path(__file__).parent
+project_root = current_dir.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.model_pool import ModelPool
+from src.core.stub_engine import StubTTSEngine
+from src.core.tts_wrapper import TTSWrapper
+from src.core.voice_store import VoiceStore, InvalidVoiceError
+
+
+class TestModelPool:
+    """模型副本池测试类"""
+
+    def setup_method(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.voice_path = os.path.join(self.temp_dir, "voice.wav")
+        with open(self.voice_path, 'wb') as f:
+            f.write(b"voice")
+
+    def teardown_method(self):
+        """测试后清理"""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_routes_to_least_busy_replica(self):
+        """测试请求路由到最空闲的副本"""
+        pool = ModelPool([TTSWrapper(engine=StubTTSEngine()) for _ in range(2)])
+        with pool.acquire() as first:
+            with pool.acquire() as second:
+                assert first is not second
+
+        stats = pool.get_stats()
+        assert [replica["in_flight"] for replica in stats] == [0, 0]
+        assert [replica["total_requests"] for replica in stats] == [1, 1]
+
+    def test_concurrent_requests_spread_over_replicas(self):
+        """测试并发请求分散到多个副本"""
+        engines = [StubTTSEngine(base_latency=0.05) for _ in range(3)]
+        pool = ModelPool([TTSWrapper(engine=engine) for engine in engines])
+
+        threads = [
+            threading.Thread(target=pool.synthesize_array, args=("你好", self.voice_path))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert [engine.calls for engine in engines] == [1, 1, 1]
+
+    def test_synthesize_long_in_parallel(self):
+        """测试长文本各段分散到多个副本并按顺序拼接"""
+        engines = [StubTTSEngine(base_latency=0.05) for _ in range(2)]
+        pool = ModelPool([TTSWrapper(engine=engine) for engine in engines])
+        output_path = os.path.join(self.temp_dir, "long.wav")
+
+        text = "第一句话。第二句话。第三句话。第四句话。"
+        sr, audio = pool.synthesize_long(text, self.voice_path, output_path=output_path, max_length=5)
+
+        assert sum(engine.calls for engine in engines) == 4
+        assert all(engine.calls > 0 for engine in engines)
+        assert len(audio) > 0
+        assert os.path.exists(output_path)
+
+    def test_unhealthy_replica_is_skipped(self):
+        """测试连续失败的副本不再参与路由"""
+        pool = ModelPool(
+            [TTSWrapper(engine=StubTTSEngine()) for _ in range(2)],
+            max_consecutive_failures=1,
+            recovery_seconds=60
+        )
+        with pytest.raises(RuntimeError):
+            with pool.acquire():
+                raise RuntimeError("推理失败")
+
+        assert pool.healthy_count() == 1
+        for _ in range(3):
+            with pool.acquire() as wrapper:
+                assert wrapper is pool.replicas[1].wrapper
+
+
+    def test_client_errors_do_not_mark_replica_unhealthy(self):
+        """测试无法解码的参考语音、不存在的文件等请求错误不计入副本失败"""
+        voice_store = VoiceStore(os.path.join(self.temp_dir, "voices"))
+        pool = ModelPool(
+            [TTSWrapper(engine=StubTTSEngine(), voice_store=voice_store)],
+            max_consecutive_failures=2,
+            recovery_seconds=60
+        )
+        for _ in range(3):
+            with pytest.raises(InvalidVoiceError):
+                pool.synthesize_array("你好", b"not audio" * 100)
+            assert not pool.synthesize(
+                text="你好", voice_path="missing.wav", output_path=os.path.join(self.temp_dir, "out.wav")
+            )
+
+        assert pool.healthy_count() == 1
+        assert pool.get_stats()[0]["failures"] == 0
+
+    def test_precompute_conditioning_per_replica(self):
+        """测试在指定副本上预计算说话人条件，计入该副本负载，已缓存时不再推理"""
+        engines = [StubTTSEngine() for _ in range(2)]
+        pool = ModelPool([TTSWrapper(engine=engine) for engine in engines])
+
+        for index in range(len(pool)):
+            assert pool.precompute_conditioning(index, self.voice_path, "你好")
+        assert [engine.calls for engine in engines] == [1, 1]
+        assert [replica["total_requests"] for replica in pool.get_stats()] == [1, 1]
+
+        assert not pool.precompute_conditioning(0, self.voice_path, "你好")
+        assert engines[0].calls == 1
+
+        # 预计算后首个请求直接复用缓存的条件
+        pool.synthesize_array("你好", self.voice_path)
+        assert sum(engine.conditioning_calls for engine in engines) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
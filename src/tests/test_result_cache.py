@@ -0,0 +1,109 @@
+"""
+合成结果缓存测试
+"""
+
+import pytest
+import os
+import tempfile
+from pathlib import Path
+import sys
+
+# 添加项目根目录到路径
+current_dir = Path(__file__).parent
+project_root = current_dir.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.result_cache import AudioResultCache
+
+
+class TestAudioResultCache:
+    """合成结果缓存测试类"""
+
+    def setup_method(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, "cache")
+
+    def teardown_method(self):
+        """测试后清理"""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _make_file(self, name: str, size: int) -> str:
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'wb') as f:
+            f.write(b"\0" * size)
+        return path
+
+    def test_make_key_is_deterministic(self):
+        """测试缓存键只由请求内容决定"""
+        key1 = AudioResultCache.make_key("你好", "abc", [0.1, 0.2], emo_alpha=0.6)
+        key2 = AudioResultCache.make_key("你好", "abc", [0.1, 0.2], emo_alpha=0.6)
+        key3 = AudioResultCache.make_key("你好", "abd", [0.1, 0.2], emo_alpha=0.6)
+        assert key1 == key2
+        assert key1 != key3
+
+    def test_put_and_get(self):
+        """测试写入与命中"""
+        cache = AudioResultCache(self.cache_dir)
+        assert cache.get("k") is None
+
+        cache.put("k", self._make_file("a.wav", 100))
+        path = cache.get("k")
+        assert path is not None and path.exists()
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_read_returns_bytes(self):
+        """测试按数据读取缓存，文件已被删除时视为未命中"""
+        cache = AudioResultCache(self.cache_dir)
+        cache.put("k", b"RIFF-data")
+        assert cache.read("k") == b"RIFF-data"
+
+        os.unlink(cache.get("k"))
+        assert cache.read("k") is None
+        stats = cache.get_stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+
+    def test_concurrent_put_same_key(self):
+        """测试同一键的并发写入只会替换进完整的文件"""
+        import threading
+        cache = AudioResultCache(self.cache_dir)
+        payloads = [bytes([i]) * 1000000 for i in range(8)]
+        threads = [threading.Thread(target=cache.put, args=("k", payload)) for payload in payloads]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with open(cache.get("k"), 'rb') as f:
+            assert f.read() in payloads
+        assert not list(Path(self.cache_dir).glob("*.tmp"))
+
+    def test_byte_budget_lru_eviction(self):
+        """测试按字节预算淘汰最久未访问条目"""
+        cache = AudioResultCache(self.cache_dir, max_bytes=250)
+        cache.put("a", self._make_file("a.wav", 100))
+        cache.put("b", self._make_file("b.wav", 100))
+        cache.get("a")
+        cache.put("c", self._make_file("c.wav", 100))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.get_stats()["bytes"] <= 250
+
+    def test_index_survives_restart(self):
+        """测试重启后从目录恢复索引"""
+        cache = AudioResultCache(self.cache_dir)
+        cache.put("k", self._make_file("a.wav", 10))
+
+        reloaded = AudioResultCache(self.cache_dir)
+        assert reloaded.get("k") is not None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,84 @@
+"""
+说话人条件缓存测试
+"""
+
+import pytest
+import tempfile
+from pathlib import Path
+import sys
+
+# 添加项目根目录到路径
+current_dir = Path(__file__).parent
+project_root = current_dir.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.speaker_cache import SpeakerConditioningCache
+
+
+class TestSpeakerConditioningCache:
+    """说话人条件缓存测试类"""
+
+    def setup_method(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        """测试后清理"""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_memory_lru_eviction(self):
+        """测试内存层 LRU 淘汰"""
+        cache = SpeakerConditioningCache(max_items=2)
+        cache.put("a", {"cache_spk_cond": 1})
+        cache.put("b", {"cache_spk_cond": 2})
+        assert cache.get("a") is not None
+        cache.put("c", {"cache_spk_cond": 3})
+
+        assert cache.get("b") is None
+        assert cache.get("a") == {"cache_spk_cond": 1}
+        stats = cache.get_stats()
+        assert stats["evictions"] == 1
+        assert stats["memory_hits"] == 2
+        assert stats["misses"] == 1
+
+    def test_disk_tier(self):
+        """测试磁盘层命中"""
+        cache = SpeakerConditioningCache(max_items=1, disk_dir=self.temp_dir)
+        cache.put("a", {"cache_spk_cond": [1, 2, 3]})
+        cache.put("b", {"cache_spk_cond": [4]})
+
+        # a 已被挤出内存层，但仍在磁盘层
+        assert cache.get("a") == {"cache_spk_cond": [1, 2, 3]}
+        assert cache.get_stats()["disk_hits"] == 1
+
+        # 新实例可直接从磁盘层读取
+        reloaded = SpeakerConditioningCache(disk_dir=self.temp_dir)
+        assert reloaded.get("b") == {"cache_spk_cond": [4]}
+
+    def test_concurrent_disk_writes_same_key(self):
+        """测试并发写入同一条目时磁盘层不会出现半写或交错的数据"""
+        import threading
+        cache = SpeakerConditioningCache(disk_dir=self.temp_dir)
+        payloads = [{"cache_spk_cond": [i] * 100000} for i in range(8)]
+        threads = [threading.Thread(target=cache.put, args=("a", payload)) for payload in payloads]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert SpeakerConditioningCache(disk_dir=self.temp_dir).get("a") in payloads
+        assert not list(Path(self.temp_dir).glob("*.tmp"))
+
+    def test_disk_size_eviction(self):
+        """测试磁盘层按容量淘汰"""
+        cache = SpeakerConditioningCache(disk_dir=self.temp_dir, disk_max_bytes=2048)
+        for i in range(10):
+            cache.put(f"voice{i}", {"cache_spk_cond": bytes(512)})
+
+        assert cache.get_stats()["disk_bytes"] <= 2048
+        assert cache.get_stats()["disk_evictions"] > 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
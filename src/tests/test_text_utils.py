@@ -0,0 +1,140 @@
+"""
+文本工具测试
+"""
+
+import pytest
+import random
+from pathlib import Path
+import sys
+
+# 添加项目根目录到路径
+current_dir = Path(__file__).parent
+project_root = current_dir.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.text_utils import TextUtils, TextNormalizer, TextSegmenter, IncrementalSegmenter
+from src.benchmark.text_normalize import legacy_clean_text, legacy_format_text_for_tts
+
+
+class TestTextNormalizer:
+    """文本规范化测试类"""
+
+    def setup_method(self):
+        """测试前准备"""
+        self.normalizer = TextNormalizer()
+
+    def test_clean(self):
+        """测试空白合并与控制字符删除"""
+        assert self.normalizer.clean("  你好\t\n世界  ") == "你好 世界"
+        assert self.normalizer.clean("a\x00b\u200bc") == "abc"
+        # 删除控制字符后不留下相邻空格
+        assert self.normalizer.clean("a \u200b b") == "a b"
+        assert self.normalizer.clean("") == ""
+
+    def test_format_for_tts(self):
+        """测试句末标点与中英文间距"""
+        assert self.normalizer("你好Hello世界。再见！好") == "你好 Hello 世界。 再见！ 好"
+        assert self.normalizer("结束。 下一句") == "结束。 下一句"
+        assert TextUtils.format_text_for_tts("测试ABC") == "测试 ABC"
+
+    def test_matches_legacy_implementation(self):
+        """测试与原实现一致（原实现可能留下的连续空格除外）"""
+        rng = random.Random(0)
+        alphabet = "你好世界abcXYZ123。！？，.  \t\n\x00\x07\u200b\u3000"
+        for _ in range(500):
+            text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+            assert self.normalizer.clean(text) == ' '.join(legacy_clean_text(text).split())
+            assert self.normalizer(text) == ' '.join(legacy_format_text_for_tts(text).split())
+
+
+class TestTextSegmenter:
+    """文本分段测试类"""
+
+    def test_keeps_original_punctuation(self):
+        """测试保留原有标点，分段拼接后与原文一致"""
+        text = "今天天气很好。我们去公园吧！你觉得怎么样？好的。" * 3
+        chunks = TextSegmenter(20).split(text)
+        assert all(len(chunk) <= 20 for chunk in chunks)
+        assert ''.join(chunks) == text
+        assert chunks[0] == "今天天气很好。我们去公园吧！"
+
+    def test_falls_back_to_clauses_and_hard_split(self):
+        """测试超长句在逗号处分割，无标点时按长度切分"""
+        chunks = TextSegmenter(12).split("那就这么定了，我们明天早上八点出发，不见不散。")
+        assert chunks == ["那就这么定了，", "我们明天早上八点出发，", "不见不散。"]
+        chunks = TextSegmenter(10).split("一" * 25)
+        assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+
+    def test_decimals_and_abbreviations(self):
+        """测试小数与英文缩写处不断句"""
+        text = "Mr. Smith paid 3.14 dollars. Did the U.S. team win? Yes."
+        chunks = TextSegmenter(30).split(text)
+        assert chunks == ["Mr. Smith paid 3.14 dollars.", "Did the U.S. team win? Yes."]
+
+    def test_custom_length_fn(self):
+        """测试按自定义长度（如 token 数）分段"""
+        text = "one two three. four five six. seven eight nine."
+        chunks = TextSegmenter(6, length_fn=lambda s: len(s.split())).split(text)
+        assert chunks == ["one two three. four five six.", "seven eight nine."]
+
+    def test_split_text(self):
+        """测试 TextUtils.split_text 接口"""
+        assert TextUtils.split_text("") == []
+        assert TextUtils.split_text("  短文本  ") == ["短文本"]
+
+
+class TestIncrementalSegmenter:
+    """增量分段测试类"""
+
+    def test_emits_complete_sentences(self):
+        """测试逐片推送时凑成完整句子才产出，句末在缓冲末尾时等下一片确认"""
+        segmenter = IncrementalSegmenter(50)
+        assert segmenter.push("今天天气") == []
+        assert segmenter.push("很好。") == []
+        assert segmenter.push("我们") == ["今天天气很好。"]
+        assert segmenter.push("去公园吧！他说：“好。") == ["我们去公园吧！"]
+        assert segmenter.push("”然后") == ["他说：“好。”"]
+        assert segmenter.pending == "然后"
+        assert segmenter.flush() == ["然后"]
+        assert segmenter.pending == ""
+
+    def test_decimals_across_fragments(self):
+        """测试小数点与缩写跨片段时不断句"""
+        segmenter = IncrementalSegmenter(50)
+        emitted = []
+        for fragment in ["Mr", ". Smith paid 3", ".", "14 dollars", ". Bye"]:
+            emitted.extend(segmenter.push(fragment))
+        assert emitted == ["Mr. Smith paid 3.14 dollars."]
+        assert segmenter.flush() == ["Bye"]
+
+    def test_long_text_without_sentence_end(self):
+        """测试长时间没有句末标点时按分句或长度产出，剩余部分留在缓冲中"""
+        segmenter = IncrementalSegmenter(12)
+        assert segmenter.push("那就这么定了，我们明天早上八点出发") == ["那就这么定了，"]
+        assert segmenter.pending == "我们明天早上八点出发"
+        assert segmenter.push("一" * 10) == ["我们明天早上八点出发一一"]
+        segmenter.clear()
+        assert segmenter.flush() == []
+
+    def test_whitespace_and_repeated_text(self):
+        """测试超长的纯空白被丢弃；剩余文本按分段位置截取，重复出现的文字不会错位"""
+        segmenter = IncrementalSegmenter(6)
+        assert segmenter.push(" " * 1000) == []
+        assert segmenter.pending == ""
+
+        emitted = segmenter.push("  好的，好的，好的  ")
+        assert emitted == ["好的，好的，"]
+        assert segmenter.pending == "好的  "
+        assert segmenter.flush() == ["好的"]
+
+    def test_split_spans(self):
+        """测试分段位置与分段文本一致"""
+        text = "  第一句。第二句很长很长，还有分句。  "
+        segmenter = TextSegmenter(8)
+        spans = segmenter.split_spans(text)
+        assert [text[start:end] for start, end in spans] == segmenter.split(text)
+        assert spans[0][0] == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -13,8 +13,13 @@ current_dir = Path(__file__).parent
 project_root = current_dir.parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+import numpy as np
+
 from src.core.tts_wrapper import TTSWrapper
+from src.core.stub_engine import StubTTSEngine
+from src.core.voice_store import VoiceStore
 from src.config.settings import Settings
+from src.utils.metrics import metrics
 
 
 class TestTTSWrapper:
@@ -61,6 +66,48 @@ class TestTTSWrapper:
         """测试批量合成"""
         # 这里需要实际的模型文件才能测试
         pytest.skip("需要实际的模型文件")
+    
+    def test_synthesize_from_memory_voice(self):
+        """测试参考语音以 bytes 传入时合成结果留在内存，且说话人条件只计算一次"""
+        engine = StubTTSEngine()
+        wrapper = TTSWrapper(engine=engine)
+        voice = b"RIFF-dummy-voice"
+        temp_writes = metrics.get_stats()["stages"].get("temp_write", {}).get("count", 0)
+        
+        sr, audio = wrapper.synthesize_array("你好", voice)
+        wrapper.synthesize_array("再见", voice)
+        
+        assert sr == engine.sample_rate
+        assert len(audio) > 0
+        assert engine.calls == 2
+        assert engine.conditioning_calls == 1
+        # 只有说话人条件缓存未命中时才写临时文件
+        assert metrics.get_stats()["stages"]["temp_write"]["count"] == temp_writes + 1
+    
+    def test_voice_hash_matches_file(self):
+        """测试内存参考语音与相同内容文件的哈希一致"""
+        voice_path = os.path.join(self.temp_dir, "voice.wav")
+        with open(voice_path, 'wb') as f:
+            f.write(b"voice-bytes")
+        
+        assert TTSWrapper.get_voice_hash(b"voice-bytes") == TTSWrapper.get_voice_hash(voice_path)
+        
+        # 数组参考语音的哈希包含采样率、类型与形状，且与参考语音存储的内容哈希一致
+        array_voice = (16000, np.zeros(10, dtype=np.float32))
+        array_hash = TTSWrapper.get_voice_hash(array_voice)
+        assert array_hash == TTSWrapper.get_voice_hash((16000, np.zeros(10, dtype=np.float32)))
+        assert array_hash != TTSWrapper.get_voice_hash((22050, np.zeros(10, dtype=np.float32)))
+        assert array_hash != TTSWrapper.get_voice_hash((16000, np.zeros(10, dtype=np.float64)))
+        assert array_hash != TTSWrapper.get_voice_hash((16000, np.zeros((5, 2), dtype=np.float32)))
+        voice_store = VoiceStore(os.path.join(self.temp_dir, "voices"))
+        assert array_hash == voice_store._content_hash(array_voice)
+    
+    def test_check_voice_rejects_empty(self):
+        """测试空的参考语音数据"""
+        with pytest.raises(ValueError):
+            TTSWrapper.check_voice(b"")
+        with pytest.raises(FileNotFoundError):
+            TTSWrapper.check_voice(os.path.join(self.temp_dir, "missing.wav"))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,145 @@
+"""
+参考语音存储测试
+"""
+
+import pytest
+import io
+import os
+import tempfile
+import numpy as np
+import soundfile as sf
+from pathlib import Path
+import sys
+
+# 添加项目根目录到路径
+current_dir = Path(__file__).parent
+project_root = current_dir.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.voice_store import VoiceStore
+from src.core.voice_registry import VoiceRegistry
+from src.core.tts_wrapper import TTSWrapper
+from src.core.stub_engine import StubTTSEngine
+
+
+class TestVoiceStore:
+    """参考语音存储测试类"""
+
+    def setup_method(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.store_dir = os.path.join(self.temp_dir, "voices")
+
+    def teardown_method(self):
+        """测试后清理"""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _make_voice(self, sample_rate: int = 44100, seconds: float = 2.0) -> bytes:
+        """生成带首尾静音的双声道参考语音"""
+        t = np.arange(int(sample_rate * seconds)) / sample_rate
+        tone = 0.1 * np.sin(2 * np.pi * 220 * t)
+        silence = np.zeros(sample_rate // 2)
+        mono = np.concatenate([silence, tone, silence])
+        buffer = io.BytesIO()
+        sf.write(buffer, np.stack([mono, mono], axis=1), sample_rate, format='WAV')
+        return buffer.getvalue()
+
+    def test_ingest_normalizes_voice(self):
+        """测试下混、重采样、去静音、截断与响度归一化"""
+        store = VoiceStore(self.store_dir, sample_rate=16000, max_seconds=1.5, target_rms_db=-20)
+        path = store.ingest(self._make_voice())
+
+        audio, sr = sf.read(path)
+        assert sr == 16000
+        assert audio.ndim == 1
+        assert len(audio) == int(1.5 * 16000)
+        rms_db = 20 * np.log10(np.sqrt(np.mean(audio ** 2)))
+        assert rms_db == pytest.approx(-20, abs=0.5)
+
+    def test_ingest_is_content_addressed(self):
+        """测试相同内容只处理一次，文件路径与内存输入共用同一规范化结果"""
+        store = VoiceStore(self.store_dir)
+        voice = self._make_voice()
+        voice_path = os.path.join(self.temp_dir, "voice.wav")
+        with open(voice_path, 'wb') as f:
+            f.write(voice)
+
+        first = store.ingest(voice)
+        second = store.ingest(voice_path)
+        assert first == second
+        assert store.get_stats() == {"hits": 1, "ingested": 1, "items": 1}
+
+        # 处理参数不同的存储不复用旧结果
+        other = VoiceStore(self.store_dir, max_seconds=1.0)
+        assert other.get_key(voice) != store.get_key(voice)
+
+    def test_wrapper_uses_canonical_voice(self):
+        """测试包装器将规范化后的参考语音传给模型"""
+        engine = StubTTSEngine()
+        wrapper = TTSWrapper(engine=engine, voice_store=VoiceStore(self.store_dir))
+        voice = self._make_voice()
+
+        wrapper.synthesize_array("你好", voice)
+        wrapper.synthesize_array("再见", voice)
+        assert wrapper.voice_store.get_stats()["ingested"] == 1
+
+
+class TestVoiceRegistry:
+    """参考语音注册表测试类"""
+
+    def setup_method(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = VoiceStore(os.path.join(self.temp_dir, "voices"))
+
+    def teardown_method(self):
+        """测试后清理"""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _make_voice(self, freq: float = 220) -> bytes:
+        t = np.arange(22050) / 22050
+        buffer = io.BytesIO()
+        sf.write(buffer, 0.1 * np.sin(2 * np.pi * freq * t), 22050, format='WAV')
+        return buffer.getvalue()
+
+    def test_register_resolve_delete(self):
+        """测试注册、解析与删除"""
+        registry = VoiceRegistry(self.store)
+        record = registry.register(self._make_voice(), name="alice")
+        assert record["name"] == "alice"
+        assert record["duration"] > 0
+
+        path = registry.resolve(record["id"])
+        assert path is not None and path.exists()
+        # 规范化文件再次传入存储时直接复用，不重复处理
+        assert self.store.get_key(str(path)) == record["store_key"]
+
+        assert registry.register(self._make_voice())["id"] == record["id"]
+        registry.register(self._make_voice(440))
+        assert len(registry.list_voices()) == 2
+
+        assert registry.delete(record["id"])
+        assert registry.resolve(record["id"]) is None
+        assert not registry.delete(record["id"])
+
+    def test_concurrent_register_same_voice(self):
+        """测试并发注册相同内容时返回同一条记录"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        registry = VoiceRegistry(self.store)
+        voice = self._make_voice()
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            records = list(pool.map(lambda _: registry.register(voice), range(8)))
+        assert len({record["id"] for record in records}) == 1
+        assert len(registry.list_voices()) == 1
+
+    def test_registry_persists(self):
+        """测试注册表重启后仍可用"""
+        voice_id = VoiceRegistry(self.store).register(self._make_voice())["id"]
+        assert VoiceRegistry(self.store).resolve(voice_id) is not None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
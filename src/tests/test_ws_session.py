@@ -0,0 +1,91 @@
+"""
+WebSocket 合成会话测试
+"""
+
+import pytest
+import json
+import asyncio
+import numpy as np
+from pathlib import Path
+import sys
+
+# 添加项目根目录到路径
+current_dir = Path(__file__).parent
+project_root = current_dir.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from fastapi import FastAPI, WebSocket
+from fastapi.testclient import TestClient
+
+from src.api.ws_session import SynthesisSession
+
+
+class TestSynthesisSession:
+    """WebSocket 合成会话测试类"""
+
+    def setup_method(self):
+        """测试前准备"""
+        self.synthesized = []
+        self.app = FastAPI()
+
+        async def synthesize(text, token):
+            self.synthesized.append(text)
+            await asyncio.sleep(0.1)
+            return 1000, np.zeros(len(text) * 100, dtype=np.float32)
+
+        async def encode(audio, sample_rate):
+            return audio.astype(np.int16).tobytes(), sample_rate
+
+        @self.app.websocket("/ws")
+        async def endpoint(websocket: WebSocket):
+            await websocket.accept()
+            await SynthesisSession(websocket, synthesize, encode, max_length=50).run()
+            await websocket.close()
+
+        self.client = TestClient(self.app)
+
+    def _receive_until_done(self, ws):
+        messages = []
+        while True:
+            message = ws.receive()
+            if message.get("bytes") is not None:
+                messages.append(message["bytes"])
+                continue
+            messages.append(json.loads(message["text"]))
+            if messages[-1]["type"] == "done":
+                return messages
+
+    def test_segments_in_order(self):
+        """测试按句合成，每段依次推送元信息、音频与结束标记"""
+        with self.client.websocket_connect("/ws") as ws:
+            for fragment in ["你好，", "今天天气很好。", "我们去", "公园吧！", "好"]:
+                ws.send_json({"type": "text", "text": fragment})
+            ws.send_json({"type": "end"})
+            messages = self._receive_until_done(ws)
+
+        assert self.synthesized == ["你好，今天天气很好。", "我们去公园吧！", "好"]
+        assert [m["type"] if isinstance(m, dict) else "audio" for m in messages] == \
+            ["segment_start", "audio", "segment_end"] * 3 + ["done"]
+        assert messages[0]["index"] == 0 and messages[0]["sample_rate"] == 1000
+        assert len(messages[1]) == messages[0]["bytes"] == 10 * 100 * 2
+
+    def test_cancel_discards_pending_segments(self):
+        """测试打断后丢弃缓冲文本、排队分段与正在合成分段的结果"""
+        with self.client.websocket_connect("/ws") as ws:
+            ws.send_json({"type": "text", "text": "第一句。第二句。第三"})
+            ws.send_json({"type": "cancel"})
+            ws.send_json({"type": "text", "text": "新的一句。"})
+            ws.send_json({"type": "foo"})
+            ws.send_json({"type": "end"})
+            messages = self._receive_until_done(ws)
+
+        json_messages = [m for m in messages if isinstance(m, dict)]
+        assert json_messages[0] == {"type": "cancelled"}
+        assert json_messages[1]["type"] == "error" and json_messages[1]["status"] == 400
+        starts = [m for m in json_messages if m["type"] == "segment_start"]
+        assert [m["text"] for m in starts] == ["新的一句。"]
+        assert starts[0]["index"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
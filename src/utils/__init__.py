@@ -3,6 +3,8 @@
 """
 
 from .file_utils import FileUtils
-from .text_utils import TextUtils
+from .text_utils import TextUtils, TextNormalizer, TextSegmenter, IncrementalSegmenter, text_normalizer
+from .emotion_matcher import EmotionMatcher
+from .metrics import MetricsRegistry, metrics
 
-__all__ = ["FileUtils", "TextUtils"]
+__all__ = ["FileUtils", "TextUtils", "TextNormalizer", "TextSegmenter", "IncrementalSegmenter", "text_normalizer", "EmotionMatcher", "MetricsRegistry", "metrics"]
@@ -0,0 +1,213 @@
+"""
+情感关键词匹配 - 情感词典编译为 Aho–Corasick 自动机，单遍扫描文本得到情感向量
+"""
+
+import re
+from collections import deque
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+# 与 config.yaml 中 emotion.supported_emotions 一致，也是 IndexTTS2 emo_vector 的顺序
+DEFAULT_EMOTIONS = ("happy", "angry", "sad", "afraid", "disgusted", "melancholic", "surprised", "calm")
+
+# 默认情感词典，可通过 emotion.lexicon 配置覆盖或补充
+DEFAULT_LEXICON = {
+    "happy": ["高兴", "开心", "快乐", "愉快", "兴奋", "喜悦", "哈哈", "呵呵", "欢喜", "幸福"],
+    "angry": ["愤怒", "生气", "恼火", "气愤", "暴怒", "讨厌", "恨", "可恶", "火大"],
+    "sad": ["悲伤", "难过", "伤心", "痛苦", "沮丧", "失望", "哭泣", "眼泪", "心碎"],
+    "afraid": ["害怕", "恐惧", "担心", "紧张", "焦虑", "恐慌", "惊吓", "可怕"],
+    "disgusted": ["恶心", "厌恶", "反感", "嫌弃", "作呕", "鄙视"],
+    "melancholic": ["忧郁", "惆怅", "落寞", "孤独", "怀念", "感伤", "寂寞"],
+    "surprised": ["惊讶", "吃惊", "意外", "震惊", "惊奇", "没想到", "哇", "竟然"],
+    "calm": ["平静", "安静", "冷静", "镇定", "宁静", "温和", "温柔", "平和"],
+}
+
+# 情感词典：情感 -> 关键词列表（权重均为 1），或 情感 -> {关键词: 权重}
+Lexicon = Mapping[str, Union[Sequence[str], Mapping[str, float]]]
+
+
+class EmotionMatcher:
+    """情感关键词匹配类，耗时只与文本长度有关，与词典大小无关"""
+
+    def __init__(self,
+                 lexicon: Optional[Lexicon] = None,
+                 emotions: Sequence[str] = DEFAULT_EMOTIONS,
+                 max_total: float = 0.8):
+        """
+        初始化并编译情感词典
+
+        Args:
+            lexicon: 情感词典，为 None 时使用默认词典
+            emotions: 情感顺序，决定情感向量各维的含义
+            max_total: 情感向量各维之和的上限（情感向量按得分占比缩放到该值）
+        """
+        self.emotions = list(emotions)
+        self.max_total = float(max_total)
+        self.lexicon = self._normalize_lexicon(DEFAULT_LEXICON if lexicon is None else lexicon)
+        self._compile()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "EmotionMatcher":
+        """
+        根据配置创建匹配器
+
+        Args:
+            config: emotion 配置段
+
+        Returns:
+            EmotionMatcher: 匹配器实例
+        """
+        config = config or {}
+        lexicon = dict(DEFAULT_LEXICON)
+        # 配置中的情感整体替换默认词典中的同名情感
+        lexicon.update(config.get("lexicon") or {})
+        return cls(
+            lexicon=lexicon,
+            emotions=config.get("supported_emotions") or DEFAULT_EMOTIONS,
+            max_total=config.get("vector_max_total", 0.8)
+        )
+
+    def _normalize_lexicon(self, lexicon: Lexicon) -> Dict[str, Dict[str, float]]:
+        """统一为 情感 -> {小写关键词: 权重}，去除重复关键词，忽略不在情感列表中的情感"""
+        normalized = {}
+        for emotion, keywords in lexicon.items():
+            if emotion not in self.emotions:
+                continue
+            if not isinstance(keywords, Mapping):
+                keywords = {keyword: 1.0 for keyword in keywords}
+            entries = normalized.setdefault(emotion, {})
+            for keyword, weight in keywords.items():
+                if keyword:
+                    entries[keyword.lower()] = float(weight)
+        return normalized
+
+    def _compile(self):
+        """构建 Aho–Corasick 自动机，并展开为确定性转移表"""
+        emotion_index = {emotion: i for i, emotion in enumerate(self.emotions)}
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[Tuple[Tuple[str, int, float], ...]] = [()]
+        for emotion, keywords in self.lexicon.items():
+            for keyword, weight in keywords.items():
+                state = 0
+                for char in keyword:
+                    next_state = goto[state].get(char)
+                    if next_state is None:
+                        next_state = len(goto)
+                        goto[state][char] = next_state
+                        goto.append({})
+                        outputs.append(())
+                    state = next_state
+                outputs[state] += ((keyword, emotion_index[emotion], weight),)
+
+        # 按层次遍历计算失配指针，同时把失配状态的输出合并进来
+        fail = [0] * len(goto)
+        order = []
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            order.append(state)
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                outputs[next_state] += outputs[fail[next_state]]
+
+        # 沿失配链展开转移（不含初始状态的转移，避免每个状态复制一份首字表），
+        # 扫描时每个字符最多查两次表
+        delta: List[Dict[str, int]] = [{} for _ in goto]
+        for state in order:
+            delta[state] = {**delta[fail[state]], **goto[state]}
+
+        self._root = goto[0]
+        self._delta = delta
+        self._outputs = outputs
+        # 处于初始状态时用正则（C 实现）直接跳到下一个关键词前两个字出现的位置，
+        # 跳过的位置不可能是任何关键词的起点
+        prefixes = {keyword[:2] for keywords in self.lexicon.values() for keyword in keywords}
+        self._candidates = re.compile(
+            '|'.join(re.escape(prefix) for prefix in sorted(prefixes, key=len, reverse=True))
+        ) if prefixes else None
+
+    def find(self, text: str) -> List[Tuple[int, int, str, str]]:
+        """
+        查找全部关键词出现位置（包括重叠的出现）
+
+        Args:
+            text: 输入文本
+
+        Returns:
+            List[Tuple[int, int, str, str]]: (起始位置, 结束位置, 关键词, 情感)
+        """
+        return [
+            (end - len(keyword), end, keyword, self.emotions[index])
+            for end, keyword, index, _ in self._scan(text)
+        ]
+
+    def _scan(self, text: str):
+        if not text or self._candidates is None:
+            return
+        text = text.lower()
+        root, delta, outputs, search = self._root, self._delta, self._outputs, self._candidates.search
+        state, i, n = 0, 0, len(text)
+        while i < n:
+            if state == 0:
+                match = search(text, i)
+                if match is None:
+                    return
+                i = match.start()
+            char = text[i]
+            state = delta[state].get(char)
+            if state is None:
+                state = root.get(char, 0)
+            i += 1
+            for keyword, index, weight in outputs[state]:
+                yield i, keyword, index, weight
+
+    def analyze(self, text: str) -> Dict[str, Any]:
+        """
+        分析文本情感
+
+        Args:
+            text: 输入文本
+
+        Returns:
+            Dict[str, Any]: counts（各情感命中次数）、scores（加权得分）、
+            matches（find 的结果）与 vector（情感向量，无命中时全为 0）
+        """
+        counts = [0] * len(self.emotions)
+        scores = [0.0] * len(self.emotions)
+        matches = []
+        for end, keyword, index, weight in self._scan(text):
+            counts[index] += 1
+            scores[index] += weight
+            matches.append((end - len(keyword), end, keyword, self.emotions[index]))
+        return {
+            "counts": dict(zip(self.emotions, counts)),
+            "scores": dict(zip(self.emotions, scores)),
+            "matches": matches,
+            "vector": self._to_vector(scores),
+        }
+
+    def vector(self, text: str) -> Optional[List[float]]:
+        """
+        计算可直接作为 emotion_vector 传给模型的情感向量
+
+        Args:
+            text: 输入文本
+
+        Returns:
+            Optional[List[float]]: 按 emotions 顺序的情感向量，未命中任何关键词时返回 None
+        """
+        scores = [0.0] * len(self.emotions)
+        for _, _, index, weight in self._scan(text):
+            scores[index] += weight
+        vector = self._to_vector(scores)
+        return vector if any(vector) else None
+
+    def _to_vector(self, scores: List[float]) -> List[float]:
+        """得分按占比缩放，各维之和为 max_total"""
+        total = sum(score for score in scores if score > 0)
+        if total <= 0:
+            return [0.0] * len(scores)
+        return [round(max(score, 0.0) / total * self.max_total, 4) for score in scores]
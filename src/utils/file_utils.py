@@ -46,6 +46,20 @@ class FileUtils:
                 hash_obj.update(chunk)
         return hash_obj.hexdigest()
     
+    @staticmethod
+    def get_bytes_hash(data: bytes, algorithm: str = "md5") -> str:
+        """
+        获取字节数据哈希值，与 get_file_hash 对相同内容的结果一致
+        
+        Args:
+            data: 字节数据
+            algorithm: 哈希算法
+            
+        Returns:
+            str: 哈希值
+        """
+        return hashlib.new(algorithm, data).hexdigest()
+    
     @staticmethod
     def get_file_size(file_path: Union[str, Path]) -> int:
         """
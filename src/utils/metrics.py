@@ -0,0 +1,235 @@
+"""
+指标统计 - 计数器、仪表盘与直方图，可导出为 Prometheus 文本格式
+"""
+
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+# 默认直方图分桶（秒），覆盖从毫秒级文件读写到分钟级长文本推理
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# 实时率分桶，小于 1 表示合成慢于实时
+RTF_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """累积分桶直方图"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        初始化直方图
+
+        Args:
+            buckets: 分桶上界，需递增
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """记录一个观测值"""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self) -> Iterator[Tuple[str, int]]:
+        """按 Prometheus 的 le 语义输出累积计数"""
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield _format_value(bound), total
+        yield "+Inf", total + self.counts[-1]
+
+
+class MetricsRegistry:
+    """指标注册表类，线程安全"""
+
+    def __init__(self, prefix: str = "indextts", buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        初始化指标注册表
+
+        Args:
+            prefix: 指标名前缀
+            buckets: 直方图默认分桶
+        """
+        self.prefix = prefix
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._help: Dict[str, str] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+
+    def describe(self, name: str, help_text: str, buckets: Optional[Tuple[float, ...]] = None):
+        """
+        为指标设置说明文字
+
+        Args:
+            name: 指标名（不含前缀）
+            help_text: 说明文字
+            buckets: 直方图分桶，为 None 时使用默认分桶
+        """
+        self._help[name] = help_text
+        if buckets is not None:
+            self._buckets[name] = tuple(buckets)
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        """计数器累加"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        """设置仪表盘当前值"""
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = float(value)
+
+    def observe(self, name: str, value: float, **labels):
+        """向直方图记录观测值"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self._buckets.get(name, self.buckets))
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, stage: str, **labels):
+        """
+        统计代码块耗时，记录到 stage_seconds 直方图（异常时同样记录）
+
+        Args:
+            stage: 阶段名，如 upload、temp_write、text_segment、inference、response_write
+            **labels: 额外标签
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("stage_seconds", time.perf_counter() - start, stage=stage, **labels)
+
+    def record_synthesis(self, audio_seconds: float, wall_seconds: float):
+        """
+        记录一次合成的音频时长与耗时，用于计算实时率
+
+        Args:
+            audio_seconds: 生成的音频时长（秒）
+            wall_seconds: 合成耗时（秒）
+        """
+        with self._lock:
+            counters = self._counters
+            for name, value in (("synthesized_audio_seconds_total", audio_seconds),
+                                ("synthesis_wall_seconds_total", wall_seconds)):
+                series = counters.setdefault(name, {})
+                series[()] = series.get((), 0.0) + value
+        if wall_seconds > 0:
+            self.observe("realtime_factor", audio_seconds / wall_seconds)
+
+    def get_realtime_factor(self) -> float:
+        """累计实时率：每秒耗时生成的音频秒数"""
+        with self._lock:
+            audio = self._counters.get("synthesized_audio_seconds_total", {}).get((), 0.0)
+            wall = self._counters.get("synthesis_wall_seconds_total", {}).get((), 0.0)
+        return audio / wall if wall else 0.0
+
+    def get_stats(self) -> dict:
+        """获取各阶段耗时汇总（次数、总耗时、平均耗时）"""
+        stats = {}
+        with self._lock:
+            for key, histogram in self._histograms.get("stage_seconds", {}).items():
+                stage = dict(key).get("stage", "")
+                entry = stats.setdefault(stage, {"count": 0, "sum": 0.0})
+                entry["count"] += histogram.count
+                entry["sum"] += histogram.sum
+        for entry in stats.values():
+            entry["avg"] = entry["sum"] / entry["count"] if entry["count"] else 0.0
+        return {"stages": stats, "realtime_factor": self.get_realtime_factor()}
+
+    def reset(self):
+        """清空全部指标"""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def render(self) -> str:
+        """
+        导出为 Prometheus 文本格式
+
+        Returns:
+            str: 指标文本
+        """
+        lines = []
+        with self._lock:
+            for kind, families in (("counter", self._counters), ("gauge", self._gauges)):
+                for name in sorted(families):
+                    full_name = self._full_name(name)
+                    self._render_meta(lines, name, full_name, kind)
+                    for key, value in sorted(families[name].items()):
+                        lines.append(f"{full_name}{_format_labels(key)} {_format_value(value)}")
+
+            for name in sorted(self._histograms):
+                full_name = self._full_name(name)
+                self._render_meta(lines, name, full_name, "histogram")
+                for key, histogram in sorted(self._histograms[name].items()):
+                    for bound, count in histogram.cumulative_counts():
+                        labels = _format_labels(key + (("le", bound),))
+                        lines.append(f"{full_name}_bucket{labels} {count}")
+                    lines.append(f"{full_name}_sum{_format_labels(key)} {_format_value(histogram.sum)}")
+                    lines.append(f"{full_name}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def _full_name(self, name: str) -> str:
+        return f"{self.prefix}_{name}" if self.prefix else name
+
+    def _render_meta(self, lines: list, name: str, full_name: str, kind: str):
+        if name in self._help:
+            lines.append(f"# HELP {full_name} {self._help[name]}")
+        lines.append(f"# TYPE {full_name} {kind}")
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in key) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# 进程级默认注册表，API 服务与 Web 界面共用
+metrics = MetricsRegistry()
+metrics.describe("stage_seconds", "各处理阶段耗时（秒）")
+metrics.describe("realtime_factor", "单次合成的实时率（音频秒数 / 耗时秒数）", buckets=RTF_BUCKETS)
+metrics.describe("synthesized_audio_seconds_total", "累计生成的音频时长（秒）")
+metrics.describe("synthesis_wall_seconds_total", "累计合成耗时（秒）")
+metrics.describe("http_requests_total", "HTTP 请求数")
+metrics.describe("http_request_seconds", "HTTP 请求处理耗时（秒）")
+metrics.describe("result_cache_requests_total", "合成结果缓存查询数")
+metrics.describe("inference_queue_depth", "推理队列中等待的任务数")
+metrics.describe("inference_running", "正在执行的推理任务数")
+metrics.describe("requests_cancelled_total", "因超时或客户端断开而取消的请求数")
+metrics.describe("inference_wait_seconds", "推理任务在队列中的等待时间（秒），按优先级区分")
+metrics.describe("inference_wait_p99_seconds", "最近推理任务排队等待时间的 p99（秒）")
+metrics.describe("cache_hit_ratio", "缓存命中率")
+metrics.describe("realtime_factor_overall", "累计实时率（音频秒数 / 耗时秒数）")
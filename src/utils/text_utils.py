@@ -4,9 +4,302 @@
 
 import re
 import unicodedata
-from typing import List, Optional, Dict, Any
+from typing import Callable, Iterator, List, Optional, Dict, Any, Tuple
 import logging
 
+from .emotion_matcher import EmotionMatcher
+
+
+class _ControlCharTable(dict):
+    """str.translate 映射表：删除非空白的控制字符（Unicode 类别 C*），按需填充并缓存"""
+
+    def __missing__(self, code: int) -> Optional[str]:
+        char = chr(code)
+        value = None if unicodedata.category(char)[0] == 'C' and not char.isspace() else char
+        self[code] = value
+        return value
+
+
+class TextNormalizer:
+    """预编译的文本规范化流水线：空白合并与控制字符删除走 C 实现的字符串方法，间距规则合并为一个正则"""
+
+    # 句末标点后、中英文之间插入空格，三条规则合并为一个零宽匹配
+    SPACING_PATTERN = re.compile(
+        r'(?<=[。！？])(?=[^。！？\s])'
+        r'|(?<=[a-zA-Z])(?=[\u4e00-\u9fff])'
+        r'|(?<=[\u4e00-\u9fff])(?=[a-zA-Z])'
+    )
+
+    # 控制字符映射表，所有实例共享
+    _table = _ControlCharTable()
+
+    def clean(self, text: str) -> str:
+        """
+        删除控制字符并将连续空白合并为一个空格
+
+        Args:
+            text: 输入文本
+
+        Returns:
+            str: 清理后的文本
+        """
+        if not text:
+            return ""
+        text = ' '.join(text.split())
+        # 合并空白后仍有不可打印字符才需要逐字符查表删除，绝大多数文本在此返回
+        if text.isprintable():
+            return text
+        # 删除控制字符后可能出现相邻空格，再合并一次
+        return ' '.join(text.translate(self._table).split())
+
+    def format_for_tts(self, text: str) -> str:
+        """
+        清理文本，并在句末标点后、中英文之间插入空格
+
+        Args:
+            text: 输入文本
+
+        Returns:
+            str: 格式化后的文本
+        """
+        return self.SPACING_PATTERN.sub(' ', self.clean(text))
+
+    __call__ = format_for_tts
+
+
+# 进程级默认实例
+text_normalizer = TextNormalizer()
+
+# 默认情感词典的匹配器，首次使用时编译
+_emotion_matcher: Optional[EmotionMatcher] = None
+
+
+class TextSegmenter:
+    """按长度预算分段：优先在句末断开，长句退到逗号等分句处，仍超长时硬切，整体线性时间"""
+
+    # 句末：中文句末标点、英文 !?、省略号，以及后接空白、引号、中文或结尾的句点（排除小数与 "a.b"），可带后引号/括号
+    SENTENCE_END = re.compile(
+        r'(?:[。！？!?；;]+|…+|\.{3,}|\.(?=[\s"\')\]]|$|[^\x00-\x7f]))[”’"\'）)\]」』]*\s*'
+    )
+    # 分句：逗号、顿号、冒号
+    CLAUSE_END = re.compile(r'[，,、：:]+\s*')
+    # 句点前的词，用于识别缩写
+    WORD_BEFORE = re.compile(r'([A-Za-z][A-Za-z.]*)$')
+    # 后面通常不断句的英文缩写（小写）
+    ABBREVIATIONS = frozenset({
+        "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e",
+        "inc", "ltd", "co", "corp", "no", "fig", "approx", "dept", "est", "jan", "feb",
+        "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec"
+    })
+
+    def __init__(self, max_length: int = 500, length_fn: Optional[Callable[[str], int]] = None):
+        """
+        初始化分段器
+
+        Args:
+            max_length: 每段的长度预算
+            length_fn: 长度计算函数（如分词器的 token 数），为 None 时按字符数
+        """
+        self.max_length = max(1, int(max_length))
+        self.length_fn = length_fn or len
+
+    def split(self, text: str) -> List[str]:
+        """
+        分割文本，保留原有标点
+
+        Args:
+            text: 输入文本
+
+        Returns:
+            List[str]: 去除首尾空白后的分段，空文本返回空列表
+        """
+        return [text[start:end] for start, end in self.split_spans(text)]
+
+    def split_spans(self, text: str) -> List[Tuple[int, int]]:
+        """
+        分割文本，返回各段在原文本中的位置
+
+        Args:
+            text: 输入文本
+
+        Returns:
+            List[Tuple[int, int]]: 各段去除首尾空白后的 (起始, 结束) 位置，空文本返回空列表
+        """
+        stripped = text.strip() if text else ""
+        if not stripped:
+            return []
+        offset = len(text) - len(text.lstrip())
+        if self.length_fn(stripped) <= self.max_length:
+            return [(offset, offset + len(stripped))]
+
+        # 片段首尾相接覆盖全文，按位置累积即可得到各段的范围
+        chunks = []
+        chunk_start = position = current_length = 0
+        for piece in self._pieces(stripped):
+            length = self.length_fn(piece)
+            if position > chunk_start and current_length + length > self.max_length:
+                chunks.append((chunk_start, position))
+                chunk_start, current_length = position, 0
+            current_length += length
+            position += len(piece)
+        chunks.append((chunk_start, position))
+
+        spans = []
+        for start, end in chunks:
+            chunk = stripped[start:end]
+            start += len(chunk) - len(chunk.lstrip())
+            end -= len(chunk) - len(chunk.rstrip())
+            if start < end:
+                spans.append((offset + start, offset + end))
+        return spans
+
+    def _pieces(self, text: str) -> Iterator[str]:
+        """依次产出不超过预算的片段：整句，或超长句的分句，或硬切的子串"""
+        for sentence in self._split_sentences(text):
+            if self.length_fn(sentence) <= self.max_length:
+                yield sentence
+                continue
+            for clause in self._split_at(self.CLAUSE_END, sentence):
+                if self.length_fn(clause) <= self.max_length:
+                    yield clause
+                else:
+                    yield from self._hard_split(clause)
+
+    def sentence_ends(self, text: str) -> Iterator[int]:
+        """
+        依次产出句子结束位置（句末标点及其后的引号、空白之后）
+
+        Args:
+            text: 输入文本
+
+        Yields:
+            int: 结束位置
+        """
+        for match in self.SENTENCE_END.finditer(text):
+            if match.group().startswith('.') and not match.group().startswith('...'):
+                if self._is_abbreviation(text, match.start()):
+                    continue
+            yield match.end()
+
+    def _split_sentences(self, text: str) -> Iterator[str]:
+        start = 0
+        for end in self.sentence_ends(text):
+            yield text[start:end]
+            start = end
+        if start < len(text):
+            yield text[start:]
+
+    def _is_abbreviation(self, text: str, dot: int) -> bool:
+        """句点前是缩写或首字母（如 Mr.、e.g.、U.S.、J.）时不断句"""
+        word = self.WORD_BEFORE.search(text, max(0, dot - 16), dot)
+        if word is None:
+            return False
+        word = word.group(1)
+        return len(word) == 1 or '.' in word or word.lower() in self.ABBREVIATIONS
+
+    @staticmethod
+    def _split_at(pattern: re.Pattern, text: str) -> Iterator[str]:
+        start = 0
+        for match in pattern.finditer(text):
+            yield text[start:match.end()]
+            start = match.end()
+        if start < len(text):
+            yield text[start:]
+
+    def _hard_split(self, text: str) -> Iterator[str]:
+        """无标点可断的超长片段：尽量在空白处断开，否则按预算切分"""
+        start = 0
+        while start < len(text):
+            end = self._fit(text, start)
+            if end < len(text):
+                space = text.rfind(' ', start + 1, end)
+                if space > start:
+                    end = space + 1
+            yield text[start:end]
+            start = end
+
+    def _fit(self, text: str, start: int) -> int:
+        """从 start 起不超过预算的最长前缀的结束位置（至少一个字符）"""
+        if self.length_fn is len:
+            return min(len(text), start + self.max_length)
+        # 自定义长度函数按二分查找，长度需随前缀单调不减
+        lo, hi = start + 1, len(text)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.length_fn(text[start:mid]) <= self.max_length:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo
+
+
+class IncrementalSegmenter:
+    """增量分段类：文本逐片到达（如大模型逐 token 输出），凑成完整句子即产出分段"""
+
+    def __init__(self, max_length: int = 120, length_fn: Optional[Callable[[str], int]] = None):
+        """
+        初始化增量分段器
+
+        Args:
+            max_length: 每段的长度预算，超过预算仍无句末标点时在分句处或硬切产出
+            length_fn: 长度计算函数，为 None 时按字符数
+        """
+        self.segmenter = TextSegmenter(max_length, length_fn)
+        self._buffer = ""
+
+    @property
+    def pending(self) -> str:
+        """尚未凑成完整句子的缓冲文本"""
+        return self._buffer
+
+    def push(self, fragment: str) -> List[str]:
+        """
+        追加文本片段
+
+        Args:
+            fragment: 文本片段，片段之间原样拼接
+
+        Returns:
+            List[str]: 新凑成的分段，可能为空
+        """
+        self._buffer += fragment or ""
+        # 句末位于缓冲末尾时暂不断开：后续片段可能补上后引号，或句点其实是小数点
+        boundary = 0
+        for end in self.segmenter.sentence_ends(self._buffer):
+            if end < len(self._buffer):
+                boundary = end
+
+        segments = []
+        if boundary:
+            segments = self.segmenter.split(self._buffer[:boundary])
+            self._buffer = self._buffer[boundary:]
+
+        if self.segmenter.length_fn(self._buffer) > self.segmenter.max_length:
+            # 长时间没有句末标点：产出分句或硬切的片段，最后一片可能不完整，留在缓冲中
+            spans = self.segmenter.split_spans(self._buffer)
+            if not spans:
+                # 只有空白
+                self._buffer = ""
+                return segments
+            segments.extend(self._buffer[start:end] for start, end in spans[:-1])
+            self._buffer = self._buffer[spans[-1][0]:]
+        return segments
+
+    def flush(self) -> List[str]:
+        """
+        输入结束（如一轮对话结束），产出缓冲中剩余的文本
+
+        Returns:
+            List[str]: 剩余文本的分段
+        """
+        segments = self.segmenter.split(self._buffer)
+        self._buffer = ""
+        return segments
+
+    def clear(self):
+        """丢弃缓冲中的文本"""
+        self._buffer = ""
+
 
 class TextUtils:
     """文本工具类"""
@@ -22,21 +315,12 @@ class TextUtils:
         Returns:
             str: 清理后的文本
         """
-        if not text:
-            return ""
-        
-        # 移除多余的空白字符
-        text = re.sub(r'\s+', ' ', text.strip())
-        
-        # 移除控制字符
-        text = ''.join(char for char in text if unicodedata.category(char)[0] != 'C' or char in '\n\t')
-        
-        return text
+        return text_normalizer.clean(text)
     
     @staticmethod
     def split_text(text: str, max_length: int = 500) -> List[str]:
         """
-        分割长文本
+        分割长文本，保留原有标点，超长句在逗号等分句处继续分割
         
         Args:
             text: 输入文本
@@ -45,33 +329,7 @@ class TextUtils:
         Returns:
             List[str]: 分割后的文本列表
         """
-        if len(text) <= max_length:
-            return [text]
-        
-        # 按句子分割
-        sentences = re.split(r'[。！？.!?]', text)
-        chunks = []
-        current_chunk = ""
-        
-        for sentence in sentences:
-            if not sentence.strip():
-                continue
-            
-            # 添加标点符号
-            if sentence != sentences[-1]:
-                sentence += "。"
-            
-            if len(current_chunk + sentence) <= max_length:
-                current_chunk += sentence
-            else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = sentence
-        
-        if current_chunk:
-            chunks.append(current_chunk.strip())
-        
-        return chunks
+        return TextSegmenter(max_length).split(text)
     
     @staticmethod
     def extract_emotions(text: str) -> Dict[str, float]:
@@ -82,27 +340,13 @@ class TextUtils:
             text: 输入文本
             
         Returns:
-            Dict[str, float]: 情感字典
-        """
-        # 简单的情感关键词匹配
-        emotion_keywords = {
-            "happy": ["高兴", "开心", "快乐", "愉快", "兴奋", "喜悦", "哈哈", "呵呵"],
-            "sad": ["悲伤", "难过", "伤心", "痛苦", "沮丧", "失望", "哭泣", "眼泪"],
-            "angry": ["愤怒", "生气", "恼火", "愤怒", "气愤", "暴怒", "讨厌", "恨"],
-            "afraid": ["害怕", "恐惧", "担心", "紧张", "焦虑", "恐慌", "惊吓"],
-            "surprised": ["惊讶", "吃惊", "意外", "震惊", "惊奇", "没想到", "哇"],
-            "calm": ["平静", "安静", "冷静", "镇定", "宁静", "温和", "温柔"]
-        }
-        
-        emotions = {emotion: 0.0 for emotion in emotion_keywords.keys()}
-        text_lower = text.lower()
-        
-        for emotion, keywords in emotion_keywords.items():
-            count = sum(1 for keyword in keywords if keyword in text_lower)
-            if count > 0:
-                emotions[emotion] = min(count / len(keywords), 1.0)
-        
-        return emotions
+            Dict[str, float]: 情感字典，值为按关键词得分占比缩放的情感向量分量
+        """
+        global _emotion_matcher
+        if _emotion_matcher is None:
+            _emotion_matcher = EmotionMatcher()
+        analysis = _emotion_matcher.analyze(text)
+        return dict(zip(_emotion_matcher.emotions, analysis["vector"]))
     
     @staticmethod
     def validate_text(text: str, 
@@ -145,20 +389,7 @@ class TextUtils:
         Returns:
             str: 格式化后的文本
         """
-        # 清理文本
-        text = TextUtils.clean_text(text)
-        
-        # 处理数字
-        text = re.sub(r'(\d+)', r'\1', text)
-        
-        # 处理标点符号
-        text = re.sub(r'([。！？])([^。！？])', r'\1 \2', text)
-        
-        # 处理英文和中文混合
-        text = re.sub(r'([a-zA-Z])([\u4e00-\u9fff])', r'\1 \2', text)
-        text = re.sub(r'([\u4e00-\u9fff])([a-zA-Z])', r'\1 \2', text)
-        
-        return text
+        return text_normalizer.format_for_tts(text)
     
     @staticmethod
     def count_words(text: str) -> int:
@@ -4,6 +4,7 @@ Web 用户界面
 
 import gradio as gr
 import os
+import soundfile as sf
 import logging
 from pathlib import Path
 from typing import Optional, List
@@ -15,7 +16,13 @@ project_root = current_dir.parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from src.core.tts_wrapper import TTSWrapper
+from src.core.speaker_cache import SpeakerConditioningCache
+from src.core.voice_store import VoiceStore
+from src.core.duration_estimator import DurationEstimator
+from src.core.audio_encoder import AudioEncoder
+from src.core.model_loader import ModelLoader
 from src.config.settings import Settings
+from src.utils.metrics import metrics
 
 
 class WebUI:
@@ -29,7 +36,11 @@ class WebUI:
             settings: 配置设置
         """
         self.settings = settings or Settings()
-        self.tts_wrapper = None
+        self.model_loader = ModelLoader.from_config(
+            load_fn=self._load_tts,
+            startup_config=self.settings.get("startup", {})
+        )
+        self.audio_encoder = AudioEncoder.from_config(self.settings.get("output", {}))
         self.setup_logging()
         
     def setup_logging(self):
@@ -41,16 +52,50 @@ class WebUI:
         )
         self.logger = logging.getLogger(__name__)
     
+    @property
+    def tts_wrapper(self) -> Optional[TTSWrapper]:
+        """已就绪的 TTS 包装器，加载及预热完成前为 None"""
+        return self.model_loader.model if self.model_loader.is_ready else None
+    
+    def _load_tts(self, progress_callback) -> TTSWrapper:
+        """加载 TTS 模型"""
+        progress_callback(0, 1)
+        tts_config = self.settings.get_tts_config()
+        speaker_config = self.settings.get_cache_config().get("speaker", {})
+        voices_config = self.settings.get("voices", {})
+        voice_store = None
+        if voices_config.get("enabled", True):
+            voice_store = VoiceStore.from_config(voices_config, self.settings.get("audio.sample_rate", 22050))
+        estimator_config = self.settings.get("estimator", {})
+        duration_estimator = None
+        if estimator_config.get("enabled", True):
+            duration_estimator = DurationEstimator.from_config(estimator_config)
+        wrapper = TTSWrapper(
+            speaker_cache=SpeakerConditioningCache.from_config(speaker_config),
+            use_speaker_cache=speaker_config.get("enabled", True),
+            voice_store=voice_store,
+            duration_estimator=duration_estimator,
+            **tts_config
+        )
+        progress_callback(1, 1)
+        return wrapper
+    
     def initialize_tts(self):
-        """初始化 TTS 模型"""
-        try:
-            tts_config = self.settings.get_tts_config()
-            self.tts_wrapper = TTSWrapper(**tts_config)
+        """同步初始化 TTS 模型"""
+        self.model_loader.start(background=False)
+        if self.model_loader.is_ready:
             self.logger.info("TTS 模型初始化成功")
             return True
-        except Exception as e:
-            self.logger.error(f"TTS 模型初始化失败: {e}")
-            return False
+        return False
+    
+    def get_loading_message(self) -> str:
+        """获取模型加载状态的提示信息"""
+        status = self.model_loader.get_status()
+        if status["state"] == ModelLoader.FAILED:
+            return f"模型加载失败: {status['error']}"
+        if status["state"] == ModelLoader.WARMING_UP:
+            return "模型预热中，请稍候..."
+        return "模型加载中，请稍候..."
     
     def synthesize_audio(self, 
                         text: str,
@@ -59,7 +104,8 @@ class WebUI:
                         use_emo_text: bool = False,
                         emo_text: Optional[str] = None,
                         emo_alpha: float = 0.6,
-                        use_random: bool = False) -> Optional[str]:
+                        use_random: bool = False,
+                        output_format: str = "wav") -> Optional[str]:
         """
         语音合成
         
@@ -71,6 +117,7 @@ class WebUI:
             emo_text: 情感文本
             emo_alpha: 情感强度
             use_random: 是否使用随机采样
+            output_format: 输出格式（wav、flac、mp3 或 opus）
             
         Returns:
             Optional[str]: 输出文件路径
@@ -97,20 +144,43 @@ class WebUI:
             timestamp = int(time.time())
             output_path = output_dir / f"output_{timestamp}.wav"
             
-            # 执行语音合成
-            success = self.tts_wrapper.synthesize(
-                text=text,
-                voice_path=voice_file.name,
-                output_path=str(output_path),
-                emotion_vector=emotion_vector,
-                use_emo_text=use_emo_text,
-                emo_text=emo_text,
-                emo_alpha=emo_alpha,
-                use_random=use_random
-            )
+            synthesis_params = {
+                "emotion_vector": emotion_vector,
+                "use_emo_text": use_emo_text,
+                "emo_text": emo_text,
+                "emo_alpha": emo_alpha,
+                "use_random": use_random
+            }
+            
+            # 执行语音合成，长文本分段并发合成后拼接
+            split_length = self.settings.get("text.split_length", 500)
+            if self.settings.get("text.auto_split", True) and len(text) > split_length:
+                audio_config = self.settings.get_audio_config()
+                self.tts_wrapper.synthesize_long(
+                    text,
+                    voice_file.name,
+                    output_path=str(output_path),
+                    max_length=split_length,
+                    silence_ms=audio_config.get("segment_silence_ms", 200),
+                    crossfade_ms=audio_config.get("crossfade_ms", 20),
+                    **synthesis_params
+                )
+                success = True
+            else:
+                success = self.tts_wrapper.synthesize(
+                    text=text,
+                    voice_path=voice_file.name,
+                    output_path=str(output_path),
+                    **synthesis_params
+                )
+            
+            if success and output_format != "wav":
+                output_path = self._convert_output(output_path, output_format)
             
             if success:
-                self.logger.info(f"语音合成成功: {output_path}")
+                self.logger.info(
+                    f"语音合成成功: {output_path}，累计实时率 {metrics.get_realtime_factor():.2f}"
+                )
                 return str(output_path)
             else:
                 self.logger.error("语音合成失败")
@@ -120,6 +190,17 @@ class WebUI:
             self.logger.error(f"语音合成异常: {e}")
             return None
     
+    def _convert_output(self, wav_path: Path, output_format: str) -> Path:
+        """将合成的 WAV 转码为指定格式，删除原 WAV 文件"""
+        audio, sample_rate = sf.read(str(wav_path), dtype='float32')
+        with metrics.timer("encode"):
+            data = self.audio_encoder.encode(audio, sample_rate, output_format)
+        output_path = wav_path.with_suffix("." + AudioEncoder.extension(output_format))
+        with open(output_path, 'wb') as f:
+            f.write(data)
+        os.remove(wav_path)
+        return output_path
+    
     def create_interface(self):
         """创建 Gradio 界面"""
         with gr.Blocks(title="IndexTTS 二次开发界面") as interface:
@@ -170,6 +251,14 @@ class WebUI:
                         value=False
                     )
                     
+                    # 原始 PCM 没有文件头，浏览器无法直接播放，界面中不提供
+                    format_choices = ["wav", "flac", "mp3", "opus"]
+                    output_format = gr.Dropdown(
+                        label="输出格式",
+                        choices=format_choices,
+                        value=self.audio_encoder.default_format if self.audio_encoder.default_format in format_choices else "wav"
+                    )
+                    
                     # 控制按钮
                     synthesize_btn = gr.Button("开始合成", variant="primary")
                     
@@ -197,20 +286,24 @@ class WebUI:
                 outputs=[emo_text]
             )
             
-            def on_synthesize(text, voice, use_emo, emo_text_val, emo_alpha_val, use_random_val):
+            def on_synthesize(text, voice, use_emo, emo_text_val, emo_alpha_val, use_random_val, output_format_val):
                 if not text.strip():
                     return None, "错误: 文本不能为空"
                 
                 if voice is None:
                     return None, "错误: 请上传参考语音文件"
                 
+                if not self.model_loader.is_ready:
+                    return None, self.get_loading_message()
+                
                 output_path = self.synthesize_audio(
                     text=text,
                     voice_file=voice,
                     use_emo_text=use_emo,
                     emo_text=emo_text_val if use_emo else None,
                     emo_alpha=emo_alpha_val,
-                    use_random=use_random_val
+                    use_random=use_random_val,
+                    output_format=output_format_val
                 )
                 
                 if output_path:
@@ -220,7 +313,7 @@ class WebUI:
             
             synthesize_btn.click(
                 on_synthesize,
-                inputs=[text_input, voice_file, use_emo_text, emo_text, emo_alpha, use_random],
+                inputs=[text_input, voice_file, use_emo_text, emo_text, emo_alpha, use_random, output_format],
                 outputs=[output_audio, status_text]
             )
             
@@ -239,8 +332,10 @@ class WebUI:
     
     def launch(self):
         """启动 Web 界面"""
-        # 初始化 TTS 模型
-        if not self.initialize_tts():
+        # 在后台加载模型，界面可立即打开
+        background = self.settings.get("startup.background_load", True)
+        self.model_loader.start(background=background)
+        if not background and not self.model_loader.is_ready:
             self.logger.error("无法启动 Web 界面：TTS 模型初始化失败")
             return
         